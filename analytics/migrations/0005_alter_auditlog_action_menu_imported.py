@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0004_auditlog_tenant_schema'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='auditlog',
+            name='action',
+            field=models.CharField(choices=[('order.created', 'Order Created'), ('order.status_changed', 'Order Status Changed'), ('order.payment_confirmed', 'Payment Confirmed'), ('order.cancelled', 'Order Cancelled'), ('staff.invited', 'Staff Invited'), ('staff.activated', 'Staff Activated'), ('staff.deactivated', 'Staff Deactivated'), ('staff.deleted', 'Staff Deleted'), ('staff.role_changed', 'Staff Role Changed'), ('menu.item_created', 'Menu Item Created'), ('menu.item_updated', 'Menu Item Updated'), ('menu.item_deleted', 'Menu Item Deleted'), ('menu.imported', 'Menu Imported'), ('settings.updated', 'Settings Updated'), ('table.created', 'Table Created'), ('table.updated', 'Table Updated'), ('table.deleted', 'Table Deleted')], max_length=100),
+        ),
+    ]
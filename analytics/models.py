@@ -76,6 +76,7 @@ class AuditLog(models.Model):
         ('menu.item_created', 'Menu Item Created'),
         ('menu.item_updated', 'Menu Item Updated'),
         ('menu.item_deleted', 'Menu Item Deleted'),
+        ('menu.imported', 'Menu Imported'),
         ('settings.updated', 'Settings Updated'),
         ('table.created', 'Table Created'),
         ('table.updated', 'Table Updated'),
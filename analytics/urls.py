@@ -4,6 +4,7 @@ from .views import (
     EventViewSet, dashboard_summary, dashboard_metrics, dashboard_activities,
     track_event, audit_logs,
     chart_revenue_trend, chart_hourly_orders, chart_top_items, chart_order_types,
+    chart_table_performance, chart_table_trend,
     system_search,
 )
 
@@ -22,5 +23,7 @@ urlpatterns = [
     path('charts/hourly-orders/', chart_hourly_orders, name='chart_hourly_orders'),
     path('charts/top-items/', chart_top_items, name='chart_top_items'),
     path('charts/order-types/', chart_order_types, name='chart_order_types'),
+    path('charts/tables/', chart_table_performance, name='chart_table_performance'),
+    path('charts/tables/<int:table_id>/', chart_table_trend, name='chart_table_trend'),
     path('search/', system_search, name='system_search'),
 ]
@@ -3,7 +3,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
-from django.db.models import Count, Sum, F
+from django.db.models import Avg, Count, Sum, F
 from django.db.models.functions import TruncDay, ExtractHour
 from django.utils import timezone
 from datetime import timedelta
@@ -13,6 +13,7 @@ from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 import random
 from orders.models import Order, OrderItem
+from subscriptions.permissions import requires_feature
 from django.contrib.auth import get_user_model
 User = get_user_model()
 
@@ -389,8 +390,17 @@ def audit_logs(request):
 
 # ── Chart endpoints ─────────────────────────────────────────────────────────
 
+def _days_param(request, default, maximum=90):
+    """The ?days= window clamped to 1..maximum, or None if it is not an integer."""
+    try:
+        days = int(request.query_params.get('days', default))
+    except (TypeError, ValueError):
+        return None
+    return max(1, min(days, maximum))
+
+
 @api_view(['GET'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, requires_feature('has_basic_analytics')])
 def chart_revenue_trend(request):
     """Daily revenue + order count for the last N days (default 14)."""
     tenant = getattr(request, 'tenant', None)
@@ -423,7 +433,7 @@ def chart_revenue_trend(request):
 
 
 @api_view(['GET'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, requires_feature('has_basic_analytics')])
 def chart_hourly_orders(request):
     """Orders and revenue by hour of day (0-23)."""
     tenant = getattr(request, 'tenant', None)
@@ -451,7 +461,7 @@ def chart_hourly_orders(request):
 
 
 @api_view(['GET'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, requires_feature('has_basic_analytics')])
 def chart_top_items(request):
     """Top-selling menu items by revenue and quantity."""
     tenant = getattr(request, 'tenant', None)
@@ -479,7 +489,7 @@ def chart_top_items(request):
 
 
 @api_view(['GET'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, requires_feature('has_basic_analytics')])
 def chart_order_types(request):
     """Breakdown of orders by type (dine_in / pickup / delivery)."""
     tenant = getattr(request, 'tenant', None)
@@ -511,6 +521,86 @@ def chart_order_types(request):
     return Response({'success': True, 'data': data})
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, requires_feature('has_advanced_analytics')])
+def chart_table_performance(request):
+    """
+    Per-table revenue, order count, turnover (orders per day) and average
+    ticket for the last N days, using the indexed Order.table reference.
+    """
+    tenant = getattr(request, 'tenant', None)
+    if not tenant:
+        return Response({'error': 'Tenant context required'}, status=400)
+
+    days = _days_param(request, 30)
+    if days is None:
+        return Response({'error': 'days must be an integer'}, status=400)
+    since = timezone.now() - timedelta(days=days)
+
+    rows = (
+        Order.objects
+        .filter(tenant=tenant, created_at__gte=since, table__isnull=False)
+        .exclude(status='cancelled')
+        .values('table_id', 'table__number', 'table__name', 'table__section')
+        .annotate(revenue=Sum('total_amount'), orders=Count('id'), avg_ticket=Avg('total_amount'))
+        .order_by('-revenue')
+    )
+
+    data = [
+        {
+            'tableId': r['table_id'],
+            'number': r['table__number'],
+            'name': r['table__name'],
+            'section': r['table__section'],
+            'revenue': float(r['revenue']),
+            'orders': r['orders'],
+            'turnover': round(r['orders'] / days, 2),
+            'averageTicket': round(float(r['avg_ticket']), 2),
+        }
+        for r in rows
+    ]
+    return Response({'success': True, 'data': data})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, requires_feature('has_advanced_analytics')])
+def chart_table_trend(request, table_id):
+    """Daily revenue, orders and average ticket for one table over the last N days."""
+    tenant = getattr(request, 'tenant', None)
+    if not tenant:
+        return Response({'error': 'Tenant context required'}, status=400)
+
+    days = _days_param(request, 14)
+    if days is None:
+        return Response({'error': 'days must be an integer'}, status=400)
+    since = timezone.now() - timedelta(days=days)
+
+    rows = (
+        Order.objects
+        .filter(tenant=tenant, table_id=table_id, created_at__gte=since)
+        .exclude(status='cancelled')
+        .annotate(day=TruncDay('created_at'))
+        .values('day')
+        .annotate(revenue=Sum('total_amount'), orders=Count('id'), avg_ticket=Avg('total_amount'))
+        .order_by('day')
+    )
+
+    result = {}
+    for i in range(days):
+        d = (since + timedelta(days=i)).date()
+        result[str(d)] = {'date': str(d), 'revenue': 0.0, 'orders': 0, 'averageTicket': 0.0}
+    for r in rows:
+        d = str(r['day'].date())
+        result[d] = {
+            'date': d,
+            'revenue': float(r['revenue']),
+            'orders': r['orders'],
+            'averageTicket': round(float(r['avg_ticket']), 2),
+        }
+
+    return Response({'success': True, 'data': list(result.values())})
+
+
 # ── System search endpoint ───────────────────────────────────────────────────
 
 @api_view(['GET'])
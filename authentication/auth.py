@@ -2,7 +2,9 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.authentication import JWTAuthentication as BaseJWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework.exceptions import AuthenticationFailed
+from .tokens import PROFILE_CLAIMS, get_user_state, is_token_revoked, user_from_claims
 
 User = get_user_model()
 
@@ -10,6 +12,13 @@ User = get_user_model()
 class JWTAuthentication(BaseJWTAuthentication):
     """
     Custom JWT authentication that extends simplejwt with debug mock-token support.
+
+    With settings.JWT_CACHED_USER enabled the user is built from the token's
+    profile claims (id, email, name) and only its token version, active flag
+    and role are read, from a short-lived cache, instead of
+    fetching the User on every request. Tokens issued before the claims
+    existed fall back to the database. In both modes tokens whose version
+    claim no longer matches User.token_version are rejected.
     """
 
     def authenticate(self, request):
@@ -35,5 +44,28 @@ class JWTAuthentication(BaseJWTAuthentication):
         except (InvalidToken, TokenError) as e:
             raise AuthenticationFailed(str(e))
 
+    def get_user(self, validated_token):
+        if not getattr(settings, 'JWT_CACHED_USER', False):
+            user = super().get_user(validated_token)
+        else:
+            try:
+                user_id = validated_token[api_settings.USER_ID_CLAIM]
+            except KeyError:
+                raise InvalidToken('Token contained no recognizable user identification')
+
+            state = get_user_state(user_id)
+            if state is None:
+                raise AuthenticationFailed('User not found', code='user_not_found')
+            if not state['is_active']:
+                raise AuthenticationFailed('User is inactive', code='user_inactive')
+            if all(claim in validated_token for claim in PROFILE_CLAIMS):
+                user = user_from_claims(validated_token, user_id, state)
+            else:
+                user = super().get_user(validated_token)
+
+        if is_token_revoked(validated_token, user):
+            raise AuthenticationFailed('Token has been revoked', code='token_revoked')
+        return user
+
     def authenticate_header(self, request):
         return 'Bearer'
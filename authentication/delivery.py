@@ -0,0 +1,110 @@
+"""
+Delivery backends for queued transactional email.
+
+A backend receives a batch of OutboundEmail rows and returns a dict mapping
+each failed row id to its error message. Select one with
+settings.EMAIL_DELIVERY_BACKEND; the console, file and locmem backends never
+touch the network and are meant for development and tests.
+"""
+import os
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+
+class BaseDeliveryBackend:
+    def send_batch(self, emails):
+        raise NotImplementedError
+
+
+class ResendBackend(BaseDeliveryBackend):
+    """Sends through the Resend batch API, up to 100 messages per call."""
+    max_batch_size = 100
+    rate_limited = True
+
+    def send_batch(self, emails):
+        import resend
+
+        resend.api_key = settings.RESEND_API_KEY
+        params = [
+            {
+                'from': email.from_email or settings.RESEND_FROM_EMAIL,
+                'to': [email.to_email],
+                'subject': email.subject,
+                'html': email.html_body,
+            }
+            for email in emails
+        ]
+        try:
+            if len(params) == 1:
+                resend.Emails.send(params[0])
+            else:
+                resend.Batch.send(params)
+        except Exception as e:
+            return {email.pk: str(e) for email in emails}
+        return {}
+
+
+class ConsoleBackend(BaseDeliveryBackend):
+    def send_batch(self, emails):
+        for email in emails:
+            print(f"[EMAIL] To: {email.to_email} | Subject: {email.subject}")
+        return {}
+
+
+class FileBackend(BaseDeliveryBackend):
+    """Writes each message to EMAIL_FILE_PATH as an .html file."""
+
+    def send_batch(self, emails):
+        path = getattr(settings, 'EMAIL_FILE_PATH', os.path.join(settings.BASE_DIR, 'sent_emails'))
+        os.makedirs(path, exist_ok=True)
+        for email in emails:
+            filename = os.path.join(path, f"{email.pk}-{email.to_email}.html")
+            with open(filename, 'w', encoding='utf-8') as fh:
+                fh.write(f"<!-- To: {email.to_email} | Subject: {email.subject} -->\n")
+                fh.write(email.html_body)
+        return {}
+
+
+class LocmemBackend(BaseDeliveryBackend):
+    """Collects messages in LocmemBackend.outbox."""
+    outbox = []
+
+    def send_batch(self, emails):
+        LocmemBackend.outbox.extend(emails)
+        return {}
+
+
+def get_delivery_backend():
+    path = getattr(settings, 'EMAIL_DELIVERY_BACKEND', None)
+    if not path:
+        path = (
+            'authentication.delivery.ResendBackend'
+            if settings.RESEND_API_KEY
+            else 'authentication.delivery.ConsoleBackend'
+        )
+    return import_string(path)()
+
+
+def acquire_send_slot(timeout=10):
+    """
+    Block until the shared per-second provider budget
+    (EMAIL_RATE_LIMIT_PER_SECOND API calls across all workers) has room.
+    Returns False if no slot frees up within timeout seconds.
+    """
+    limit = getattr(settings, 'EMAIL_RATE_LIMIT_PER_SECOND', 2)
+    deadline = time.monotonic() + timeout
+    while True:
+        key = f"emailrate:{int(time.time())}"
+        cache.add(key, 0, 5)
+        try:
+            used = cache.incr(key)
+        except ValueError:
+            used = 1
+            cache.set(key, used, 5)
+        if used <= limit:
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(1 - (time.time() % 1))
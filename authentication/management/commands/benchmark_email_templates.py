@@ -0,0 +1,54 @@
+import time
+from django.core.management.base import BaseCommand
+from utils.email import render_email, render_emails
+
+
+class Command(BaseCommand):
+    help = 'Measure email template renders per second (single and batch)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20000, help='Renders per measurement')
+
+    def _report(self, label, count, elapsed):
+        self.stdout.write(f"{label:<32} {count / elapsed:>12,.0f} renders/s")
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+
+        # The first render compiles each template into the cached loader
+        start = time.perf_counter()
+        render_email(
+            'code', heading='Verify your TableTap account', first_name='Ama',
+            intro='Your verification code is:', code='000000', expires_minutes=15,
+        )
+        render_emails('staff_invitation', [{}])
+        self.stdout.write(f"First renders (compile) in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+        start = time.perf_counter()
+        for i in range(iterations):
+            render_email(
+                'code', heading='Verify your TableTap account', first_name='Ama',
+                intro='Your verification code is:', code=f"{i:06d}", expires_minutes=15,
+            )
+        self._report('code (single)', iterations, time.perf_counter() - start)
+
+        contexts = [
+            {
+                'email': f"staff{i}@example.com",
+                'greeting': f"Hi Staff {i},",
+                'role_name': 'Waiter',
+                'role_description': 'access to the POS system and order processing',
+                'tenant_name': 'Demo Restaurant',
+                'signup_url': f"https://tabletap.space/auth/signup?invited=1&t=token-{i}",
+            }
+            for i in range(iterations)
+        ]
+
+        start = time.perf_counter()
+        for context in contexts:
+            render_email('staff_invitation', **context)
+        self._report('staff_invitation (single)', iterations, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        render_emails('staff_invitation', contexts)
+        self._report('staff_invitation (batch)', iterations, time.perf_counter() - start)
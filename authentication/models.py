@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 import secrets
 import string
 
@@ -25,6 +26,9 @@ class User(AbstractUser):
     password_reset_token = models.CharField(max_length=10, null=True, blank=True)
     password_reset_token_expires = models.DateTimeField(null=True, blank=True)
 
+    # Bumped to revoke every JWT issued to this user (see authentication.tokens)
+    token_version = models.PositiveIntegerField(default=0)
+
     def generate_verification_code(self):
         code = ''.join(secrets.choice(string.digits) for _ in range(6))
         from django.utils import timezone
@@ -43,19 +47,57 @@ class User(AbstractUser):
         self.save(update_fields=['password_reset_token', 'password_reset_token_expires'])
         return code
 
-    def get_tenant_role(self):
+    def get_tenant_role(self, tenant=None):
         from django.db import connection
         from tenants.models import Tenant
         schema_name = connection.schema_name
         if schema_name == 'public':
             return self.role
-        try:
-            tenant = Tenant.objects.get(schema_name=schema_name)
-            if tenant.owner_id and tenant.owner_id == self.pk:
-                return 'owner'
-            return self.role
-        except Tenant.DoesNotExist:
-            return self.role
+        if tenant is None:
+            # set_tenant() leaves the active tenant on the connection; only
+            # fall back to a lookup when the schema was set by name.
+            tenant = getattr(connection, 'tenant', None)
+        if not isinstance(tenant, Tenant) or tenant.schema_name != schema_name:
+            try:
+                tenant = Tenant.objects.get(schema_name=schema_name)
+            except Tenant.DoesNotExist:
+                return self.role
+        if tenant.owner_id and tenant.owner_id == self.pk:
+            return 'owner'
+        return self.role
 
     def __str__(self):
         return self.email or self.username
+
+
+class OutboundEmail(models.Model):
+    """Transactional email queued for delivery by authentication.tasks."""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    to_email = models.EmailField()
+    from_email = models.CharField(max_length=255, blank=True)
+    subject = models.CharField(max_length=255)
+    html_body = models.TextField()
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['next_attempt_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to_email} ({self.status})"
@@ -94,28 +94,39 @@ def provision_tenant_for_user(user, restaurant_name=None):
     return tenant, tenant_created
 
 
-def send_email_via_resend(to_email, subject, html_body):
-    """Send an email using the Resend API."""
-    from django.conf import settings
-    import resend
-
-    api_key = getattr(settings, 'RESEND_API_KEY', '')
-    from_email = getattr(settings, 'RESEND_FROM_EMAIL', 'onboarding@resend.dev')
-
-    if not api_key:
-        print(f"[EMAIL] RESEND_API_KEY not set — skipping email to {to_email}")
-        print(f"[EMAIL] Subject: {subject}")
-        return False
-
-    try:
-        resend.api_key = api_key
-        resend.Emails.send({
-            "from": from_email,
-            "to": [to_email],
-            "subject": subject,
-            "html": html_body,
-        })
-        return True
-    except Exception as e:
-        print(f"[EMAIL] Failed to send email to {to_email}: {e}")
-        return False
+def queue_email(to_email, subject, html_body, from_email=''):
+    """
+    Queue a transactional email. Delivery happens in
+    authentication.tasks.deliver_outbound_emails once the current
+    transaction commits, so callers never wait on the provider.
+    """
+    from django.db import transaction
+    from .models import OutboundEmail
+    from .tasks import deliver_outbound_emails
+
+    email = OutboundEmail.objects.create(
+        to_email=to_email,
+        from_email=from_email,
+        subject=subject,
+        html_body=html_body,
+    )
+    transaction.on_commit(deliver_outbound_emails.delay)
+    return email
+
+
+def queue_emails(messages):
+    """
+    Queue many emails in one INSERT. messages is an iterable of
+    (to_email, subject, html_body, from_email) tuples.
+    """
+    from django.db import transaction
+    from .models import OutboundEmail
+    from .tasks import deliver_outbound_emails
+
+    emails = OutboundEmail.objects.bulk_create([
+        OutboundEmail(to_email=to_email, subject=subject, html_body=html_body, from_email=from_email or '')
+        for to_email, subject, html_body, from_email in messages
+    ])
+    if emails:
+        transaction.on_commit(deliver_outbound_emails.delay)
+    return emails
@@ -0,0 +1,92 @@
+from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from datetime import timedelta
+from .delivery import get_delivery_backend, acquire_send_slot
+from .models import OutboundEmail
+
+STUCK_SENDING_AFTER = timedelta(minutes=10)
+
+
+def _retry_delay(attempts):
+    base = getattr(settings, 'EMAIL_RETRY_BASE_SECONDS', 30)
+    return timedelta(seconds=min(base * (2 ** (attempts - 1)), 6 * 3600))
+
+
+def _claim_due_emails(limit):
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            OutboundEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='queued', next_attempt_at__lte=now)
+            .order_by('next_attempt_at')
+            .values_list('id', flat=True)[:limit]
+        )
+        if ids:
+            OutboundEmail.objects.filter(id__in=ids).update(status='sending', updated_at=now)
+    return list(OutboundEmail.objects.filter(id__in=ids).order_by('next_attempt_at'))
+
+
+def _record_results(emails, failures):
+    now = timezone.now()
+    max_attempts = getattr(settings, 'EMAIL_MAX_ATTEMPTS', 5)
+
+    sent_ids = [e.pk for e in emails if e.pk not in failures]
+    if sent_ids:
+        OutboundEmail.objects.filter(id__in=sent_ids).update(
+            status='sent', sent_at=now, last_error='', updated_at=now,
+        )
+
+    for email in emails:
+        if email.pk not in failures:
+            continue
+        email.attempts += 1
+        email.last_error = failures[email.pk][:2000]
+        if email.attempts >= max_attempts:
+            email.status = 'failed'
+        else:
+            email.status = 'queued'
+            email.next_attempt_at = now + _retry_delay(email.attempts)
+        email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at', 'updated_at'])
+
+
+@shared_task(bind=True)
+def deliver_outbound_emails(self):
+    """
+    Drain due emails from the outbox in provider-sized batches, respecting
+    the shared provider rate limit. Failed sends are retried with
+    exponential backoff until EMAIL_MAX_ATTEMPTS.
+
+    When run eagerly (inside the caller's request) it never waits for a rate
+    limit slot or re-enqueues itself; leftovers go to the beat sweep.
+    """
+    eager = self.request.is_eager
+    OutboundEmail.objects.filter(
+        status='sending', updated_at__lt=timezone.now() - STUCK_SENDING_AFTER,
+    ).update(status='queued')
+
+    backend = get_delivery_backend()
+    batch_size = getattr(backend, 'max_batch_size', getattr(settings, 'EMAIL_BATCH_SIZE', 50))
+    max_batches = getattr(settings, 'EMAIL_MAX_BATCHES_PER_RUN', 20)
+
+    delivered = 0
+    for _ in range(max_batches):
+        emails = _claim_due_emails(batch_size)
+        if not emails:
+            break
+        if getattr(backend, 'rate_limited', False) and not acquire_send_slot(timeout=0 if eager else 10):
+            OutboundEmail.objects.filter(id__in=[e.pk for e in emails]).update(status='queued')
+            if not eager:
+                deliver_outbound_emails.apply_async(countdown=1)
+            break
+        failures = backend.send_batch(emails)
+        _record_results(emails, failures)
+        delivered += len(emails) - len(failures)
+    else:
+        # Outbox still has work; continue in a fresh task instead of hogging this one
+        if not eager:
+            deliver_outbound_emails.delay()
+
+    return f"Delivered {delivered} emails."
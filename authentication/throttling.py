@@ -0,0 +1,137 @@
+"""
+Sliding-window throttles for the unauthenticated auth endpoints.
+
+Counters live in the default cache (Redis in production, locmem in
+development). DRF runs throttles before the view body, so a rejected attempt
+never reaches password hashing or code generation.
+"""
+import logging
+import time
+from django.core.cache import cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+logger = logging.getLogger(__name__)
+
+
+def _rejection_key(scope):
+    return f"throttle:rejections:{scope}"
+
+
+def record_rejection(scope):
+    key = _rejection_key(scope)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def get_rejection_counts():
+    """Rejections per throttle scope since the counters were last reset."""
+    scopes = list(api_settings.DEFAULT_THROTTLE_RATES)
+    counts = cache.get_many([_rejection_key(scope) for scope in scopes])
+    return {scope: counts.get(_rejection_key(scope), 0) for scope in scopes}
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """
+    Sliding-window counter: the previous fixed window's count is weighted by
+    how much of it still overlaps the sliding window. Subclasses set `scope`
+    (a key in DEFAULT_THROTTLE_RATES) and implement get_ident_value().
+    """
+    cache = cache
+
+    def get_ident_value(self, request):
+        raise NotImplementedError
+
+    def get_cache_key(self, request, view):
+        value = self.get_ident_value(request)
+        if not value:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': str(value).strip().lower()}
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+
+        now = time.time()
+        window = int(now // self.duration)
+        current_key = f"{key}:{window}"
+        previous_key = f"{key}:{window - 1}"
+        counts = self.cache.get_many([current_key, previous_key])
+        current = counts.get(current_key, 0)
+        previous = counts.get(previous_key, 0)
+        overlap = 1 - (now % self.duration) / self.duration
+
+        if current + previous * overlap >= self.num_requests:
+            self._wait = self.duration - now % self.duration
+            record_rejection(self.scope)
+            logger.warning("[Throttle] %s rejected for %s", self.scope, key)
+            return False
+
+        self.cache.add(current_key, 0, self.duration * 2)
+        try:
+            self.cache.incr(current_key)
+        except ValueError:
+            self.cache.set(current_key, 1, self.duration * 2)
+        return True
+
+    def wait(self):
+        return getattr(self, '_wait', None)
+
+
+class _IPThrottle(SlidingWindowThrottle):
+    def get_ident_value(self, request):
+        return self.get_ident(request)
+
+
+def _data_value(request, field):
+    data = request.data
+    return data.get(field) if hasattr(data, 'get') else None
+
+
+class _EmailThrottle(SlidingWindowThrottle):
+    def get_ident_value(self, request):
+        return _data_value(request, 'email')
+
+
+class _UserIdThrottle(SlidingWindowThrottle):
+    def get_ident_value(self, request):
+        return _data_value(request, 'userId')
+
+
+class LoginIPThrottle(_IPThrottle):
+    scope = 'login_ip'
+
+
+class LoginEmailThrottle(_EmailThrottle):
+    scope = 'login_email'
+
+
+class VerifyEmailIPThrottle(_IPThrottle):
+    scope = 'verify_email_ip'
+
+
+class VerifyEmailUserThrottle(_UserIdThrottle):
+    scope = 'verify_email_user'
+
+
+class PasswordResetIPThrottle(_IPThrottle):
+    scope = 'password_reset_ip'
+
+
+class PasswordResetEmailThrottle(_EmailThrottle):
+    scope = 'password_reset_email'
+
+
+class PasswordResetConfirmIPThrottle(_IPThrottle):
+    scope = 'password_reset_confirm_ip'
+
+
+class PasswordResetConfirmUserThrottle(_UserIdThrottle):
+    scope = 'password_reset_confirm_user'
@@ -0,0 +1,90 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import F
+from rest_framework_simplejwt.tokens import RefreshToken
+
+TOKEN_VERSION_CLAIM = 'tv'
+
+
+class TableTapRefreshToken(RefreshToken):
+    """
+    Refresh token carrying the profile claims POS and console clients need
+    (copied onto every access token) plus the user's token version. Claims
+    hold the raw User field values so JWTAuthentication can rebuild the user.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['email'] = user.email
+        token['name'] = user.name
+        token['role'] = user.role
+        token['is_active'] = user.is_active
+        token[TOKEN_VERSION_CLAIM] = user.token_version
+        return token
+
+
+# Claims copied onto tokens by TableTapRefreshToken, mapped to User fields
+PROFILE_CLAIMS = ('email', 'name', 'role', 'is_active')
+
+
+def _user_cache_key(user_id):
+    return f"authstate:{user_id}"
+
+
+def get_user_state(user_id):
+    """
+    Return {'token_version', 'is_active', 'role'} for user_id from the
+    short-lived cache, loading it on a miss. Returns None if the user does not
+    exist. Only these values are cached: the first two decide whether a token
+    is still honoured, and role feeds permission checks, so it must not be
+    taken from a token issued before a role change. Saving a User drops the
+    entry (authentication.signals).
+    """
+    key = _user_cache_key(user_id)
+    state = cache.get(key)
+    if state is None:
+        User = get_user_model()
+        try:
+            row = User.objects.filter(pk=user_id).values('token_version', 'is_active', 'role').first()
+        except (ValueError, TypeError):
+            return None
+        if row is None:
+            return None
+        state = row
+        cache.set(key, state, getattr(settings, 'JWT_USER_CACHE_TTL', 300))
+    return state
+
+
+def user_from_claims(token, user_id, state):
+    """
+    A User built from the token's profile claims without a query. Fields not
+    carried by the token are deferred and loaded from the database on first
+    access, like any .only() instance. email and name may be stale, so views
+    that write to the user must save with update_fields.
+    """
+    User = get_user_model()
+    field_names = ['id', 'token_version', *PROFILE_CLAIMS]
+    values = [user_id, state['token_version'], *(token[claim] for claim in PROFILE_CLAIMS)]
+    user = User.from_db('default', field_names, values)
+    # The cached state is fresher than the claims
+    user.is_active = state['is_active']
+    user.role = state['role']
+    return user
+
+
+def invalidate_cached_user(user_id):
+    cache.delete(_user_cache_key(user_id))
+
+
+def is_token_revoked(token, user):
+    return token.get(TOKEN_VERSION_CLAIM, 0) != user.token_version
+
+
+def revoke_user_tokens(user):
+    """Invalidate every access and refresh token issued to user so far."""
+    User = get_user_model()
+    User.objects.filter(pk=user.pk).update(token_version=F('token_version') + 1)
+    user.refresh_from_db(fields=['token_version'])
+    invalidate_cached_user(user.pk)
@@ -1,19 +1,25 @@
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model
 from django.conf import settings
 from django.utils import timezone
 from tenants.models import Tenant
+from .throttling import (
+    LoginIPThrottle, LoginEmailThrottle,
+    VerifyEmailIPThrottle, VerifyEmailUserThrottle,
+    PasswordResetIPThrottle, PasswordResetEmailThrottle,
+    PasswordResetConfirmIPThrottle, PasswordResetConfirmUserThrottle,
+)
 import uuid
 
 User = get_user_model()
 
 
 def _jwt_tokens_for_user(user):
-    from rest_framework_simplejwt.tokens import RefreshToken
-    refresh = RefreshToken.for_user(user)
+    from .tokens import TableTapRefreshToken
+    refresh = TableTapRefreshToken.for_user(user)
     return {
         'access': str(refresh.access_token),
         'refresh': str(refresh),
@@ -67,24 +73,20 @@ def register(request):
 
 
 def _send_verification_email(user, code):
-    from .services import send_email_via_resend
-    html = f"""
-    <div style="font-family: Arial, sans-serif; max-width: 480px; margin: 0 auto;">
-      <h2 style="color: #f97316;">Verify your TableTap account</h2>
-      <p>Hi {user.first_name or 'there'},</p>
-      <p>Your verification code is:</p>
-      <div style="font-size: 32px; font-weight: bold; letter-spacing: 8px; color: #f97316;
-                  background: #fff7ed; padding: 16px 24px; border-radius: 8px; display: inline-block;">
-        {code}
-      </div>
-      <p style="color: #6b7280; margin-top: 16px;">This code expires in 15 minutes.</p>
-    </div>
-    """
-    send_email_via_resend(user.email, 'Verify your TableTap account', html)
+    from .services import queue_email
+    from utils.email import render_code_email
+    html = render_code_email(
+        user, code,
+        heading='Verify your TableTap account',
+        intro='Your verification code is:',
+        expires_minutes=15,
+    )
+    queue_email(user.email, 'Verify your TableTap account', html)
 
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([VerifyEmailIPThrottle, VerifyEmailUserThrottle])
 def verify_email(request):
     """Verify email with the 6-digit code. Returns JWT tokens on success."""
     user_id = request.data.get('userId')
@@ -126,6 +128,7 @@ def verify_email(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginIPThrottle, LoginEmailThrottle])
 def login(request):
     """Authenticate with email and password. Returns JWT tokens."""
     from django.contrib.auth import authenticate as django_authenticate
@@ -170,20 +173,26 @@ def login(request):
 @permission_classes([AllowAny])
 def token_refresh(request):
     """Refresh the access token using a refresh token."""
-    from rest_framework_simplejwt.tokens import RefreshToken
     from rest_framework_simplejwt.exceptions import TokenError
+    from rest_framework_simplejwt.settings import api_settings
+    from .tokens import TOKEN_VERSION_CLAIM, TableTapRefreshToken, get_user_state
     refresh_token = request.data.get('refresh')
     if not refresh_token:
         return Response({'error': 'Refresh token is required.'}, status=400)
     try:
-        token = RefreshToken(refresh_token)
-        return Response({'access': str(token.access_token)})
+        token = TableTapRefreshToken(refresh_token)
     except TokenError as e:
         return Response({'error': str(e)}, status=401)
 
+    state = get_user_state(token.get(api_settings.USER_ID_CLAIM))
+    if state is None or not state['is_active'] or token.get(TOKEN_VERSION_CLAIM, 0) != state['token_version']:
+        return Response({'error': 'Token has been revoked.'}, status=401)
+    return Response({'access': str(token.access_token)})
+
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([PasswordResetIPThrottle, PasswordResetEmailThrottle])
 def password_reset_request(request):
     """Send a 6-digit password reset code to the user's email."""
     email = (request.data.get('email') or '').strip().lower()
@@ -196,25 +205,21 @@ def password_reset_request(request):
         return Response({'status': 'sent'})
 
     code = user.generate_password_reset_code()
-    from .services import send_email_via_resend
-    html = f"""
-    <div style="font-family: Arial, sans-serif; max-width: 480px; margin: 0 auto;">
-      <h2 style="color: #f97316;">Reset your TableTap password</h2>
-      <p>Hi {user.first_name or 'there'},</p>
-      <p>Your password reset code is:</p>
-      <div style="font-size: 32px; font-weight: bold; letter-spacing: 8px; color: #f97316;
-                  background: #fff7ed; padding: 16px 24px; border-radius: 8px; display: inline-block;">
-        {code}
-      </div>
-      <p style="color: #6b7280; margin-top: 16px;">This code expires in 30 minutes.</p>
-    </div>
-    """
-    send_email_via_resend(user.email, 'Reset your TableTap password', html)
+    from .services import queue_email
+    from utils.email import render_code_email
+    html = render_code_email(
+        user, code,
+        heading='Reset your TableTap password',
+        intro='Your password reset code is:',
+        expires_minutes=30,
+    )
+    queue_email(user.email, 'Reset your TableTap password', html)
     return Response({'status': 'sent', 'userId': user.pk})
 
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([PasswordResetConfirmIPThrottle, PasswordResetConfirmUserThrottle])
 def password_reset_confirm(request):
     """Verify the reset code and set a new password. Returns JWT tokens."""
     user_id = request.data.get('userId')
@@ -241,7 +246,10 @@ def password_reset_confirm(request):
     user.password_reset_token = None
     user.password_reset_token_expires = None
     user.is_verified = True
-    user.save(update_fields=['password', 'password_reset_token', 'password_reset_token_expires', 'is_verified'])
+    user.token_version += 1
+    user.save(update_fields=[
+        'password', 'password_reset_token', 'password_reset_token_expires', 'is_verified', 'token_version',
+    ])
 
     tokens = _jwt_tokens_for_user(user)
     return Response({
@@ -255,6 +263,9 @@ def password_reset_confirm(request):
 @permission_classes([IsAuthenticated])
 def user_profile(request):
     """Get or update current user profile"""
+    from staff.context import get_permission_context
+    permission_context = get_permission_context(request)
+
     if request.method == 'GET':
         restaurant_id = getattr(request.tenant, 'id', None) if hasattr(request, 'tenant') else None
         return Response({
@@ -263,7 +274,7 @@ def user_profile(request):
                 'firstName': request.user.first_name,
                 'lastName': request.user.last_name,
                 'email': request.user.email,
-                'role': request.user.get_tenant_role(),
+                'role': permission_context.role,
                 'restaurantId': str(restaurant_id) if restaurant_id else None,
             },
             'meta': {
@@ -274,22 +285,29 @@ def user_profile(request):
 
     user = request.user
     data = request.data
+    # Only write what the client sent: with JWT_CACHED_USER request.user is
+    # built from token claims, and a full save would write those back
+    changed = []
     if 'firstName' in data:
         user.first_name = data['firstName']
+        changed.append('first_name')
     if 'lastName' in data:
         user.last_name = data['lastName']
+        changed.append('last_name')
     if 'email' in data:
         user.email = data['email']
+        changed.append('email')
 
     try:
-        user.save()
+        if changed:
+            user.save(update_fields=changed)
         return Response({
             'success': True,
             'data': {
                 'firstName': user.first_name,
                 'lastName': user.last_name,
                 'email': user.email,
-                'role': user.get_tenant_role(),
+                'role': permission_context.role,
                 'restaurantId': str(getattr(request.tenant, 'id', None)) if hasattr(request, 'tenant') else None,
             },
             'message': 'Profile updated successfully',
@@ -311,8 +329,6 @@ def user_profile(request):
 @permission_classes([IsAuthenticated])
 def user_tenant(request):
     """Get user's tenant information, discovering or provisioning one if needed."""
-    from django.db import connection as _conn
-    _conn.set_schema_to_public()
     tenant = None
 
     try:
@@ -367,6 +383,7 @@ def provision_tenant(request):
     Idempotent — safe to call even if the tenant already exists.
     """
     from django.db import connection
+    # Tenant creation (django_tenants) refuses to run outside the public schema
     connection.set_schema_to_public()
 
     from django_tenants.utils import tenant_context as _tc
@@ -412,8 +429,6 @@ def link_staff_account(request):
     Links the new account to the correct placeholder user and returns their tenant slug.
     """
     from django.core import signing
-    from django.db import connection as _conn
-    _conn.set_schema_to_public()
 
     token = request.data.get('token', '').strip()
     if not token:
@@ -474,6 +489,9 @@ def link_staff_account(request):
                     )
             except Exception as del_err:
                 print(f"[LINK STAFF] Could not delete duplicate user {new_user.id}: {del_err}")
+            # Raw SQL bypasses the post_delete signal, so drop the cached row explicitly
+            from .tokens import invalidate_cached_user
+            invalidate_cached_user(new_user.id)
 
     from django_tenants.utils import tenant_context as _tc
     from staff.models import StaffMember as _SM
@@ -0,0 +1,202 @@
+"""
+Bulk menu import.
+
+Accepts a whole menu as JSON or CSV, validates every row up front and
+upserts categories and items with one INSERT ... ON CONFLICT each, keyed on
+category name and (category, name). Names are matched case-insensitively:
+a row for "burger" updates an existing "Burger" and keeps its spelling.
+bulk_create skips model signals, so
+the snapshot rebuild and ETag bump are scheduled once by the caller of
+import_menu rather than once per row.
+"""
+import csv
+import io
+from django.db import transaction
+from django.db.models.functions import Lower
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from .models import Category, MenuItem
+
+MAX_IMPORT_ROWS = 2000
+# Tried in order; Excel on Windows exports CSV as cp1252
+CSV_ENCODINGS = ('utf-8-sig', 'cp1252')
+
+CSV_COLUMN_ALIASES = {
+    'category_priority': 'categoryPriority',
+    'image_url': 'imageUrl',
+    'is_available': 'isAvailable',
+}
+
+
+class CSVTextParser(BaseParser):
+    """Passes a text/csv request body through as a string."""
+    media_type = 'text/csv'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return decode_csv(stream.read())
+        except ValueError as e:
+            raise ParseError(str(e))
+
+
+def decode_csv(data):
+    """Decode an uploaded CSV as UTF-8, falling back to cp1252. Raises ValueError if neither fits."""
+    for encoding in CSV_ENCODINGS:
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    raise ValueError('The CSV file must be UTF-8 or Windows-1252 encoded.')
+
+
+class ImportRowSerializer(serializers.Serializer):
+    category = serializers.CharField(max_length=100)
+    categoryPriority = serializers.IntegerField(required=False, allow_null=True)
+    name = serializers.CharField(max_length=200)
+    description = serializers.CharField(required=False, allow_blank=True, default='')
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0)
+    imageUrl = serializers.URLField(max_length=500, required=False, allow_blank=True, allow_null=True)
+    isAvailable = serializers.BooleanField(required=False, default=True)
+
+
+def rows_from_csv(text):
+    reader = csv.DictReader(io.StringIO(text.lstrip('\ufeff')))
+    rows = []
+    for raw in reader:
+        row = {}
+        for column, value in raw.items():
+            if column is None:
+                continue
+            column = column.strip()
+            value = (value or '').strip()
+            if value == '' and column != 'description':
+                continue
+            row[CSV_COLUMN_ALIASES.get(column, column)] = value
+        rows.append(row)
+    return rows
+
+
+def rows_from_json(data):
+    """
+    Flatten a JSON payload into item rows. Accepts {"items": [...]} with a
+    `category` per item, {"categories": [{"name", "priority", "items"}]},
+    or both. A bare list is treated as the items list.
+    """
+    if isinstance(data, list):
+        data = {'items': data}
+    rows = []
+    for category in data.get('categories') or []:
+        if not isinstance(category, dict):
+            continue
+        for item in category.get('items') or []:
+            if isinstance(item, dict):
+                rows.append({
+                    **item,
+                    'category': category.get('name'),
+                    'categoryPriority': category.get('priority'),
+                })
+    rows.extend(item for item in data.get('items') or [] if isinstance(item, dict))
+    return rows
+
+
+def validate_rows(rows):
+    """Validate all rows in one pass. Returns (validated_rows, errors)."""
+    if not rows:
+        return [], {'rows': ['No menu items found in the upload.']}
+    if len(rows) > MAX_IMPORT_ROWS:
+        return [], {'rows': [f'Imports are limited to {MAX_IMPORT_ROWS} items.']}
+
+    serializer = ImportRowSerializer(data=rows, many=True)
+    errors = {}
+    if not serializer.is_valid():
+        errors = {str(index): row_errors for index, row_errors in enumerate(serializer.errors) if row_errors}
+        return [], errors
+
+    seen = {}
+    for index, row in enumerate(serializer.validated_data):
+        key = (row['category'].strip().lower(), row['name'].strip().lower())
+        if key in seen:
+            errors[str(index)] = {'name': [f"Duplicate of row {seen[key]}."]}
+        else:
+            seen[key] = index
+    return serializer.validated_data, errors
+
+
+def _canonical_names(existing, names):
+    """Map each name to an existing spelling (case-insensitive) or its first spelling in the upload."""
+    canonical = {}
+    for name in existing:
+        canonical.setdefault(name.lower(), name)
+    for name in names:
+        canonical.setdefault(name.lower(), name)
+    return canonical
+
+
+@transaction.atomic
+def import_menu(rows, tenant=None):
+    """Upsert validated rows. Returns counts for the audit summary."""
+    lowered = {row['category'].strip().lower() for row in rows}
+    existing_categories = list(
+        Category.objects.annotate(lname=Lower('name')).filter(lname__in=lowered).values_list('name', flat=True)
+    )
+    category_names = _canonical_names(existing_categories, (row['category'].strip() for row in rows))
+
+    priorities = {}
+    for row in rows:
+        name = category_names[row['category'].strip().lower()]
+        priority = row.get('categoryPriority')
+        if priority is not None or name not in priorities:
+            priorities[name] = priority
+
+    with_priority = [
+        Category(tenant=tenant, name=name, priority=priority)
+        for name, priority in priorities.items() if priority is not None
+    ]
+    without_priority = [
+        Category(tenant=tenant, name=name)
+        for name, priority in priorities.items() if priority is None
+    ]
+    if with_priority:
+        Category.objects.bulk_create(
+            with_priority, update_conflicts=True,
+            unique_fields=['name'], update_fields=['priority', 'updated_at'],
+        )
+    if without_priority:
+        Category.objects.bulk_create(without_priority, ignore_conflicts=True)
+
+    category_ids = dict(Category.objects.filter(name__in=priorities).values_list('name', 'id'))
+    existing_items = {}
+    item_rows = MenuItem.objects.filter(category_id__in=category_ids.values()).values_list('category_id', 'name')
+    for category_id, name in item_rows:
+        existing_items.setdefault((category_id, name.lower()), name)
+
+    items = []
+    items_updated = 0
+    for row in rows:
+        category_id = category_ids[category_names[row['category'].strip().lower()]]
+        name = row['name'].strip()
+        existing_name = existing_items.get((category_id, name.lower()))
+        if existing_name is not None:
+            items_updated += 1
+        items.append(MenuItem(
+            tenant=tenant,
+            category_id=category_id,
+            name=existing_name or name,
+            description=row.get('description', ''),
+            price=row['price'],
+            imageUrl=row.get('imageUrl') or None,
+            isAvailable=row.get('isAvailable', True),
+        ))
+    MenuItem.objects.bulk_create(
+        items, update_conflicts=True,
+        unique_fields=['category', 'name'],
+        update_fields=['description', 'price', 'imageUrl', 'isAvailable', 'updated_at'],
+    )
+
+    return {
+        'categories_created': len(priorities) - len(set(existing_categories) & set(priorities)),
+        'categories_total': len(priorities),
+        'items_created': len(items) - items_updated,
+        'items_updated': items_updated,
+    }
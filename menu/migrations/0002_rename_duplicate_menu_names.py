@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:31
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def rename_duplicates(apps, schema_editor):
+    """Suffix duplicate names with the row id so 0003 can add the unique constraints."""
+    Category = apps.get_model('menu', 'Category')
+    MenuItem = apps.get_model('menu', 'MenuItem')
+
+    duplicate_names = (
+        Category.objects.values('name').annotate(n=Count('id')).filter(n__gt=1).values_list('name', flat=True)
+    )
+    for name in list(duplicate_names):
+        for category in Category.objects.filter(name=name).order_by('id')[1:]:
+            category.name = f"{name[:100 - len(str(category.id)) - 3]} ({category.id})"
+            category.save(update_fields=['name'])
+
+    duplicate_items = (
+        MenuItem.objects.values('category_id', 'name').annotate(n=Count('id')).filter(n__gt=1)
+    )
+    for row in list(duplicate_items):
+        items = MenuItem.objects.filter(category_id=row['category_id'], name=row['name']).order_by('id')[1:]
+        for item in items:
+            item.name = f"{row['name'][:200 - len(str(item.id)) - 3]} ({item.id})"
+            item.save(update_fields=['name'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_duplicates, migrations.RunPython.noop),
+    ]
@@ -11,6 +11,9 @@ class Category(models.Model):
     class Meta:
         verbose_name_plural = 'Categories'
         ordering = ['priority', 'name']
+        constraints = [
+            models.UniqueConstraint(fields=['name'], name='menu_category_unique_name'),
+        ]
 
     def __str__(self):
         return self.name
@@ -29,6 +32,9 @@ class MenuItem(models.Model):
 
     class Meta:
         ordering = ['name']
+        constraints = [
+            models.UniqueConstraint(fields=['category', 'name'], name='menu_item_unique_category_name'),
+        ]
 
     def __str__(self):
         return self.name
@@ -0,0 +1,14 @@
+"""Pusher broadcasts on the per-tenant `menu-{slug}` channel, used by guest menus and POS terminals."""
+from orders.pusher_client import get_pusher_client
+
+
+def trigger_menu_event(tenant, event, data):
+    try:
+        client = get_pusher_client()
+        if not client:
+            return
+        channel = f"menu-{tenant.slug}"
+        client.trigger(channel, event, data)
+        print(f"[Pusher] Triggered '{event}' on '{channel}'")
+    except Exception as e:
+        print(f"[Pusher] Error triggering event: {str(e)}")
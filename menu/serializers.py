@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from rest_framework.validators import UniqueTogetherValidator, UniqueValidator
 from .models import Category, MenuItem
 
 class MenuItemSerializer(serializers.ModelSerializer):
@@ -11,6 +12,13 @@ class MenuItemSerializer(serializers.ModelSerializer):
             'price', 'imageUrl', 'isAvailable', 'created_at', 'updated_at'
         ]
         read_only_fields = ['tenant']
+        validators = [
+            UniqueTogetherValidator(
+                queryset=MenuItem.objects.all(),
+                fields=['category', 'name'],
+                message='An item with this name already exists in this category.',
+            ),
+        ]
 
 class CategorySerializer(serializers.ModelSerializer):
     items = MenuItemSerializer(many=True, read_only=True)
@@ -19,3 +27,6 @@ class CategorySerializer(serializers.ModelSerializer):
         model = Category
         fields = ['id', 'tenant', 'name', 'priority', 'items', 'created_at', 'updated_at']
         read_only_fields = ['tenant']
+        extra_kwargs = {
+            'name': {'validators': [UniqueValidator(queryset=Category.objects.all())]},
+        }
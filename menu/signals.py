@@ -0,0 +1,14 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from utils.conditional import bump_on_commit
+from .models import Category, MenuItem
+from .snapshot import schedule_rebuild
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=MenuItem)
+@receiver(post_delete, sender=MenuItem)
+def rebuild_menu_snapshot(sender, **kwargs):
+    schedule_rebuild()
+    bump_on_commit('menu')
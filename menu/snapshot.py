@@ -0,0 +1,136 @@
+"""
+Pre-serialized, versioned menu snapshots.
+
+Each tenant's full menu (categories with nested items) is serialized once
+into a JSON document and cached under the tenant schema. The version is a
+content hash, so it doubles as the ETag. Category and MenuItem writes
+schedule a single rebuild when the surrounding transaction commits, or drop
+the snapshot when they run outside one.
+"""
+import hashlib
+import json
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+from django_tenants.utils import schema_context
+from rest_framework.utils.encoders import JSONEncoder
+from utils.cache import cache_lock
+
+LOCK_TIMEOUT = 10
+
+
+def _cache_key(schema_name):
+    return f"menu:snapshot:{schema_name}"
+
+
+def _lock_key(schema_name):
+    return f"{_cache_key(schema_name)}:lock"
+
+
+def _encode(data):
+    return json.dumps(data, cls=JSONEncoder, separators=(',', ':')).encode('utf-8')
+
+
+def _versioned_body(categories_json):
+    version = hashlib.sha256(categories_json).hexdigest()[:32]
+    return version, b'{"version":"' + version.encode() + b'","categories":' + categories_json + b'}'
+
+
+def build_snapshot(schema_name):
+    """
+    Serialize the tenant's whole menu in two queries and cache it. Holds the
+    snapshot lock from the read to the write so a concurrent availability
+    patch is applied on top of the result instead of being overwritten. If
+    the lock is busy the snapshot is returned without being cached.
+    """
+    from .models import Category
+    from .serializers import CategorySerializer
+
+    with cache_lock(_lock_key(schema_name), LOCK_TIMEOUT) as locked:
+        with schema_context(schema_name):
+            categories = Category.objects.prefetch_related('items')
+            data = CategorySerializer(categories, many=True).data
+
+        version, body = _versioned_body(_encode(data))
+        snapshot = {
+            'version': version,
+            'built_at': timezone.now().isoformat(),
+            'item_count': sum(len(category['items']) for category in data),
+            'body': body,
+        }
+        if locked:
+            cache.set(_cache_key(schema_name), snapshot, None)
+    return snapshot
+
+
+def get_snapshot(schema_name):
+    """Return the cached snapshot for a tenant, building it on a miss."""
+    snapshot = cache.get(_cache_key(schema_name))
+    if snapshot is None:
+        snapshot = build_snapshot(schema_name)
+    return snapshot
+
+
+def invalidate_snapshot(schema_name):
+    cache.delete(_cache_key(schema_name))
+
+
+def schedule_rebuild(schema_name=None):
+    """
+    Rebuild the snapshot once the current transaction commits. Schemas with a
+    pending rebuild are tracked on the connection, so repeated calls inside
+    one transaction (e.g. a bulk import) collapse into a single rebuild: the
+    first callback to run rebuilds and the rest find nothing pending. Outside
+    a transaction the snapshot is only dropped and the next read rebuilds it.
+    """
+    schema_name = schema_name or connection.schema_name
+    if not connection.in_atomic_block:
+        invalidate_snapshot(schema_name)
+        return
+
+    pending = getattr(connection, 'menu_snapshot_pending', None)
+    if pending is None:
+        pending = connection.menu_snapshot_pending = set()
+    pending.add(schema_name)
+
+    def _rebuild():
+        if schema_name not in pending:
+            return
+        pending.discard(schema_name)
+        invalidate_snapshot(schema_name)
+        build_snapshot(schema_name)
+
+    transaction.on_commit(_rebuild)
+
+
+def patch_availability(schema_name, changes, updated_at):
+    """
+    Apply {item_id: is_available} to the cached snapshot in place instead of
+    rebuilding it, stamping changed items with `updated_at` (the value written
+    to the rows). Runs under the rebuild lock. Returns the new version, or
+    None when nothing is cached or the lock is busy (the snapshot is then
+    dropped and the next read builds a fresh one).
+    """
+    from rest_framework.fields import DateTimeField
+
+    key = _cache_key(schema_name)
+    with cache_lock(_lock_key(schema_name), LOCK_TIMEOUT) as locked:
+        if not locked:
+            cache.delete(key)
+            return None
+        snapshot = cache.get(key)
+        if snapshot is None:
+            return None
+
+        categories = json.loads(snapshot['body'])['categories']
+        updated_at = DateTimeField().to_representation(updated_at)
+        for category in categories:
+            for item in category['items']:
+                # The UPDATE stamps every listed row, changed or not
+                if item['id'] in changes:
+                    item['isAvailable'] = changes[item['id']]
+                    item['updated_at'] = updated_at
+
+        version, body = _versioned_body(_encode(categories))
+        cache.set(key, {**snapshot, 'version': version, 'body': body}, None)
+    return version
@@ -1,11 +1,13 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CategoryViewSet, MenuItemViewSet
+from .views import CategoryViewSet, MenuItemViewSet, menu_snapshot, menu_import
 
 router = DefaultRouter()
 router.register(r'categories', CategoryViewSet)
 router.register(r'items', MenuItemViewSet)
 
 urlpatterns = [
+    path('snapshot/', menu_snapshot, name='menu_snapshot'),
+    path('import/', menu_import, name='menu_import'),
     path('', include(router.urls)),
 ]
@@ -1,19 +1,202 @@
+from django.db import transaction
+from django.http import HttpResponse
+from django_tenants.utils import get_public_schema_name
 from rest_framework import viewsets, permissions
+from rest_framework.decorators import action, api_view, authentication_classes, parser_classes, permission_classes
+from rest_framework.parsers import JSONParser, MultiPartParser
+from rest_framework.response import Response
+from .importer import CSVTextParser
 from .models import Category, MenuItem
 from .serializers import CategorySerializer, MenuItemSerializer
+from utils.conditional import ConditionalGetMixin, etag_matches
+from .snapshot import get_snapshot
+from staff.permissions import requires_module
 
-class CategoryViewSet(viewsets.ModelViewSet):
-    queryset = Category.objects.all()
+class CategoryViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    conditional_namespace = 'menu'
+    queryset = Category.objects.prefetch_related('items')
     serializer_class = CategorySerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
     def perform_create(self, serializer):
         serializer.save(tenant=self.request.tenant)
 
-class MenuItemViewSet(viewsets.ModelViewSet):
-    queryset = MenuItem.objects.all()
+class MenuItemViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    conditional_namespace = 'menu'
+    queryset = MenuItem.objects.select_related('category')
     serializer_class = MenuItemSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
+    def _check_plan(self, serializer, creating):
+        from rest_framework.exceptions import PermissionDenied
+        from subscriptions.entitlements import get_entitlements
+
+        entitlements = get_entitlements(self.request)
+        if creating:
+            item_count = get_snapshot(self.request.tenant.schema_name)['item_count']
+            if entitlements.menu_items_remaining(item_count) == 0:
+                raise PermissionDenied(f'Your plan allows up to {entitlements.max_menu_items} menu items.')
+        image_url = serializer.validated_data.get('imageUrl')
+        # An update that keeps the stored image is not adding one
+        adds_image = image_url and (creating or image_url != serializer.instance.imageUrl)
+        if adds_image and not entitlements.has_feature('allows_menu_images'):
+            raise PermissionDenied('Your plan does not include menu item images.')
+
     def perform_create(self, serializer):
+        self._check_plan(serializer, creating=True)
         serializer.save(tenant=self.request.tenant)
+
+    def perform_update(self, serializer):
+        self._check_plan(serializer, creating=False)
+        serializer.save()
+
+    @action(detail=False, methods=['post'], permission_classes=[permissions.IsAuthenticated, requires_module('menu')])
+    def availability(self, request):
+        """
+        Mark many items available or sold out at once:
+        {"available": [ids], "unavailable": [ids]}. Runs at most two UPDATEs,
+        patches the cached menu snapshot and broadcasts the delta on the
+        tenant's menu channel.
+        """
+        from django.utils import timezone
+        from utils.conditional import bump_on_commit
+        from .realtime import trigger_menu_event
+        from .snapshot import patch_availability
+
+        try:
+            available = {int(pk) for pk in request.data.get('available') or []}
+            unavailable = {int(pk) for pk in request.data.get('unavailable') or []}
+        except (TypeError, ValueError, AttributeError):
+            return Response({'error': 'available and unavailable must be lists of item ids'}, status=400)
+        if not available and not unavailable:
+            return Response({'error': 'No items provided'}, status=400)
+        if available & unavailable:
+            return Response({'error': 'An item cannot be both available and unavailable'}, status=400)
+
+        now = timezone.now()
+        schema_name = request.tenant.schema_name
+        with transaction.atomic():
+            updated = 0
+            for ids, value in ((available, True), (unavailable, False)):
+                if ids:
+                    updated += MenuItem.objects.filter(id__in=ids).update(isAvailable=value, updated_at=now)
+            bump_on_commit('menu')
+
+            def _publish():
+                changes = {**dict.fromkeys(available, True), **dict.fromkeys(unavailable, False)}
+                version = patch_availability(schema_name, changes, now)
+                trigger_menu_event(request.tenant, 'availability-changed', {
+                    'version': version,
+                    'available': sorted(available),
+                    'unavailable': sorted(unavailable),
+                })
+
+            transaction.on_commit(_publish)
+
+        return Response({
+            'success': True,
+            'data': {'updated': updated},
+            'meta': {
+                'timestamp': now.isoformat(),
+                'version': '1.0.0'
+            }
+        })
+
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([permissions.AllowAny])
+def menu_snapshot(request):
+    """
+    Full public menu for QR scans, served from the pre-serialized snapshot.
+    Supports If-None-Match; the ETag is the snapshot's content hash.
+    """
+    tenant = getattr(request, 'tenant', None)
+    if tenant is None or tenant.schema_name == get_public_schema_name():
+        return Response({'error': 'Restaurant not found'}, status=404)
+
+    snapshot = get_snapshot(tenant.schema_name)
+    etag = f'"{snapshot["version"]}"'
+    if etag_matches(request, etag):
+        response = HttpResponse(status=304)
+    else:
+        response = HttpResponse(snapshot['body'], content_type='application/json')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'public, max-age=0, must-revalidate'
+    return response
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated, requires_module('menu')])
+@parser_classes([JSONParser, CSVTextParser, MultiPartParser])
+def menu_import(request):
+    """
+    Bulk upsert categories and items from JSON or CSV. CSV can be sent as a
+    text/csv body or as a `file` upload; columns are category,
+    category_priority, name, description, price, image_url, is_available.
+    Nothing is written unless every row is valid.
+    """
+    from django.utils import timezone
+    from analytics.audit import log_action
+    from subscriptions.entitlements import get_entitlements
+    from utils.conditional import bump_on_commit
+    from .importer import decode_csv, import_menu, rows_from_csv, rows_from_json, validate_rows
+    from .snapshot import schedule_rebuild
+
+    tenant = getattr(request, 'tenant', None)
+    if tenant is None or tenant.schema_name == get_public_schema_name():
+        return Response({'error': 'Restaurant not found'}, status=404)
+
+    data = request.data
+    upload = data.get('file') if hasattr(data, 'get') else None
+    if upload is not None:
+        try:
+            rows = rows_from_csv(decode_csv(upload.read()))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        source = 'csv'
+    elif isinstance(data, str):
+        rows = rows_from_csv(data)
+        source = 'csv'
+    else:
+        rows = rows_from_json(data)
+        source = 'json'
+
+    rows, errors = validate_rows(rows)
+    if errors:
+        return Response({
+            'success': False,
+            'errors': errors,
+            'message': 'Validation failed',
+            'meta': {'timestamp': timezone.now().isoformat(), 'version': '1.0.0'}
+        }, status=400)
+
+    entitlements = get_entitlements(request)
+    if not entitlements.has_feature('allows_menu_images') and any(row.get('imageUrl') for row in rows):
+        return Response({'error': 'Your plan does not include menu item images.'}, status=403)
+    remaining = entitlements.menu_items_remaining(get_snapshot(tenant.schema_name)['item_count'])
+
+    with transaction.atomic():
+        summary = import_menu(rows, tenant=tenant)
+        if remaining is not None and summary['items_created'] > remaining:
+            transaction.set_rollback(True)
+            return Response({
+                'error': f'Your plan allows up to {entitlements.max_menu_items} menu items.',
+                'new_items': summary['items_created'],
+                'items_remaining': remaining,
+            }, status=403)
+        schedule_rebuild()
+        bump_on_commit('menu')
+        log_action(
+            request,
+            action='menu.imported',
+            entity_type='menu',
+            entity_label=f"{len(rows)} items imported",
+            metadata={**summary, 'source': source},
+        )
+
+    return Response({
+        'success': True,
+        'data': summary,
+        'meta': {'timestamp': timezone.now().isoformat(), 'version': '1.0.0'}
+    })
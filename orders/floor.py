@@ -0,0 +1,143 @@
+"""
+Live floor state: which tables have open dine-in orders.
+
+Each tenant's floor is one cached document mapping table number to its open
+orders, running total and seated time (the oldest open order). Order saves
+and deletes patch the affected table after commit, and a Celery task
+broadcasts it on the `floor-{slug}` Pusher channel. A miss rebuilds from a
+single query over the open orders. Patches and rebuilds hold the same
+per-tenant lock, so a rebuild cannot overwrite a concurrent patch.
+"""
+from decimal import Decimal
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+from utils.cache import cache_lock
+
+OPEN_STATUSES = ('pending', 'preparing', 'ready')
+LOCK_TIMEOUT = 5
+
+
+def _cache_key(schema_name):
+    return f"floor:{schema_name}"
+
+
+def _lock_key(schema_name):
+    return f"floor:{schema_name}:lock"
+
+
+def _is_open(order):
+    return order.order_type == 'dine_in' and bool(order.table_number) and order.status in OPEN_STATUSES
+
+
+def _order_entry(order_id, order_number, status, total_amount, created_at):
+    return {
+        'id': order_id,
+        'order_number': order_number,
+        'status': status,
+        'total_amount': str(total_amount),
+        'created_at': created_at.isoformat(),
+    }
+
+
+def _table_state(orders):
+    return {
+        'orders': orders,
+        'total': str(sum((Decimal(order['total_amount']) for order in orders), Decimal('0'))),
+        'seated_at': min(order['created_at'] for order in orders),
+    }
+
+
+def build_floor(schema_name):
+    """Rebuild the floor from the open orders; it is cached only if the lock was free."""
+    from .models import Order
+
+    with cache_lock(_lock_key(schema_name), LOCK_TIMEOUT) as locked:
+        tables = {}
+        open_orders = (
+            Order.objects.filter(status__in=OPEN_STATUSES, order_type='dine_in')
+            .exclude(table_number='')
+            .order_by('created_at')
+            .values_list('table_number', 'id', 'order_number', 'status', 'total_amount', 'created_at')
+        )
+        for table_number, *fields in open_orders:
+            tables.setdefault(table_number, []).append(_order_entry(*fields))
+
+        floor = {
+            'tables': {number: _table_state(orders) for number, orders in tables.items()},
+            'updated_at': timezone.now().isoformat(),
+        }
+        if locked:
+            cache.set(_cache_key(schema_name), floor, None)
+    return floor
+
+
+def get_floor(schema_name=None):
+    schema_name = schema_name or connection.schema_name
+    floor = cache.get(_cache_key(schema_name))
+    if floor is None:
+        floor = build_floor(schema_name)
+    return floor
+
+
+def _apply(schema_name, order_id, table_number, entry):
+    """
+    Move one order on the cached floor: drop it from wherever it was and, if
+    it is still open, add `entry` under table_number. Returns the new state
+    of each changed table, or None if the floor was not cached or could not
+    be locked.
+    """
+    key = _cache_key(schema_name)
+    with cache_lock(_lock_key(schema_name), LOCK_TIMEOUT) as locked:
+        if not locked:
+            cache.delete(key)
+            return None
+        floor = cache.get(key)
+        if floor is None:
+            return None
+        tables = floor['tables']
+        changed = set()
+        for number, state in list(tables.items()):
+            orders = [order for order in state['orders'] if order['id'] != order_id]
+            if len(orders) != len(state['orders']):
+                changed.add(number)
+                if orders:
+                    tables[number] = _table_state(orders)
+                else:
+                    del tables[number]
+        if entry is not None:
+            orders = tables.get(table_number, {'orders': []})['orders'] + [entry]
+            tables[table_number] = _table_state(orders)
+            changed.add(table_number)
+        floor['updated_at'] = timezone.now().isoformat()
+        cache.set(key, floor, None)
+    return {number: tables.get(number) for number in changed}
+
+
+def _broadcast(tenant_slug, changed, full=False):
+    """Queue a broadcast of changed tables (or the whole floor when full=True); a null table means it is now free."""
+    from .tasks import broadcast_floor_update
+
+    if (not changed and not full) or not tenant_slug:
+        return
+    broadcast_floor_update.delay(tenant_slug, changed, full)
+
+
+def order_changed(order, deleted=False):
+    """Patch the floor for a saved or deleted order once the transaction commits."""
+    schema_name = connection.schema_name
+    tenant_slug = getattr(getattr(connection, 'tenant', None), 'slug', None)
+    entry = None
+    if not deleted and _is_open(order):
+        entry = _order_entry(order.id, order.order_number, order.status, order.total_amount, order.created_at)
+    order_id, table_number = order.id, order.table_number
+
+    def _update():
+        changed = _apply(schema_name, order_id, table_number, entry)
+        if changed is None:
+            # Nothing cached to patch; rebuild and send the whole floor
+            _broadcast(tenant_slug, build_floor(schema_name)['tables'], full=True)
+        else:
+            _broadcast(tenant_slug, changed)
+
+    transaction.on_commit(_update)
@@ -0,0 +1,58 @@
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from orders.pricing import price_order, price_lines
+from utils.cache import get_version
+
+
+class Command(BaseCommand):
+    help = 'Measure server-side pricing time for large orders against a warm price index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lines', type=int, default=50, help='Line items per order')
+        parser.add_argument('--menu-size', type=int, default=300, help='Items in the synthetic menu')
+        parser.add_argument('--iterations', type=int, default=5000, help='Orders to price')
+
+    def _report(self, label, iterations, elapsed):
+        self.stdout.write(f"{label:<28} {elapsed / iterations * 1000:>8.3f} ms/order")
+
+    def handle(self, *args, **options):
+        lines_per_order = options['lines']
+        iterations = options['iterations']
+        schema_name = 'benchmark_pricing'
+
+        index = {
+            pk: (f"Item {pk}", Decimal(f"{pk % 90 + 5}.50"), True)
+            for pk in range(1, options['menu_size'] + 1)
+        }
+        cache.set(f"pricing:index:{schema_name}:{get_version('menu', schema_name)}", index, 60)
+
+        attrs = {
+            'order_type': 'delivery',
+            'items': [
+                {
+                    'menu_item_id': str(pk),
+                    'name': f"Item {pk}",
+                    'quantity': 2,
+                    'price': index[pk][1],
+                    'notes': '',
+                }
+                for pk in range(1, lines_per_order + 1)
+            ],
+        }
+        tenant_settings = {'taxRate': 12.5, 'deliveryFee': 10}
+        tenant = SimpleNamespace(settings=tenant_settings, get_default_settings=dict)
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            price_lines(attrs['items'], index, tenant_settings, attrs['order_type'])
+        self._report(f"price_lines ({lines_per_order} lines)", iterations, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            priced, errors = price_order(attrs, tenant=tenant, schema_name=schema_name)
+        self._report(f"price_order ({lines_per_order} lines)", iterations, time.perf_counter() - start)
+
+        self.stdout.write(f"Total for one order: {priced['total_amount']} ({len(errors)} errors)")
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant_tables', '0001_initial'),
+        ('orders', '0007_make_review_order_optional'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='table',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='orders', to='restaurant_tables.table'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['table', 'created_at'], name='orders_orde_table_i_c1dc8a_idx'),
+        ),
+    ]
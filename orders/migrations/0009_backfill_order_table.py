@@ -0,0 +1,55 @@
+import re
+from collections import defaultdict
+from django.db import migrations
+
+BATCH_SIZE = 1000
+_NUMBER = re.compile(r'\d+')
+
+
+def parse_table_number(value):
+    """'12', 'Table 12' and 'T12' all refer to table number 12."""
+    match = _NUMBER.search(value or '')
+    return int(match.group()) if match else None
+
+
+def backfill_order_table(apps, schema_editor):
+    """Link orders to tables by number, one UPDATE per table per batch of orders."""
+    Order = apps.get_model('orders', 'Order')
+    Table = apps.get_model('restaurant_tables', 'Table')
+
+    table_ids = dict(Table.objects.values_list('number', 'id'))
+    if not table_ids:
+        return
+
+    last_id = 0
+    while True:
+        batch = list(
+            Order.objects.filter(id__gt=last_id, table__isnull=True)
+            .exclude(table_number='')
+            .order_by('id')
+            .values_list('id', 'table_number')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        last_id = batch[-1][0]
+
+        by_table = defaultdict(list)
+        for order_id, table_number in batch:
+            table_id = table_ids.get(parse_table_number(table_number))
+            if table_id:
+                by_table[table_id].append(order_id)
+        for table_id, order_ids in by_table.items():
+            Order.objects.filter(id__in=order_ids).update(table_id=table_id)
+
+
+class Migration(migrations.Migration):
+    # Each batch commits on its own so large order tables are not locked for the whole run
+    atomic = False
+
+    dependencies = [
+        ('orders', '0008_order_table'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_order_table, migrations.RunPython.noop),
+    ]
@@ -32,6 +32,7 @@ class Order(models.Model):
     order_number = models.CharField(max_length=50)
     customer_name = models.CharField(max_length=255, blank=True)
     table_number = models.CharField(max_length=50, blank=True)
+    table = models.ForeignKey('restaurant_tables.Table', on_delete=models.SET_NULL, related_name='orders', null=True, blank=True)
     order_type = models.CharField(max_length=20, choices=ORDER_TYPE_CHOICES, default='dine_in')
     delivery_fee = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     tax_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
@@ -51,6 +52,9 @@ class Order(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['table', 'created_at']),
+        ]
 
     def __str__(self):
         return f"Order {self.order_number} - {self.table_number}"
@@ -0,0 +1,138 @@
+"""
+Server-side order pricing.
+
+Line items are checked against a per-tenant price index of
+{menu_item_id: (name, price, is_available)}. The index is keyed by the
+menu version, so any menu write retires it. It is held in process, backed
+by the shared cache, and filled from the database with one in_bulk query
+for ids it has not seen. Totals, tax and delivery fees are then recomputed
+from menu prices rather than trusted from the client.
+
+Lines whose menu_item_id is not a menu id (ad-hoc POS lines such as
+"custom") keep the client's name and price, but only for authenticated
+staff of the tenant; public QR orders must reference menu items.
+"""
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from django.core.cache import cache
+from django.db import connection
+from utils.cache import get_version
+
+CENT = Decimal('0.01')
+_local_indexes = {}
+_LOCAL_INDEX_LIMIT = 256
+
+
+def _quantize(value):
+    return Decimal(str(value)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def get_price_index(schema_name, item_ids):
+    """Return an index covering item_ids (ids missing from the menu are simply absent)."""
+    from menu.models import MenuItem
+
+    key = f"pricing:index:{schema_name}:{get_version('menu', schema_name)}"
+    index = _local_indexes.get(key)
+    if index is None:
+        index = cache.get(key) or {}
+    missing = [pk for pk in item_ids if pk not in index]
+    if missing:
+        found = MenuItem.objects.only('id', 'name', 'price', 'isAvailable').in_bulk(missing)
+        index = {**index, **{pk: (item.name, item.price, item.isAvailable) for pk, item in found.items()}}
+        cache.set(key, index, 60 * 60)
+    if len(_local_indexes) >= _LOCAL_INDEX_LIMIT:
+        _local_indexes.clear()
+    _local_indexes[key] = index
+    return index
+
+
+def _parse_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def price_lines(lines, index, tenant_settings, order_type, client_tax=None, client_delivery_fee=None,
+                allow_custom_lines=False):
+    """
+    Price validated OrderItem dicts against an index. Returns (priced, errors)
+    where priced holds the corrected lines, subtotal, tax_amount,
+    delivery_fee and total_amount.
+
+    Tax uses settings['taxRate'] (a percentage) and delivery orders use
+    settings['deliveryFee']. Both are in Tenant.get_default_settings (0), so
+    the client's amounts are only kept when no tenant settings are passed.
+    """
+    errors = []
+    priced_lines = []
+    subtotal = Decimal('0')
+
+    for position, line in enumerate(lines):
+        pk = _parse_id(line.get('menu_item_id'))
+        if pk is None and allow_custom_lines:
+            if line.get('price') is None or line['price'] < 0 or line.get('quantity', 1) < 1:
+                errors.append({
+                    'line': position, 'menu_item_id': line.get('menu_item_id'),
+                    'error': 'Custom lines need a price and a quantity of at least 1',
+                })
+                continue
+            priced_lines.append(line)
+            subtotal += _quantize(line['price']) * line.get('quantity', 1)
+            continue
+        entry = index.get(pk) if pk is not None else None
+        if entry is None:
+            errors.append({'line': position, 'menu_item_id': line.get('menu_item_id'), 'error': 'Unknown menu item'})
+            continue
+        name, price, is_available = entry
+        if not is_available:
+            errors.append({'line': position, 'menu_item_id': pk, 'error': f"{name} is no longer available"})
+            continue
+        if line.get('price') is not None and _quantize(line['price']) != price:
+            errors.append({
+                'line': position, 'menu_item_id': pk,
+                'error': f"The price of {name} has changed", 'current_price': str(price),
+            })
+            continue
+        quantity = line.get('quantity', 1)
+        if quantity < 1:
+            errors.append({'line': position, 'menu_item_id': pk, 'error': 'Quantity must be at least 1'})
+            continue
+        priced_lines.append({**line, 'menu_item_id': str(pk), 'name': name, 'price': price})
+        subtotal += price * quantity
+
+    try:
+        tax_rate = Decimal(str(tenant_settings['taxRate']))
+    except (KeyError, TypeError, InvalidOperation):
+        tax_rate = None
+    if tax_rate is not None:
+        tax_amount = _quantize(subtotal * tax_rate / 100)
+    else:
+        tax_amount = _quantize(client_tax or 0)
+
+    delivery_fee = Decimal('0')
+    if order_type == 'delivery':
+        configured_fee = tenant_settings.get('deliveryFee')
+        delivery_fee = _quantize(configured_fee if configured_fee is not None else client_delivery_fee or 0)
+
+    return {
+        'items': priced_lines,
+        'subtotal': _quantize(subtotal),
+        'tax_amount': tax_amount,
+        'delivery_fee': delivery_fee,
+        'total_amount': _quantize(subtotal + tax_amount + delivery_fee),
+    }, errors
+
+
+def price_order(attrs, tenant=None, schema_name=None, allow_custom_lines=False):
+    """Price an order's validated serializer data for the current tenant schema."""
+    lines = attrs.get('items') or []
+    ids = {pk for pk in (_parse_id(line.get('menu_item_id')) for line in lines) if pk is not None}
+    index = get_price_index(schema_name or connection.schema_name, ids)
+    tenant_settings = {}
+    if tenant is not None:
+        tenant_settings = {**tenant.get_default_settings(), **(tenant.settings or {})}
+    return price_lines(
+        lines, index, tenant_settings, attrs.get('order_type', 'dine_in'),
+        client_tax=attrs.get('tax_amount'), client_delivery_fee=attrs.get('delivery_fee'),
+        allow_custom_lines=allow_custom_lines,
+    )
@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import serializers
 from .models import Order, OrderItem, OrderReview
 
@@ -15,19 +16,58 @@ class OrderSerializer(serializers.ModelSerializer):
             'id', 'order_number', 'customer_name', 'table_number', 'order_type', 
             'delivery_fee', 'tax_amount', 'customer_phone', 'delivery_address', 
             'delivery_notes', 'status', 'total_amount', 'payment_status', 
-            'payment_method', 'processed_by_name', 'items', 'created_at'
+            'payment_method', 'processed_by_name', 'items', 'table', 'created_at'
         ]
-        read_only_fields = ['id', 'created_at']
+        read_only_fields = ['id', 'table', 'created_at']
+
+    def validate(self, attrs):
+        """Re-price new orders against the menu instead of trusting client amounts."""
+        if self.instance is not None or 'items' not in attrs or not getattr(settings, 'ORDER_SERVER_PRICING', True):
+            return attrs
+
+        from staff.context import get_permission_context
+        from .pricing import price_order
+        request = self.context.get('request')
+        # Tokens are issued from the public schema, so being authenticated is
+        # not enough: only the tenant's own owner and staff may add ad-hoc lines
+        staff = False
+        if request is not None and request.user.is_authenticated:
+            permission_context = get_permission_context(request)
+            staff = permission_context.is_member and permission_context.is_active
+        priced, errors = price_order(attrs, tenant=getattr(request, 'tenant', None), allow_custom_lines=staff)
+        if errors:
+            raise serializers.ValidationError({'items': errors})
+        attrs['items'] = priced['items']
+        attrs['tax_amount'] = priced['tax_amount']
+        attrs['delivery_fee'] = priced['delivery_fee']
+        attrs['total_amount'] = priced['total_amount']
+        return attrs
+
+    @staticmethod
+    def _resolve_table(table_number):
+        """Match the free-text table number ('12', 'Table 12') to a Table row."""
+        import re
+        from restaurant_tables.models import Table
+        match = re.search(r'\d+', table_number or '')
+        if not match:
+            return None
+        return Table.objects.filter(number=int(match.group())).first()
 
     def create(self, validated_data):
         items_data = validated_data.pop('items')
         # Get tenant from context
         tenant = self.context.get('request').tenant if self.context.get('request') else None
+        validated_data['table'] = self._resolve_table(validated_data.get('table_number'))
         order = Order.objects.create(tenant=tenant, **validated_data)
         for item_data in items_data:
             OrderItem.objects.create(order=order, **item_data)
         return order
 
+    def update(self, instance, validated_data):
+        if 'table_number' in validated_data and validated_data['table_number'] != instance.table_number:
+            validated_data['table'] = self._resolve_table(validated_data['table_number'])
+        return super().update(instance, validated_data)
+
 class ReviewSerializer(serializers.ModelSerializer):
     class Meta:
         model = OrderReview
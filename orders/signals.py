@@ -0,0 +1,23 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from utils.conditional import bump_on_commit
+from . import floor
+from .models import Order, OrderItem
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+@receiver(post_save, sender=OrderItem)
+@receiver(post_delete, sender=OrderItem)
+def invalidate_order_etags(sender, **kwargs):
+    bump_on_commit('orders')
+
+
+@receiver(post_save, sender=Order)
+def update_floor_on_save(sender, instance, **kwargs):
+    floor.order_changed(instance)
+
+
+@receiver(post_delete, sender=Order)
+def update_floor_on_delete(sender, instance, **kwargs):
+    floor.order_changed(instance, deleted=True)
@@ -51,3 +51,17 @@ def check_stale_orders():
                 order.save()
     
     return f"Checked {tenants.count()} tenants for stale orders."
+
+
+@shared_task
+def broadcast_floor_update(tenant_slug, tables, full=False):
+    """Send floor changes on the tenant's `floor-{slug}` channel, off the request that made them."""
+    try:
+        client = get_pusher_client()
+        if not client:
+            return
+        channel = f"floor-{tenant_slug}"
+        client.trigger(channel, 'floor-updated', {'tables': tables, 'full': full})
+        print(f"[Pusher] Triggered 'floor-updated' on '{channel}'")
+    except Exception as e:
+        print(f"[Pusher] Error triggering event: {str(e)}")
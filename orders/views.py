@@ -4,6 +4,7 @@ from rest_framework.decorators import action
 from django.db.models import Q
 from .models import Order, OrderReview
 from .serializers import OrderSerializer, ReviewSerializer
+from utils.conditional import ConditionalGetMixin
 from .pusher_client import get_pusher_client
 
 
@@ -15,7 +16,8 @@ def _get_actor_name(request):
     return full or getattr(user, 'username', '') or getattr(user, 'email', '') or ''
 
 
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    conditional_namespace = 'orders'
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
     permission_classes = [permissions.AllowAny]
@@ -155,6 +157,20 @@ class OrderViewSet(viewsets.ModelViewSet):
 
         return Response(OrderSerializer(order).data)
 
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
+    def floor(self, request):
+        """Open dine-in orders grouped by table, served from the cached floor state."""
+        from django.utils import timezone
+        from .floor import get_floor
+        return Response({
+            'success': True,
+            'data': get_floor(),
+            'meta': {
+                'timestamp': timezone.now().isoformat(),
+                'version': '1.0.0'
+            }
+        })
+
     def destroy(self, request, *args, **kwargs):
         order = self.get_object()
         label = f"Order #{order.order_number}"
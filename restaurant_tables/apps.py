@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class RestaurantTablesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'restaurant_tables'
+
+    def ready(self):
+        from . import signals  # noqa: F401
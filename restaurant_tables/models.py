@@ -1,8 +1,5 @@
 from django.db import models
 from django.utils import timezone
-import qrcode
-from io import BytesIO
-import base64
 
 class Table(models.Model):
     STATUS_CHOICES = [
@@ -38,24 +35,9 @@ class Table(models.Model):
         """Generate QR code image as base64 string"""
         if not self.qr_code_url:
             return None
-            
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(self.qr_code_url)
-        qr.make(fit=True)
-        
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Convert to base64
-        buffer = BytesIO()
-        img.save(buffer, format='PNG')
-        img_str = base64.b64encode(buffer.getvalue()).decode()
-        
-        return f"data:image/png;base64,{img_str}"
+
+        from .qr import get_qr_data_uri
+        return get_qr_data_uri(self.qr_code_url)
     
     def __str__(self):
         return f"Table {self.number}" + (f" ({self.name})" if self.name else "")
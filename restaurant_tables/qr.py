@@ -0,0 +1,162 @@
+"""
+QR code rendering for table cards.
+
+PNG and SVG bytes are cached in the default cache keyed by a hash of the
+encoded URL, so a code is rendered once per URL. Cache lookups are batched
+with get_many/set_many; misses are rendered inline, since a code takes a
+few milliseconds and forking a gevent worker per request is not safe.
+"""
+import base64
+import hashlib
+import io
+import zipfile
+from django.core.cache import cache
+
+FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml'}
+EXPORT_CHUNK_SIZE = 50
+
+
+def _cache_key(url, fmt):
+    return f"qr:{fmt}:{hashlib.sha256(url.encode('utf-8')).hexdigest()[:32]}"
+
+
+def _make_qr(url):
+    import qrcode
+
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(url)
+    qr.make(fit=True)
+    return qr
+
+
+def render_qr(url, fmt='png'):
+    """Render one QR code to PNG or SVG bytes."""
+    qr = _make_qr(url)
+    buffer = io.BytesIO()
+    if fmt == 'svg':
+        from qrcode.image.svg import SvgPathImage
+        qr.make_image(image_factory=SvgPathImage).save(buffer)
+    else:
+        qr.make_image(fill_color="black", back_color="white").save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def get_qr_images(urls, fmt='png'):
+    """Return {url: bytes} for the given URLs, rendering and caching any misses."""
+    urls = list(dict.fromkeys(url for url in urls if url))
+    keys = {_cache_key(url, fmt): url for url in urls}
+    cached = cache.get_many(keys)
+    images = {keys[key]: data for key, data in cached.items()}
+
+    missing = [url for url in urls if url not in images]
+    if missing:
+        rendered = {url: render_qr(url, fmt) for url in missing}
+        cache.set_many({_cache_key(url, fmt): data for url, data in rendered.items()}, None)
+        images.update(rendered)
+    return images
+
+
+def get_qr_data_uris(urls):
+    """Return {url: PNG data URI} for many URLs with one cache round trip."""
+    return {
+        url: f"data:image/png;base64,{base64.b64encode(png).decode()}"
+        for url, png in get_qr_images(urls).items()
+    }
+
+
+def get_qr_data_uri(url):
+    return get_qr_data_uris([url])[url]
+
+
+class _ChunkBuffer:
+    """Write-only file object that hands written bytes back to a generator."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _filename(table, fmt):
+    return f"table-{table.number}.{fmt}"
+
+
+def stream_qr_zip(tables, fmt='png'):
+    """Yield a ZIP archive of table QR codes, rendering EXPORT_CHUNK_SIZE codes at a time."""
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for start in range(0, len(tables), EXPORT_CHUNK_SIZE):
+            chunk = tables[start:start + EXPORT_CHUNK_SIZE]
+            images = get_qr_images([table.qr_code_url for table in chunk], fmt)
+            for table in chunk:
+                archive.writestr(_filename(table, fmt), images[table.qr_code_url])
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+def _label_font(size):
+    from PIL import ImageFont
+    try:
+        return ImageFont.truetype('DejaVuSans-Bold.ttf', size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+def _centered_text(draw, x, y, text, font):
+    left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+    draw.text((x - (right - left) // 2, y - (bottom - top) // 2), text, fill=0, font=font)
+
+
+def build_qr_sheet_pdf(tables, restaurant_name=''):
+    """
+    Lay table QR cards out six to an A4 page (150 dpi) and return the PDF
+    bytes. Codes come from get_qr_images, so only uncached ones are rendered.
+    """
+    from PIL import Image, ImageDraw
+
+    page_size = (1240, 1754)
+    columns, rows = 2, 3
+    cell_width, cell_height = page_size[0] // columns, page_size[1] // rows
+    qr_size = 440
+    title_font, label_font = _label_font(40), _label_font(26)
+
+    images = get_qr_images([table.qr_code_url for table in tables])
+    pages = []
+    per_page = columns * rows
+    for start in range(0, len(tables), per_page):
+        page = Image.new('L', page_size, 255)
+        draw = ImageDraw.Draw(page)
+        for slot, table in enumerate(tables[start:start + per_page]):
+            left = (slot % columns) * cell_width
+            top = (slot // columns) * cell_height
+            draw.rectangle([left + 20, top + 20, left + cell_width - 20, top + cell_height - 20], outline=0, width=2)
+
+            code = Image.open(io.BytesIO(images[table.qr_code_url])).convert('L').resize((qr_size, qr_size), Image.NEAREST)
+            page.paste(code, (left + (cell_width - qr_size) // 2, top + 50))
+
+            caption = f"Table {table.number}" + (f" · {table.name}" if table.name else '')
+            _centered_text(draw, left + cell_width // 2, top + qr_size + 90, caption, title_font)
+            if restaurant_name:
+                _centered_text(draw, left + cell_width // 2, top + qr_size + 140, restaurant_name, label_font)
+        # Bilevel pages keep the PDF small (QR codes are black and white anyway)
+        pages.append(page.convert('1', dither=Image.Dither.NONE))
+
+    output = io.BytesIO()
+    if pages:
+        pages[0].save(output, format='PDF', save_all=True, append_images=pages[1:], resolution=150)
+    return output.getvalue()
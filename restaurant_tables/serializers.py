@@ -13,11 +13,15 @@ class TableSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
     
     def get_qrCode(self, obj):
-        """Return QR code information"""
-        return {
+        """Return QR code information, with the image when the view batch-rendered them"""
+        data = {
             'url': obj.qr_code_url,
             'generatedAt': obj.qr_code_generated_at.isoformat() if obj.qr_code_generated_at else None
         }
+        images = self.context.get('qr_images')
+        if images is not None:
+            data['image'] = images.get(obj.qr_code_url)
+        return data
 
 class TableCreateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -31,6 +35,8 @@ class TableCreateSerializer(serializers.ModelSerializer):
         return value
 
 class BulkTableCreateSerializer(serializers.Serializer):
+    MAX_TABLES = 1000
+
     fromTable = serializers.IntegerField(min_value=1)
     toTable = serializers.IntegerField(min_value=1)
     section = serializers.CharField(max_length=50, required=False, allow_blank=True)
@@ -38,18 +44,10 @@ class BulkTableCreateSerializer(serializers.Serializer):
     def validate(self, data):
         if data['fromTable'] > data['toTable']:
             raise serializers.ValidationError("fromTable must be less than or equal to toTable")
+        if data['toTable'] - data['fromTable'] + 1 > self.MAX_TABLES:
+            raise serializers.ValidationError(f"At most {self.MAX_TABLES} tables can be generated at once")
         
-        # Check for existing tables in range
-        existing_tables = Table.objects.filter(
-            number__gte=data['fromTable'],
-            number__lte=data['toTable']
-        ).values_list('number', flat=True)
-        
-        if existing_tables:
-            raise serializers.ValidationError(
-                f"Tables already exist for numbers: {list(existing_tables)}"
-            )
-        
+        # Existing numbers are caught by the unique constraint when inserting
         return data
 
 class QRBatchSerializer(serializers.Serializer):
@@ -0,0 +1,10 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from utils.conditional import bump_on_commit
+from .models import Table
+
+
+@receiver(post_save, sender=Table)
+@receiver(post_delete, sender=Table)
+def invalidate_table_etags(sender, **kwargs):
+    bump_on_commit('tables')
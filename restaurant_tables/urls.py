@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TableViewSet, bulk_generate_tables, qr_batch
+from .views import TableViewSet, bulk_generate_tables, qr_batch, qr_export
 
 router = DefaultRouter()
 router.register(r'', TableViewSet)
@@ -8,5 +8,6 @@ router.register(r'', TableViewSet)
 urlpatterns = [
     path('bulk-generate/', bulk_generate_tables, name='bulk_generate_tables'),
     path('qr-batch/', qr_batch, name='qr_batch'),
+    path('qr-export/', qr_export, name='qr_export'),
     path('', include(router.urls)),
 ]
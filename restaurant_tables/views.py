@@ -3,7 +3,7 @@ from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.utils import timezone
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from .models import Table
 from .serializers import (
     TableSerializer, TableCreateSerializer, 
@@ -11,8 +11,10 @@ from .serializers import (
 )
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
+from utils.conditional import ConditionalGetMixin, bump_on_commit, conditional_get
 
-class TableViewSet(viewsets.ModelViewSet):
+class TableViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    conditional_namespace = 'tables'
     queryset = Table.objects.all()
     serializer_class = TableSerializer
     permission_classes = [IsAuthenticated]
@@ -85,21 +87,31 @@ def bulk_generate_tables(request):
         # Get restaurant slug
         restaurant_slug = getattr(request.tenant, 'slug', 'default') if hasattr(request, 'tenant') else 'default'
         
-        created_tables = []
+        tables = []
+        for table_num in range(from_table, to_table + 1):
+            table = Table(number=table_num, section=section, status='active')
+            table.generate_qr_code_url(restaurant_slug)
+            tables.append(table)
         
-        with transaction.atomic():
-            for table_num in range(from_table, to_table + 1):
-                table = Table.objects.create(
-                    number=table_num,
-                    section=section,
-                    status='active'
-                )
-                
-                # Generate QR code
-                table.generate_qr_code_url(restaurant_slug)
-                table.save()
-                
-                created_tables.append(table)
+        # One INSERT; a clash with an existing number rolls the whole batch back
+        try:
+            with transaction.atomic():
+                created_tables = Table.objects.bulk_create(tables)
+                bump_on_commit('tables')
+        except IntegrityError:
+            existing_tables = list(Table.objects.filter(
+                number__gte=from_table,
+                number__lte=to_table
+            ).values_list('number', flat=True))
+            return Response({
+                'success': False,
+                'errors': {'non_field_errors': [f"Tables already exist for numbers: {existing_tables}"]},
+                'message': 'Validation failed',
+                'meta': {
+                    'timestamp': timezone.now().isoformat(),
+                    'version': '1.0.0'
+                }
+            }, status=status.HTTP_400_BAD_REQUEST)
         
         # Serialize created tables
         table_serializer = TableSerializer(created_tables, many=True)
@@ -154,18 +166,23 @@ def bulk_generate_tables(request):
 )
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_get('tables')
 def qr_batch(request):
     """Get QR codes for all tables"""
     tables = Table.objects.filter(status='active').order_by('number')
     restaurant_slug = getattr(request.tenant, 'slug', 'default') if hasattr(request, 'tenant') else 'default'
     
     # Ensure all tables have QR codes
-    for table in tables:
-        if not table.qr_code_url:
-            table.generate_qr_code_url(restaurant_slug)
-            table.save()
+    missing = [table for table in tables if not table.qr_code_url]
+    for table in missing:
+        table.generate_qr_code_url(restaurant_slug)
+    if missing:
+        Table.objects.bulk_update(missing, ['qr_code_url', 'qr_code_generated_at'])
+        bump_on_commit('tables')
     
-    serializer = TableSerializer(tables, many=True)
+    from .qr import get_qr_data_uris
+    images = get_qr_data_uris([table.qr_code_url for table in tables])
+    serializer = TableSerializer(tables, many=True, context={'qr_images': images})
     
     return Response({
         'success': True,
@@ -178,3 +195,38 @@ def qr_batch(request):
             'version': '1.0.0'
         }
     })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def qr_export(request):
+    """
+    Download QR codes for all active tables: ?type=zip (default, streamed,
+    ?image=png|svg) or ?type=pdf for a printable A4 sheet of cards.
+    """
+    from django.http import HttpResponse, StreamingHttpResponse
+    from .qr import FORMATS, build_qr_sheet_pdf, stream_qr_zip
+
+    tables = list(Table.objects.filter(status='active').order_by('number'))
+    tenant = getattr(request, 'tenant', None)
+    restaurant_slug = getattr(tenant, 'slug', 'default')
+
+    missing = [table for table in tables if not table.qr_code_url]
+    for table in missing:
+        table.generate_qr_code_url(restaurant_slug)
+    if missing:
+        Table.objects.bulk_update(missing, ['qr_code_url', 'qr_code_generated_at'])
+        bump_on_commit('tables')
+
+    export_type = request.query_params.get('type', 'zip')
+    if export_type == 'pdf':
+        response = HttpResponse(build_qr_sheet_pdf(tables, getattr(tenant, 'name', '')), content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="{restaurant_slug}-table-qr-codes.pdf"'
+        return response
+
+    image_format = request.query_params.get('image', 'png')
+    if image_format not in FORMATS:
+        return Response({'error': f"image must be one of: {', '.join(FORMATS)}"}, status=status.HTTP_400_BAD_REQUEST)
+    response = StreamingHttpResponse(stream_qr_zip(tables, image_format), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{restaurant_slug}-table-qr-codes.zip"'
+    return response
@@ -0,0 +1,114 @@
+from django.core.cache import cache
+from django_tenants.utils import get_public_schema_name
+from utils.cache import get_version, bump_version
+
+PERMISSION_CONTEXT_TTL = 60
+
+# Used for users who have no StaffMember row in the tenant (account-level role)
+ROLE_PERMISSIONS = {
+    'owner': {'*': True},
+    'admin': {'*': True},
+    'manager': {'menu': True, 'orders': True, 'tables': True, 'analytics': True},
+}
+
+
+class PermissionContext:
+    """
+    Tenant, role and Role.permissions for the current user, resolved once per
+    request. Only plain values are cached; the tenant is taken from the request.
+    is_member is True only for the tenant's owner and its staff members, not
+    for users whose account-level role merely matches.
+    """
+
+    def __init__(self, tenant=None, role=None, staff_role=None, permissions=None,
+                 staff_member_id=None, is_active=True, is_member=False):
+        self.tenant = tenant
+        self.role = role
+        self.staff_role = staff_role
+        self.permissions = permissions or {}
+        self.staff_member_id = staff_member_id
+        self.is_active = is_active
+        self.is_member = is_member
+
+    @property
+    def is_owner(self):
+        return self.role == 'owner'
+
+    def has_permission(self, module):
+        if not self.is_active:
+            return False
+        if self.is_owner or self.permissions.get('*'):
+            return True
+        return bool(self.permissions.get(module))
+
+    def to_cache(self):
+        return {
+            'role': self.role,
+            'staff_role': self.staff_role,
+            'permissions': self.permissions,
+            'staff_member_id': self.staff_member_id,
+            'is_active': self.is_active,
+            'is_member': self.is_member,
+        }
+
+
+def _cache_key(tenant, user_id):
+    version = get_version('permissions', tenant.schema_name)
+    return f"permctx:{tenant.schema_name}:{version}:{user_id}"
+
+
+def _load_permission_context(user, tenant):
+    if not user or not user.is_authenticated:
+        return PermissionContext(tenant=tenant, is_active=False)
+
+    if tenant is None or tenant.schema_name == get_public_schema_name():
+        return PermissionContext(tenant=tenant, role=user.role)
+
+    key = _cache_key(tenant, user.pk)
+    cached = cache.get(key)
+    if cached is not None:
+        return PermissionContext(tenant=tenant, **cached)
+
+    from .models import StaffMember
+
+    is_owner = (tenant.owner_id and tenant.owner_id == user.pk) or (
+        # Tenants created before the owner FK are linked by Clerk id
+        tenant.clerk_organization_id and tenant.clerk_organization_id == user.clerk_user_id
+    )
+    role = 'owner' if is_owner else user.role
+    staff = StaffMember.objects.filter(user=user).select_related('role').first()
+    if staff:
+        context = PermissionContext(
+            tenant=tenant,
+            role=role,
+            staff_role=staff.role.name if staff.role else None,
+            permissions=(staff.role.permissions if staff.role else None) or {},
+            staff_member_id=staff.pk,
+            is_active=staff.is_active,
+            is_member=True,
+        )
+    else:
+        context = PermissionContext(
+            tenant=tenant,
+            role=role,
+            permissions=dict(ROLE_PERMISSIONS.get(role, {})),
+            is_member=bool(is_owner),
+        )
+
+    cache.set(key, context.to_cache(), PERMISSION_CONTEXT_TTL)
+    return context
+
+
+def get_permission_context(request):
+    """Return the PermissionContext for this request, loading it at most once."""
+    raw = getattr(request, '_request', request)
+    context = getattr(raw, '_permission_context', None)
+    if context is None:
+        context = _load_permission_context(request.user, getattr(raw, 'tenant', None))
+        raw._permission_context = context
+    return context
+
+
+def invalidate_permission_contexts(schema_name):
+    """Drop cached permission contexts for every user of a tenant."""
+    bump_version('permissions', schema_name)
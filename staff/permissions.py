@@ -0,0 +1,23 @@
+from rest_framework.permissions import BasePermission
+from .context import get_permission_context
+
+
+class HasModulePermission(BasePermission):
+    """
+    Grants access when the user's role permissions include the view's
+    `required_permission` module (e.g. 'menu', 'orders', 'team').
+    Views without `required_permission` are not restricted.
+    """
+    message = 'Your role does not have access to this section.'
+    module = None
+
+    def has_permission(self, request, view):
+        module = getattr(view, 'required_permission', None) or self.module
+        if not module:
+            return True
+        return get_permission_context(request).has_permission(module)
+
+
+def requires_module(module):
+    """HasModulePermission bound to one module, for function views and actions."""
+    return type(f'Requires_{module}', (HasModulePermission,), {'module': module})
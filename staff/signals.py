@@ -0,0 +1,19 @@
+from django.db import connection
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .context import invalidate_permission_contexts
+from .models import Role, StaffMember
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+@receiver(post_save, sender=StaffMember)
+@receiver(post_delete, sender=StaffMember)
+def invalidate_on_staff_change(sender, **kwargs):
+    invalidate_permission_contexts(connection.schema_name)
+
+
+@receiver(post_save, sender='tenants.Tenant')
+def invalidate_on_tenant_change(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_permission_contexts(instance.schema_name)
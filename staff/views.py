@@ -1,6 +1,7 @@
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from .context import get_permission_context
 from .models import Role, StaffMember
 from .serializers import RoleSerializer, StaffMemberSerializer
 
@@ -26,8 +27,9 @@ class StaffMemberViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['GET'])
     def me(self, request):
         """Get current staff member profile."""
+        permission_context = get_permission_context(request)
         try:
-            staff = StaffMember.objects.filter(
+            staff = StaffMember.objects.select_related('user', 'role').filter(
                 user=request.user, tenant=request.tenant
             ).first()
         except Exception:
@@ -36,11 +38,7 @@ class StaffMemberViewSet(viewsets.ModelViewSet):
             )
 
         if not staff:
-            is_tenant_owner = (
-                hasattr(request.tenant, 'clerk_organization_id')
-                and request.tenant.clerk_organization_id == request.user.clerk_user_id
-            )
-            if getattr(request.user, 'role', None) == 'owner' and is_tenant_owner:
+            if getattr(request.user, 'role', None) == 'owner' and permission_context.is_owner:
                 try:
                     owner_role, _ = Role.objects.get_or_create(
                         tenant=request.tenant,
@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import Plan, Subscription, Payment, ExchangeRateSettings
+from .models import (
+    Plan, Subscription, Payment, ExchangeRateSettings, PaystackEvent,
+    ReconciliationRun, ReconciliationItem, BillingMetrics,
+)
 
 @admin.register(ExchangeRateSettings)
 class ExchangeRateSettingsAdmin(admin.ModelAdmin):
@@ -20,13 +23,17 @@ class ExchangeRateSettingsAdmin(admin.ModelAdmin):
             'fields': ('usd_to_ghs', 'usd_to_ngn'),
             'description': 'Manual rates used when API is disabled or unavailable'
         }),
+        ('Live Rates', {
+            'fields': ('rates_fetched_at', 'live_rates'),
+            'description': 'Refreshed periodically from the API'
+        }),
         ('Last Updated', {
             'fields': ('updated_at',),
             'classes': ['collapse']
         }),
     )
     
-    readonly_fields = ['updated_at']
+    readonly_fields = ['updated_at', 'rates_fetched_at', 'live_rates']
 
 @admin.register(Plan)
 class PlanAdmin(admin.ModelAdmin):
@@ -112,3 +119,35 @@ class PaymentAdmin(admin.ModelAdmin):
             'classes': ['collapse']
         }),
     )
+
+@admin.register(PaystackEvent)
+class PaystackEventAdmin(admin.ModelAdmin):
+    list_display = ['event', 'reference', 'status', 'attempts', 'received_at', 'processed_at']
+    list_filter = ['status', 'event', 'received_at']
+    search_fields = ['reference', 'idempotency_key']
+    readonly_fields = ['idempotency_key', 'event', 'reference', 'payload', 'received_at', 'processed_at']
+
+class ReconciliationItemInline(admin.TabularInline):
+    model = ReconciliationItem
+    extra = 0
+    can_delete = False
+    fields = ['kind', 'reference', 'payment', 'expected_amount', 'settled_amount', 'currency', 'detail']
+    readonly_fields = fields
+
+@admin.register(ReconciliationRun)
+class ReconciliationRunAdmin(admin.ModelAdmin):
+    list_display = ['id', 'source', 'period_start', 'period_end', 'status', 'matched', 'discrepancies', 'started_at']
+    list_filter = ['status', 'started_at']
+    readonly_fields = [
+        'source', 'period_start', 'period_end', 'status', 'payments_checked', 'settlements_checked',
+        'matched', 'discrepancies', 'totals', 'error', 'started_at', 'finished_at',
+    ]
+    inlines = [ReconciliationItemInline]
+
+@admin.register(BillingMetrics)
+class BillingMetricsAdmin(admin.ModelAdmin):
+    list_display = ['date', 'mrr_usd', 'active_subscriptions', 'new_subscriptions', 'churned_subscriptions', 'churn_rate']
+    readonly_fields = [
+        'date', 'mrr_usd', 'mrr_by_plan', 'active_subscriptions', 'trialing_subscriptions',
+        'new_subscriptions', 'churned_subscriptions', 'churn_rate', 'revenue', 'failed_payments', 'computed_at',
+    ]
@@ -0,0 +1,55 @@
+"""
+Materialized plan catalog for the public pricing page.
+
+All active plans, with prices in every supported currency and their feature
+lists, are encoded once into a JSON document. The cache key carries the
+'plans' and 'exchange-rates' versions, so a plan save or a rate refresh
+retires the old document and the next request rebuilds it. The content
+hash is the ETag.
+"""
+import hashlib
+import json
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
+from utils.cache import get_version
+
+SUPPORTED_CURRENCIES = ('USD', 'GHS', 'NGN')
+
+
+def _cache_key():
+    return f"plans:catalog:{get_version('plans', 'all')}:{get_version('exchange-rates', 'all')}"
+
+
+def build_catalog():
+    from .exchange import get_rates
+    from .models import Plan
+    from .serializers import PlanSerializer
+
+    # Reading past the in-process copy also refreshes it, so every
+    # get_price_in_currency call below uses the same rates
+    rates = get_rates(use_local=False)
+    currencies = [currency for currency in SUPPORTED_CURRENCIES if currency in rates]
+    plan_objects = list(Plan.objects.filter(is_active=True))
+    plans = []
+    for plan, data in zip(plan_objects, PlanSerializer(plan_objects, many=True).data):
+        data['prices'] = {currency: plan.get_price_in_currency(currency) for currency in currencies}
+        plans.append(data)
+
+    plans_json = json.dumps(plans, cls=JSONEncoder, separators=(',', ':')).encode('utf-8')
+    version = hashlib.sha256(plans_json).hexdigest()[:32]
+    body = json.dumps({
+        'version': version,
+        'currencies': currencies,
+        'generated_at': timezone.now().isoformat(),
+    }, separators=(',', ':')).encode('utf-8')[:-1] + b',"plans":' + plans_json + b'}'
+    return {'version': version, 'body': body}
+
+
+def get_catalog():
+    key = _cache_key()
+    catalog = cache.get(key)
+    if catalog is None:
+        catalog = build_catalog()
+        cache.set(key, catalog, 24 * 60 * 60)
+    return catalog
@@ -0,0 +1,132 @@
+"""
+Plan entitlements for the current tenant.
+
+A tenant's plan limits and feature flags are loaded once (one Subscription
++ Plan query) into an Entitlements object and cached under the tenant's
+'entitlements' version and the global 'plans' version. Subscription and
+Payment changes bump the tenant version; Plan edits bump 'plans'. Within a
+request the object is memoized, so permission checks cost no queries.
+
+A past_due subscription keeps its entitlements for SUBSCRIPTION_GRACE_DAYS
+after the period ends; the lifecycle job marks it unpaid afterwards and
+bumps the version.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django_tenants.utils import get_public_schema_name
+from utils.cache import get_version, bump_version
+
+ENTITLEMENTS_TTL = 60 * 60
+UNLIMITED = -1
+
+FEATURES = (
+    'includes_digital_menu', 'includes_pos', 'includes_cms', 'allows_menu_images',
+    'has_basic_analytics', 'has_advanced_analytics', 'has_multi_location',
+    'has_custom_integrations',
+)
+
+
+class Entitlements:
+    """What the tenant's plan allows. `is_active` is False once the subscription lapses."""
+
+    def __init__(self, plan_type=None, status=None, is_active=True, max_menu_items=UNLIMITED,
+                 features=None, unrestricted=False):
+        self.plan_type = plan_type
+        self.status = status
+        self.is_active = is_active
+        self.max_menu_items = max_menu_items
+        self.features = features or {}
+        self.unrestricted = unrestricted
+
+    def has_feature(self, feature):
+        if self.unrestricted:
+            return True
+        return self.is_active and bool(self.features.get(feature))
+
+    def menu_items_remaining(self, current_count):
+        """How many more menu items may be created, or None for no limit."""
+        if self.unrestricted or self.max_menu_items == UNLIMITED:
+            return None
+        if not self.is_active:
+            return 0
+        return max(0, self.max_menu_items - current_count)
+
+    def to_cache(self):
+        return {
+            'plan_type': self.plan_type,
+            'status': self.status,
+            'is_active': self.is_active,
+            'max_menu_items': self.max_menu_items,
+            'features': self.features,
+            'unrestricted': self.unrestricted,
+        }
+
+
+def _cache_key(schema_name):
+    version = get_version('entitlements', schema_name)
+    plans_version = get_version('plans', 'all')
+    return f"entitlements:{schema_name}:{version}:{plans_version}"
+
+
+def _in_grace_period(subscription):
+    if subscription.status != 'past_due':
+        return False
+    if subscription.current_period_end is None:
+        return True
+    grace = timedelta(days=getattr(settings, 'SUBSCRIPTION_GRACE_DAYS', 7))
+    return timezone.now() < subscription.current_period_end + grace
+
+
+def _load_entitlements(tenant):
+    from .models import Subscription
+
+    subscription = Subscription.objects.filter(tenant_id=tenant.pk).select_related('plan').first()
+    if subscription is None:
+        # Tenants that have not picked a plan keep working while their own
+        # trial/active status lasts; limits apply once they subscribe.
+        return Entitlements(
+            status=tenant.subscription_status,
+            is_active=tenant.subscription_status in ('trial', 'active'),
+            unrestricted=tenant.subscription_status in ('trial', 'active'),
+        )
+
+    plan = subscription.plan
+    return Entitlements(
+        plan_type=plan.plan_type,
+        status=subscription.status,
+        is_active=subscription.is_active or _in_grace_period(subscription),
+        max_menu_items=plan.max_menu_items,
+        features={name: getattr(plan, name) for name in FEATURES},
+    )
+
+
+def get_tenant_entitlements(tenant):
+    if tenant is None or tenant.schema_name == get_public_schema_name():
+        return Entitlements(unrestricted=True)
+    if not getattr(settings, 'ENFORCE_PLAN_LIMITS', True):
+        return Entitlements(unrestricted=True)
+
+    key = _cache_key(tenant.schema_name)
+    cached = cache.get(key)
+    if cached is not None:
+        return Entitlements(**cached)
+
+    entitlements = _load_entitlements(tenant)
+    cache.set(key, entitlements.to_cache(), ENTITLEMENTS_TTL)
+    return entitlements
+
+
+def get_entitlements(request):
+    """Return the Entitlements for this request's tenant, loading them at most once."""
+    raw = getattr(request, '_request', request)
+    entitlements = getattr(raw, '_entitlements', None)
+    if entitlements is None:
+        entitlements = get_tenant_entitlements(getattr(raw, 'tenant', None))
+        raw._entitlements = entitlements
+    return entitlements
+
+
+def invalidate_entitlements(schema_name):
+    bump_version('entitlements', schema_name)
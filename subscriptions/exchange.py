@@ -0,0 +1,146 @@
+"""
+Exchange rates for plan pricing.
+
+Lookups never touch the network. Rates are read from a short-lived
+in-process copy, then the shared cache, then ExchangeRateSettings in the
+database (live API rates layered over the admin fallback rates). The
+refresh_exchange_rates Celery task fetches new rates from the configured
+provider on a schedule. When a lookup sees rates older than
+EXCHANGE_RATE_MAX_AGE it still serves them and queues a refresh in the
+background (stale-while-revalidate).
+"""
+import logging
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'fx:rates'
+REFRESH_LOCK_KEY = 'fx:refresh-lock'
+LOCAL_TTL = 60
+
+_local = {'rates': None, 'checked_at': 0.0}
+
+
+class ExchangeRateAPIProvider:
+    """Fetches USD-based rates from exchangerate-api.com."""
+
+    def fetch(self, rate_settings):
+        from utils.http import get_http_client
+
+        response = get_http_client().get(
+            f'https://v6.exchangerate-api.com/v6/{rate_settings.api_key}/latest/USD',
+            timeout=5
+        )
+        response.raise_for_status()
+        data = response.json()
+        if data.get('result') != 'success':
+            raise ValueError(f"Exchange rate API returned {data.get('result')}")
+        return data['conversion_rates']
+
+
+class FixtureProvider:
+    """Returns settings.EXCHANGE_RATE_FIXTURE (or a small default table); for tests and local development."""
+
+    DEFAULT_RATES = {'USD': 1.0, 'GHS': 12.68, 'NGN': 1484.90}
+
+    def fetch(self, rate_settings):
+        return dict(getattr(settings, 'EXCHANGE_RATE_FIXTURE', None) or self.DEFAULT_RATES)
+
+
+def get_rate_provider():
+    path = getattr(settings, 'EXCHANGE_RATE_PROVIDER', 'subscriptions.exchange.ExchangeRateAPIProvider')
+    return import_string(path)()
+
+
+def _load_from_db():
+    from .models import ExchangeRateSettings
+
+    rate_settings = ExchangeRateSettings.get_settings()
+    rates = {
+        'USD': 1.0,
+        'GHS': float(rate_settings.usd_to_ghs),
+        'NGN': float(rate_settings.usd_to_ngn),
+    }
+    if rate_settings.use_api and rate_settings.live_rates:
+        rates.update(rate_settings.live_rates)
+    fetched_at = rate_settings.rates_fetched_at if rate_settings.use_api else None
+    return {
+        'rates': rates,
+        'fetched_at': fetched_at.timestamp() if fetched_at else None,
+        'use_api': rate_settings.use_api,
+    }
+
+
+def _is_stale(entry):
+    if not entry['use_api']:
+        return False
+    max_age = getattr(settings, 'EXCHANGE_RATE_MAX_AGE', 6 * 60 * 60)
+    return entry['fetched_at'] is None or time.time() - entry['fetched_at'] > max_age
+
+
+def _schedule_refresh():
+    # An eager Celery setup would run the fetch inline, so leave it to the beat schedule
+    if getattr(settings, 'CELERY_TASK_ALWAYS_EAGER', False):
+        return
+    if not cache.add(REFRESH_LOCK_KEY, 1, 300):
+        return
+    try:
+        from .tasks import refresh_exchange_rates
+        refresh_exchange_rates.delay()
+    except Exception as e:
+        logger.warning("[FX] Could not queue rate refresh: %s", e)
+
+
+def get_rates(use_local=True):
+    """
+    Return {currency: rate per USD} without blocking on the network. Pass
+    use_local=False to skip the in-process copy, e.g. when materializing
+    documents that outlive it.
+    """
+    now = time.monotonic()
+    if use_local and _local['rates'] is not None and now - _local['checked_at'] < LOCAL_TTL:
+        return _local['rates']['rates']
+
+    entry = cache.get(CACHE_KEY)
+    if entry is None:
+        entry = _load_from_db()
+        cache.set(CACHE_KEY, entry, None)
+    if _is_stale(entry):
+        _schedule_refresh()
+
+    _local.update(rates=entry, checked_at=now)
+    return entry['rates']
+
+
+def convert_usd(amount, currency):
+    """Convert a USD amount, rounded to 2 places, or None if the currency has no rate."""
+    rate = get_rates().get(currency)
+    if rate is None:
+        return None
+    return round(float(amount) * float(rate), 2)
+
+
+def invalidate_rates():
+    cache.delete(CACHE_KEY)
+    _local.update(rates=None, checked_at=0.0)
+    from utils.cache import bump_version
+    bump_version('exchange-rates', 'all')
+
+
+def refresh_rates():
+    """Fetch rates from the provider and store them in the database and cache."""
+    from .models import ExchangeRateSettings
+
+    rate_settings = ExchangeRateSettings.get_settings()
+    if not rate_settings.use_api:
+        return None
+    rates = get_rate_provider().fetch(rate_settings)
+    ExchangeRateSettings.objects.filter(pk=rate_settings.pk).update(
+        live_rates=rates, rates_fetched_at=timezone.now(),
+    )
+    invalidate_rates()
+    return rates
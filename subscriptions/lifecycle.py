@@ -0,0 +1,194 @@
+"""
+Subscription lifecycle sweep.
+
+Run by the run_subscription_lifecycle Celery task. Each transition selects
+only the subscriptions that are due, with a range query on an indexed
+(status, date) pair, in batches locked with SKIP LOCKED. A batch moves in one
+UPDATE, its tenants' statuses in one more, and its notification emails in
+one INSERT. The cost of a run grows with the number of due subscriptions,
+not with the number of tenants. A subscription moves at most once per run
+(rows updated since the run started are skipped), so it never gets two
+notices from one sweep.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from utils.cache import bump_version
+
+LIFECYCLE_LOCK_KEY = 'subscriptions:lifecycle:lock'
+BATCH_SIZE = 500
+
+
+class Transition:
+    def __init__(self, name, select, update, tenant_status=None, subject='', heading='', message=''):
+        self.name = name
+        self.select = select
+        self.update = update
+        self.tenant_status = tenant_status
+        self.subject = subject
+        self.heading = heading
+        self.message = message
+
+
+def _grace_period():
+    return timedelta(days=getattr(settings, 'SUBSCRIPTION_GRACE_DAYS', 7))
+
+
+# Cancellations run first so a subscription set to cancel never gets a renewal notice
+TRANSITIONS = (
+    Transition(
+        'cancelled',
+        select=lambda now: {
+            'status__in': ('trialing', 'active', 'past_due'),
+            'current_period_end__lte': now,
+            'cancel_at_period_end': True,
+        },
+        update=lambda now: {'status': 'cancelled', 'cancelled_at': now},
+        tenant_status='cancelled',
+        subject='Your TableTap subscription has ended',
+        heading='Subscription ended',
+        message='Your subscription was cancelled at the end of the billing period. You can resubscribe at any time.',
+    ),
+    Transition(
+        'trial_ended',
+        select=lambda now: {'status': 'trialing', 'trial_end__lte': now},
+        # The grace period runs from the end of the trial, not the first billing period
+        update=lambda now: {'status': 'past_due', 'current_period_end': F('trial_end')},
+        tenant_status='past_due',
+        subject='Your TableTap trial has ended',
+        heading='Your trial has ended',
+        message='Your free trial is over. Add a payment to keep your menu, orders and POS running.',
+    ),
+    Transition(
+        'renewal_due',
+        select=lambda now: {'status': 'active', 'current_period_end__lte': now},
+        update=lambda now: {'status': 'past_due'},
+        tenant_status='past_due',
+        subject='Your TableTap subscription is due for renewal',
+        heading='Renewal due',
+        message='Your billing period has ended. Renew now to avoid interruption.',
+    ),
+    Transition(
+        'expired',
+        select=lambda now: {'status': 'past_due', 'current_period_end__lte': now - _grace_period()},
+        update=lambda now: {'status': 'unpaid', 'expired_at': now},
+        tenant_status='inactive',
+        subject='Your TableTap subscription has expired',
+        heading='Subscription expired',
+        message='We did not receive a renewal payment, so your subscription has expired. Renew to restore access.',
+    ),
+)
+
+
+def _queue_notices(transition, rows):
+    from authentication.services import queue_emails
+    from utils.email import render_emails
+
+    billing_url = f"{getattr(settings, 'FRONTEND_URL', 'https://tabletap.space')}/settings/billing"
+    contexts = [
+        {
+            'email': email,
+            'tenant_name': tenant_name,
+            'plan_name': plan_name,
+            'heading': transition.heading,
+            'message': transition.message,
+            'billing_url': billing_url,
+        }
+        for _, _, _, tenant_name, email, plan_name in rows
+        if email
+    ]
+    bodies = render_emails('subscription_notice', contexts)
+    queue_emails(
+        (context['email'], transition.subject, body, None)
+        for context, body in zip(contexts, bodies)
+    )
+
+
+def _invalidate(schema_names, tenants_changed):
+    for schema_name in schema_names:
+        bump_version('entitlements', schema_name)
+        if tenants_changed:
+            bump_version('restaurant', schema_name)
+    if tenants_changed:
+        bump_version('tenant-resolution', 'all')
+
+
+def apply_transition(transition, now, batch_size=BATCH_SIZE):
+    """Apply one transition to every due subscription. Returns how many moved."""
+    from tenants.models import Tenant
+    from .models import Subscription
+
+    moved = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                Subscription.objects.filter(**transition.select(now), updated_at__lt=now)
+                .select_for_update(skip_locked=True, of=('self',))
+                .order_by('id')
+                .values_list('id', 'tenant_id', 'tenant__schema_name', 'tenant__name',
+                             'tenant__contact_email', 'plan__name')[:batch_size]
+            )
+            if not rows:
+                break
+
+            Subscription.objects.filter(id__in=[row[0] for row in rows]).update(
+                **transition.update(now), updated_at=now,
+            )
+            if transition.tenant_status:
+                Tenant.objects.filter(id__in=[row[1] for row in rows]).update(
+                    subscription_status=transition.tenant_status,
+                )
+            _queue_notices(transition, rows)
+
+            schema_names = [row[2] for row in rows]
+            tenants_changed = bool(transition.tenant_status)
+            # Bind this batch's values; the loop rebinds the names before an outer commit
+            transaction.on_commit(lambda names=schema_names, changed=tenants_changed: _invalidate(names, changed))
+
+        moved += len(rows)
+        if len(rows) < batch_size:
+            break
+    return moved
+
+
+def expire_tenant_trials(now, batch_size=BATCH_SIZE):
+    """Deactivate tenants whose own trial ended without ever creating a subscription."""
+    from tenants.models import Tenant
+
+    expired = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                Tenant.objects.filter(
+                    subscription_status='trial', trial_end_date__lte=now, subscription__isnull=True,
+                )
+                .select_for_update(skip_locked=True, of=('self',))
+                .order_by('id')
+                .values_list('id', 'schema_name')[:batch_size]
+            )
+            if not rows:
+                break
+            Tenant.objects.filter(id__in=[row[0] for row in rows]).update(subscription_status='inactive')
+            schema_names = [row[1] for row in rows]
+            transaction.on_commit(lambda names=schema_names: _invalidate(names, True))
+
+        expired += len(rows)
+        if len(rows) < batch_size:
+            break
+    return expired
+
+
+def run_lifecycle(now=None):
+    """Run every transition once. Returns {transition name: count}, or None if another run holds the lock."""
+    if not cache.add(LIFECYCLE_LOCK_KEY, 1, 15 * 60):
+        return None
+    now = now or timezone.now()
+    try:
+        counts = {transition.name: apply_transition(transition, now) for transition in TRANSITIONS}
+        counts['tenant_trials_expired'] = expire_tenant_trials(now)
+    finally:
+        cache.delete(LIFECYCLE_LOCK_KEY)
+    return counts
@@ -0,0 +1,31 @@
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from subscriptions.reconciliation import compute_billing_metrics
+
+
+class Command(BaseCommand):
+    help = 'Compute the daily billing metrics rollup (MRR, churn, revenue, failed payments)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            help='Day to compute, YYYY-MM-DD (default: today). Earlier days only refresh '
+                 'new/churned counts, revenue and failed payments; MRR is kept as closed.',
+        )
+
+    def handle(self, *args, **options):
+        day = None
+        if options['date']:
+            try:
+                day = datetime.strptime(options['date'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError(f"Invalid date: {options['date']}")
+
+        try:
+            metrics = compute_billing_metrics(day)
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f'{metrics.date}: MRR ${metrics.mrr_usd}, {metrics.active_subscriptions} active, '
+            f'{metrics.churned_subscriptions} churned ({metrics.churn_rate})'
+        ))
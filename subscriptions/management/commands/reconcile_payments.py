@@ -0,0 +1,44 @@
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from subscriptions.reconciliation import CSVSettlementSource, FakeSettlementSource, reconcile
+
+
+class Command(BaseCommand):
+    help = 'Reconcile successful payments against a Paystack settlement report (or the local fake)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', help='Settlement CSV (reference, amount, currency)')
+        parser.add_argument('--fake', action='store_true', help='Use the local fake settlement source')
+        parser.add_argument('--start', help='Period start date, YYYY-MM-DD (default: yesterday)')
+        parser.add_argument('--end', help='Period end date, exclusive, YYYY-MM-DD (default: start + 1 day)')
+
+    def _date(self, value):
+        try:
+            return datetime.combine(datetime.strptime(value, '%Y-%m-%d').date(), time.min, tzinfo=dt_timezone.utc)
+        except ValueError:
+            raise CommandError(f'Invalid date: {value}')
+
+    def handle(self, *args, **options):
+        if bool(options['file']) == options['fake']:
+            raise CommandError('Pass exactly one of --file or --fake')
+
+        if options['start']:
+            start = self._date(options['start'])
+        else:
+            start = datetime.combine(timezone.now().date() - timedelta(days=1), time.min, tzinfo=dt_timezone.utc)
+        end = self._date(options['end']) if options['end'] else start + timedelta(days=1)
+        if end <= start:
+            raise CommandError('--end must be after --start')
+
+        source = CSVSettlementSource.from_path(options['file']) if options['file'] else FakeSettlementSource()
+        run = reconcile(source, start, end)
+
+        if run.status == 'failed':
+            raise CommandError(f'Reconciliation #{run.pk} failed: {run.error}')
+        self.stdout.write(
+            f'Reconciliation #{run.pk}: {run.payments_checked} payments, {run.settlements_checked} settlements, '
+            f'{run.matched} matched, {run.discrepancies} discrepancies'
+        )
+        style = self.style.WARNING if run.discrepancies else self.style.SUCCESS
+        self.stdout.write(style('Done'))
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0004_exchangeratesettings_remove_plan_price_ghs_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exchangeratesettings',
+            name='live_rates',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='exchangeratesettings',
+            name='rates_fetched_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
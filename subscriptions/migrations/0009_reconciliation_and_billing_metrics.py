@@ -0,0 +1,89 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0008_payment_history_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BillingMetrics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('mrr_usd', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('mrr_by_plan', models.JSONField(blank=True, default=dict)),
+                ('active_subscriptions', models.PositiveIntegerField(default=0)),
+                ('trialing_subscriptions', models.PositiveIntegerField(default=0)),
+                ('new_subscriptions', models.PositiveIntegerField(default=0)),
+                ('churned_subscriptions', models.PositiveIntegerField(default=0)),
+                ('churn_rate', models.DecimalField(decimal_places=4, default=0, max_digits=6)),
+                ('revenue', models.JSONField(blank=True, default=dict)),
+                ('failed_payments', models.JSONField(blank=True, default=dict)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Billing metrics',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReconciliationItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('missing_settlement', 'Paid but not settled'), ('unknown_settlement', 'Settled but no payment'), ('status_mismatch', 'Settled but payment not successful'), ('amount_mismatch', 'Amount mismatch'), ('currency_mismatch', 'Currency mismatch')], max_length=30)),
+                ('reference', models.CharField(max_length=100)),
+                ('expected_amount', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('settled_amount', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('currency', models.CharField(blank=True, max_length=3)),
+                ('detail', models.CharField(blank=True, max_length=255)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReconciliationRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=255)),
+                ('period_start', models.DateTimeField()),
+                ('period_end', models.DateTimeField()),
+                ('status', models.CharField(choices=[('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='running', max_length=20)),
+                ('payments_checked', models.PositiveIntegerField(default=0)),
+                ('settlements_checked', models.PositiveIntegerField(default=0)),
+                ('matched', models.PositiveIntegerField(default=0)),
+                ('discrepancies', models.PositiveIntegerField(default=0)),
+                ('totals', models.JSONField(blank=True, default=dict)),
+                ('error', models.TextField(blank=True)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['status', 'paid_at'], name='payment_status_paid_idx'),
+        ),
+        migrations.AddField(
+            model_name='reconciliationitem',
+            name='payment',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='subscriptions.payment'),
+        ),
+        migrations.AddField(
+            model_name='reconciliationitem',
+            name='run',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='subscriptions.reconciliationrun'),
+        ),
+        migrations.AddIndex(
+            model_name='reconciliationitem',
+            index=models.Index(fields=['run', 'kind'], name='subscriptio_run_id_fccfae_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0009_reconciliation_and_billing_metrics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subscription',
+            name='expired_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0010_subscription_expired_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plan',
+            name='billing_cycle',
+            field=models.CharField(choices=[('monthly', 'Monthly'), ('yearly', 'Yearly')], default='monthly', max_length=10),
+        ),
+    ]
@@ -1,6 +1,5 @@
 from django.db import models
 from tenants.models import Tenant
-import requests
 
 class ExchangeRateSettings(models.Model):
     """Admin-configurable exchange rates as fallback"""
@@ -10,6 +9,10 @@ class ExchangeRateSettings(models.Model):
     use_api = models.BooleanField(default=True, help_text="Use live API rates when available")
     api_key = models.CharField(max_length=100, default='28f53f97e95df6d8f7ab87ec', help_text="ExchangeRate-API key")
     
+    # Last successful API refresh (written by the periodic refresh task)
+    live_rates = models.JSONField(default=dict, blank=True)
+    rates_fetched_at = models.DateTimeField(null=True, blank=True)
+    
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
@@ -39,6 +42,11 @@ class Plan(models.Model):
     
     # Base price in USD
     price_usd = models.DecimalField(max_digits=10, decimal_places=2)
+    billing_cycle = models.CharField(
+        max_length=10,
+        choices=[('monthly', 'Monthly'), ('yearly', 'Yearly')],
+        default='monthly'
+    )
     
     # Features included
     includes_digital_menu = models.BooleanField(default=False)
@@ -81,40 +89,13 @@ class Plan(models.Model):
         return f"{self.name} - ${self.price_usd}/month"
     
     def get_price_in_currency(self, currency='USD'):
-        """Convert USD price to other currencies using exchange rate API"""
+        """Convert USD price to other currencies using the cached exchange rates"""
         if currency == 'USD':
             return self.price_usd
         
-        settings = ExchangeRateSettings.get_settings()
-        
-        if settings.use_api:
-            try:
-                # Using exchangerate-api.com with API key
-                response = requests.get(
-                    f'https://v6.exchangerate-api.com/v6/{settings.api_key}/latest/USD',
-                    timeout=5
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    if data['result'] == 'success':
-                        rates = data['conversion_rates']
-                        if currency in rates:
-                            converted_price = float(self.price_usd) * rates[currency]
-                            return round(converted_price, 2)
-            except:
-                pass
-        
-        # Use admin-configured fallback rates
-        fallback_rates = {
-            'GHS': float(settings.usd_to_ghs),
-            'NGN': float(settings.usd_to_ngn),
-        }
-        
-        if currency in fallback_rates:
-            converted_price = float(self.price_usd) * fallback_rates[currency]
-            return round(converted_price, 2)
-        
-        return self.price_usd
+        from .exchange import convert_usd
+        converted_price = convert_usd(self.price_usd, currency)
+        return self.price_usd if converted_price is None else converted_price
     
     @property
     def features_list(self):
@@ -181,10 +162,19 @@ class Subscription(models.Model):
     # Cancellation
     cancel_at_period_end = models.BooleanField(default=False)
     cancelled_at = models.DateTimeField(null=True, blank=True)
+    # Set when the lifecycle job marks the subscription unpaid
+    expired_at = models.DateTimeField(null=True, blank=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        # Range scans for the lifecycle job (subscriptions.lifecycle)
+        indexes = [
+            models.Index(fields=['status', 'current_period_end'], name='subscription_status_period_idx'),
+            models.Index(fields=['status', 'trial_end'], name='subscription_status_trial_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.tenant.name} - {self.plan.name} ({self.status})"
     
@@ -226,5 +216,133 @@ class Payment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        # Keyset pagination of a subscription's payment history
+        indexes = [
+            models.Index(fields=['subscription', '-created_at'], name='payment_sub_created_idx'),
+            # Period scans for reconciliation and billing metrics
+            models.Index(fields=['status', 'paid_at'], name='payment_status_paid_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.subscription.tenant.name} - {self.amount} {self.currency} ({self.status})"
+
+
+class PaystackEvent(models.Model):
+    """Inbox of verified Paystack webhook deliveries, applied asynchronously in arrival order"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processed', 'Processed'),
+        ('ignored', 'Ignored'),
+        ('failed', 'Failed'),
+    ]
+    
+    # event name + Paystack object id (or reference); duplicate deliveries collide here
+    idempotency_key = models.CharField(max_length=255, unique=True)
+    event = models.CharField(max_length=64)
+    reference = models.CharField(max_length=100, blank=True, db_index=True)
+    payload = models.JSONField(default=dict)
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['received_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'received_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.event} {self.reference} ({self.status})"
+
+
+class ReconciliationRun(models.Model):
+    """One pass matching successful Payments against a Paystack settlement report"""
+    STATUS_CHOICES = [
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    source = models.CharField(max_length=255)
+    period_start = models.DateTimeField()
+    period_end = models.DateTimeField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='running')
+    
+    # Totals over the run, filled in when it completes
+    payments_checked = models.PositiveIntegerField(default=0)
+    settlements_checked = models.PositiveIntegerField(default=0)
+    matched = models.PositiveIntegerField(default=0)
+    discrepancies = models.PositiveIntegerField(default=0)
+    totals = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+    
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-started_at']
+    
+    def __str__(self):
+        return f"Reconciliation {self.period_start:%Y-%m-%d} to {self.period_end:%Y-%m-%d} ({self.status})"
+
+
+class ReconciliationItem(models.Model):
+    """A payment or settlement line that did not reconcile cleanly"""
+    KIND_CHOICES = [
+        ('missing_settlement', 'Paid but not settled'),
+        ('unknown_settlement', 'Settled but no payment'),
+        ('status_mismatch', 'Settled but payment not successful'),
+        ('amount_mismatch', 'Amount mismatch'),
+        ('currency_mismatch', 'Currency mismatch'),
+    ]
+    
+    run = models.ForeignKey(ReconciliationRun, on_delete=models.CASCADE, related_name='items')
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    reference = models.CharField(max_length=100)
+    payment = models.ForeignKey(Payment, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    expected_amount = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    settled_amount = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    currency = models.CharField(max_length=3, blank=True)
+    detail = models.CharField(max_length=255, blank=True)
+    
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['run', 'kind']),
+        ]
+    
+    def __str__(self):
+        return f"{self.reference} ({self.kind})"
+
+
+class BillingMetrics(models.Model):
+    """Daily platform billing rollup: MRR, churn and payment outcomes"""
+    date = models.DateField(unique=True)
+    
+    # Recurring revenue from active subscriptions, in USD plan prices
+    mrr_usd = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    mrr_by_plan = models.JSONField(default=dict, blank=True)
+    
+    active_subscriptions = models.PositiveIntegerField(default=0)
+    trialing_subscriptions = models.PositiveIntegerField(default=0)
+    new_subscriptions = models.PositiveIntegerField(default=0)
+    churned_subscriptions = models.PositiveIntegerField(default=0)
+    churn_rate = models.DecimalField(max_digits=6, decimal_places=4, default=0)
+    
+    # {currency: {"count": n, "amount": "..."}}
+    revenue = models.JSONField(default=dict, blank=True)
+    failed_payments = models.JSONField(default=dict, blank=True)
+    
+    computed_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-date']
+        verbose_name_plural = "Billing metrics"
+    
+    def __str__(self):
+        return f"Billing metrics {self.date} (MRR ${self.mrr_usd})"
@@ -1,5 +1,5 @@
-import requests
 from django.conf import settings
+from utils.http import get_http_client
 
 class PaystackAPI:
     BASE_URL = 'https://api.paystack.co'
@@ -10,6 +10,7 @@ class PaystackAPI:
             'Authorization': f'Bearer {self.secret_key}',
             'Content-Type': 'application/json'
         }
+        self.http = get_http_client()
     
     def create_customer(self, email, first_name, last_name, phone=None):
         """Create a customer on Paystack"""
@@ -22,7 +23,7 @@ class PaystackAPI:
         if phone:
             data['phone'] = phone
         
-        response = requests.post(url, json=data, headers=self.headers)
+        response = self.http.post(url, json=data, headers=self.headers)
         return response.json()
     
     def create_plan(self, name, amount, currency='NGN', interval='monthly'):
@@ -30,12 +31,12 @@ class PaystackAPI:
         url = f'{self.BASE_URL}/plan'
         data = {
             'name': name,
-            'amount': int(amount * 100),  # Paystack uses kobo/cents
+            'amount': int(round(amount * 100)),  # Paystack uses kobo/cents
             'currency': currency,
             'interval': interval
         }
         
-        response = requests.post(url, json=data, headers=self.headers)
+        response = self.http.post(url, json=data, headers=self.headers)
         return response.json()
     
     def create_subscription(self, customer_code, plan_code):
@@ -46,7 +47,7 @@ class PaystackAPI:
             'plan': plan_code
         }
         
-        response = requests.post(url, json=data, headers=self.headers)
+        response = self.http.post(url, json=data, headers=self.headers)
         return response.json()
     
     def initialize_payment(self, email, amount, currency='NGN', callback_url=None):
@@ -54,17 +55,17 @@ class PaystackAPI:
         url = f'{self.BASE_URL}/transaction/initialize'
         data = {
             'email': email,
-            'amount': int(amount * 100),  # Convert to kobo/cents
+            'amount': int(round(amount * 100)),  # Convert to kobo/cents
             'currency': currency
         }
         if callback_url:
             data['callback_url'] = callback_url
         
-        response = requests.post(url, json=data, headers=self.headers)
+        response = self.http.post(url, json=data, headers=self.headers)
         return response.json()
     
     def verify_payment(self, reference):
         """Verify a payment"""
         url = f'{self.BASE_URL}/transaction/verify/{reference}'
-        response = requests.get(url, headers=self.headers)
+        response = self.http.get(url, headers=self.headers)
         return response.json()
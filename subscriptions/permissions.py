@@ -0,0 +1,24 @@
+from rest_framework.permissions import BasePermission
+from .entitlements import get_entitlements
+
+
+class HasEntitlement(BasePermission):
+    """
+    Grants access when the tenant's plan includes the view's
+    `required_entitlement` feature (e.g. 'includes_pos',
+    'has_advanced_analytics'). Views without `required_entitlement` are not
+    restricted.
+    """
+    message = 'Your current plan does not include this feature.'
+    feature = None
+
+    def has_permission(self, request, view):
+        feature = getattr(view, 'required_entitlement', None) or self.feature
+        if not feature:
+            return True
+        return get_entitlements(request).has_feature(feature)
+
+
+def requires_feature(feature):
+    """HasEntitlement bound to one feature, for function views: @permission_classes([requires_feature('includes_pos')])."""
+    return type(f'Requires_{feature}', (HasEntitlement,), {'feature': feature})
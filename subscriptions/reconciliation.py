@@ -0,0 +1,295 @@
+"""
+Payment reconciliation and platform billing metrics.
+
+reconcile() matches successful Payments in a period against a Paystack
+settlement report. The report is read into a dict keyed by reference (one
+entry per settled transaction). Payments are streamed from the database
+in chunks. Each payment takes its settlement line out of the dict, and any
+lines left over are looked up by reference in chunks. Only discrepancies
+are stored, as ReconciliationItems under a ReconciliationRun.
+
+Large runs are handed to the run_reconciliation Celery task: start_run()
+records the run, and reconcile() fills in an existing run.
+
+compute_billing_metrics() rolls MRR, churn, revenue and failed payments for
+one day into BillingMetrics with a handful of aggregate queries. MRR and the
+active/trialing counts are a snapshot of the current state, so they are only
+written for today (UTC); recomputing an earlier day refreshes just its
+new/churned counts, revenue and failed payments. The hourly task computes
+today and re-closes yesterday, so activity after the last run before
+midnight is still counted.
+"""
+import csv
+import io
+import logging
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal, InvalidOperation
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+from .models import BillingMetrics, Payment, ReconciliationItem, ReconciliationRun, Subscription
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 2000
+AMOUNT_TOLERANCE = Decimal('0.01')
+
+
+class SettlementError(ValueError):
+    pass
+
+
+def _parse_amount(value, reference):
+    try:
+        return Decimal(str(value).replace(',', '').strip())
+    except (InvalidOperation, AttributeError):
+        raise SettlementError(f"Invalid amount {value!r} for {reference}")
+
+
+class CSVSettlementSource:
+    """
+    A settlement report exported from the Paystack dashboard. Needs reference,
+    amount (in major units) and currency columns; header names are matched
+    case-insensitively and 'transaction_reference' is accepted for reference.
+    """
+    ALIASES = {'transaction_reference': 'reference', 'transaction reference': 'reference'}
+
+    def __init__(self, text, name='upload.csv'):
+        self.text = text.lstrip('\ufeff')
+        self.name = name
+
+    @classmethod
+    def from_path(cls, path):
+        with open(path, encoding='utf-8') as fh:
+            return cls(fh.read(), name=path)
+
+    def __str__(self):
+        return f"csv:{self.name}"
+
+    def entries(self, period_start, period_end):
+        reader = csv.DictReader(io.StringIO(self.text))
+        for line, row in enumerate(reader, start=2):
+            row = {self.ALIASES.get(key.strip().lower(), key.strip().lower()): (value or '').strip()
+                   for key, value in row.items() if key}
+            reference = row.get('reference')
+            if not reference:
+                raise SettlementError(f"Line {line}: missing reference")
+            yield {
+                'reference': reference,
+                'amount': _parse_amount(row.get('amount'), reference),
+                'currency': row.get('currency', '').upper(),
+            }
+
+
+class FakeSettlementSource:
+    """
+    Local stand-in for a settlement report: every successful payment in the
+    period settles in full. Entries listed in `overrides` (reference ->
+    fields, or None to drop the line) let development runs produce
+    discrepancies.
+    """
+
+    def __init__(self, overrides=None):
+        self.overrides = overrides or {}
+
+    def __str__(self):
+        return 'fake'
+
+    def entries(self, period_start, period_end):
+        payments = (
+            Payment.objects.filter(status='success', paid_at__gte=period_start, paid_at__lt=period_end)
+            .values_list('paystack_reference', 'amount', 'currency')
+            .iterator(chunk_size=CHUNK_SIZE)
+        )
+        for reference, amount, currency in payments:
+            entry = {'reference': reference, 'amount': amount, 'currency': currency}
+            if reference in self.overrides:
+                if self.overrides[reference] is None:
+                    continue
+                entry.update(self.overrides[reference])
+            yield entry
+
+
+def _load_settlements(source, period_start, period_end):
+    settlements = {}
+    for entry in source.entries(period_start, period_end):
+        if entry['reference'] in settlements:
+            raise SettlementError(f"Duplicate settlement for {entry['reference']}")
+        settlements[entry['reference']] = entry
+    return settlements
+
+
+def _add(totals, key, currency, amount):
+    bucket = totals.setdefault(key, {})
+    bucket[currency] = str(Decimal(bucket.get(currency, '0')) + amount)
+
+
+def _compare(payment_id, reference, amount, currency, settlement):
+    """Return a ReconciliationItem for a mismatched payment, or None if it matches."""
+    if settlement is None:
+        return ReconciliationItem(
+            kind='missing_settlement', reference=reference, payment_id=payment_id,
+            expected_amount=amount, currency=currency,
+        )
+    if settlement['currency'] and settlement['currency'] != currency:
+        return ReconciliationItem(
+            kind='currency_mismatch', reference=reference, payment_id=payment_id,
+            expected_amount=amount, settled_amount=settlement['amount'], currency=currency,
+            detail=f"Settled in {settlement['currency']}",
+        )
+    if abs(settlement['amount'] - amount) > AMOUNT_TOLERANCE:
+        return ReconciliationItem(
+            kind='amount_mismatch', reference=reference, payment_id=payment_id,
+            expected_amount=amount, settled_amount=settlement['amount'], currency=currency,
+        )
+    return None
+
+
+def start_run(source, period_start, period_end):
+    """Record a 'running' ReconciliationRun for reconcile() or the run_reconciliation task to fill in."""
+    return ReconciliationRun.objects.create(source=str(source), period_start=period_start, period_end=period_end)
+
+
+def reconcile(source, period_start, period_end, run=None):
+    """Reconcile one period against a settlement source and return the ReconciliationRun."""
+    run = run or start_run(source, period_start, period_end)
+    try:
+        settlements = _load_settlements(source, period_start, period_end)
+        run.settlements_checked = len(settlements)
+        totals = {}
+        items = []
+
+        payments = (
+            Payment.objects.filter(status='success', paid_at__gte=period_start, paid_at__lt=period_end)
+            .order_by('id')
+            .values_list('id', 'paystack_reference', 'amount', 'currency')
+            .iterator(chunk_size=CHUNK_SIZE)
+        )
+        for payment_id, reference, amount, currency in payments:
+            run.payments_checked += 1
+            _add(totals, 'paid', currency, amount)
+            settlement = settlements.pop(reference, None)
+            if settlement is not None:
+                _add(totals, 'settled', settlement['currency'] or currency, settlement['amount'])
+            item = _compare(payment_id, reference, amount, currency, settlement)
+            if item is None:
+                run.matched += 1
+            else:
+                items.append(item)
+            if len(items) >= CHUNK_SIZE:
+                run.discrepancies += _save_items(run, items)
+
+        # Settled lines without a successful payment in the period
+        leftovers = list(settlements.values())
+        for start in range(0, len(leftovers), CHUNK_SIZE):
+            chunk = leftovers[start:start + CHUNK_SIZE]
+            known = Payment.objects.in_bulk([entry['reference'] for entry in chunk], field_name='paystack_reference')
+            for entry in chunk:
+                _add(totals, 'settled', entry['currency'] or 'unknown', entry['amount'])
+                payment = known.get(entry['reference'])
+                if payment is None:
+                    items.append(ReconciliationItem(
+                        kind='unknown_settlement', reference=entry['reference'],
+                        settled_amount=entry['amount'], currency=entry['currency'],
+                    ))
+                elif payment.status != 'success':
+                    items.append(ReconciliationItem(
+                        kind='status_mismatch', reference=entry['reference'], payment_id=payment.id,
+                        expected_amount=payment.amount, settled_amount=entry['amount'],
+                        currency=payment.currency, detail=f"Payment is {payment.status}",
+                    ))
+                else:
+                    # Settled in this report but paid outside the period
+                    item = _compare(payment.id, payment.paystack_reference, payment.amount, payment.currency, entry)
+                    if item is None:
+                        run.matched += 1
+                    else:
+                        item.detail = item.detail or 'Paid outside the period'
+                        items.append(item)
+            run.discrepancies += _save_items(run, items)
+
+        run.discrepancies += _save_items(run, items)
+        run.totals = totals
+        run.status = 'completed'
+    except Exception as e:
+        logger.exception("[Reconciliation] Run %s failed", run.pk)
+        run.status = 'failed'
+        run.error = str(e)
+    run.finished_at = timezone.now()
+    run.save()
+    return run
+
+
+def _save_items(run, items):
+    for item in items:
+        item.run = run
+    ReconciliationItem.objects.bulk_create(items, batch_size=CHUNK_SIZE)
+    saved = len(items)
+    items.clear()
+    return saved
+
+
+def _money_rollup(queryset, amount_field='amount'):
+    return {
+        row['currency']: {'count': row['count'], 'amount': str(row['total'] or Decimal('0'))}
+        for row in queryset.values('currency').annotate(count=Count('id'), total=Sum(amount_field))
+    }
+
+
+def compute_billing_metrics(day=None):
+    """
+    Compute and store the BillingMetrics row for `day` (default: today, UTC).
+    The MRR and active/trialing snapshot is only taken for today; earlier days
+    keep the snapshot they were closed with.
+    """
+    today = timezone.now().date()
+    day = day or today
+    if day > today:
+        raise ValueError(f"Cannot compute billing metrics for a future day ({day})")
+    start = datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+    end = start + timedelta(days=1)
+
+    counts = Subscription.objects.aggregate(
+        new=Count('id', filter=Q(created_at__gte=start, created_at__lt=end)),
+        # Each counts the day the subscription left: cancelled_at for
+        # cancellations, expired_at when the lifecycle job marks it unpaid
+        churned=Count('id', filter=(
+            Q(status='cancelled', cancelled_at__gte=start, cancelled_at__lt=end)
+            | Q(status='unpaid', expired_at__gte=start, expired_at__lt=end)
+        )),
+    )
+    defaults = {
+        'new_subscriptions': counts['new'],
+        'churned_subscriptions': counts['churned'],
+        'revenue': _money_rollup(Payment.objects.filter(status='success', paid_at__gte=start, paid_at__lt=end)),
+        'failed_payments': _money_rollup(Payment.objects.filter(status='failed', created_at__gte=start, created_at__lt=end)),
+    }
+
+    with transaction.atomic():
+        if day == today:
+            by_plan = {
+                row['plan__plan_type']: {'count': row['count'], 'mrr_usd': str(row['mrr'] or Decimal('0'))}
+                for row in Subscription.objects.filter(status='active')
+                .values('plan__plan_type')
+                .annotate(count=Count('id'), mrr=Sum('plan__price_usd'))
+            }
+            snapshot = Subscription.objects.aggregate(
+                active=Count('id', filter=Q(status='active')),
+                trialing=Count('id', filter=Q(status='trialing')),
+            )
+            defaults.update({
+                'mrr_usd': sum((Decimal(plan['mrr_usd']) for plan in by_plan.values()), Decimal('0')),
+                'mrr_by_plan': by_plan,
+                'active_subscriptions': snapshot['active'],
+                'trialing_subscriptions': snapshot['trialing'],
+            })
+            active = snapshot['active']
+        else:
+            existing = BillingMetrics.objects.select_for_update().filter(date=day).first()
+            active = existing.active_subscriptions if existing else 0
+
+        base = active + counts['churned']
+        churn_rate = Decimal(counts['churned']) / base if base else Decimal('0')
+        defaults['churn_rate'] = churn_rate.quantize(Decimal('0.0001'))
+        metrics, _ = BillingMetrics.objects.update_or_create(date=day, defaults=defaults)
+    return metrics
@@ -10,7 +10,7 @@ class PlanSerializer(serializers.ModelSerializer):
         model = Plan
         fields = [
             'id', 'name', 'plan_type', 'description', 
-            'price_usd', 'price_ghs', 'price_ngn',
+            'price_usd', 'price_ghs', 'price_ngn', 'billing_cycle',
             'includes_digital_menu', 'includes_pos', 'includes_cms',
             'allows_menu_images', 'max_menu_items', 'has_basic_analytics', 'has_advanced_analytics',
             'has_multi_location', 'has_custom_integrations', 'support_level',
@@ -40,11 +40,13 @@ class SubscriptionSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at', 'updated_at']
 
 class PaymentSerializer(serializers.ModelSerializer):
+    plan_name = serializers.CharField(source='subscription.plan.name', read_only=True)
+    
     class Meta:
         model = Payment
         fields = [
             'id', 'amount', 'currency', 'status', 'payment_method',
-            'paid_at', 'created_at'
+            'plan_name', 'paid_at', 'created_at'
         ]
         read_only_fields = ['created_at']
 
@@ -0,0 +1,27 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from utils.conditional import bump_on_commit
+from .exchange import invalidate_rates
+from .models import ExchangeRateSettings, Payment, Plan, Subscription
+
+
+@receiver(post_save, sender=ExchangeRateSettings)
+def invalidate_exchange_rates(sender, **kwargs):
+    invalidate_rates()
+
+
+@receiver(post_save, sender=Plan)
+@receiver(post_delete, sender=Plan)
+def invalidate_plan_catalog(sender, **kwargs):
+    bump_on_commit('plans', 'all')
+
+
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def invalidate_subscription_entitlements(sender, instance, **kwargs):
+    bump_on_commit('entitlements', instance.tenant.schema_name)
+
+
+@receiver(post_save, sender=Payment)
+def invalidate_payment_entitlements(sender, instance, **kwargs):
+    bump_on_commit('entitlements', instance.subscription.tenant.schema_name)
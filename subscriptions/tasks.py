@@ -0,0 +1,63 @@
+import logging
+from datetime import timedelta
+from celery import shared_task
+from django.core.cache import cache
+from .exchange import REFRESH_LOCK_KEY, refresh_rates
+from .lifecycle import run_lifecycle
+from .models import ReconciliationRun
+from .reconciliation import CSVSettlementSource, FakeSettlementSource, compute_billing_metrics, reconcile
+from .webhooks import process_pending_events
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def refresh_exchange_rates():
+    """Fetch live exchange rates into the database and cache (runs on the beat schedule)."""
+    try:
+        rates = refresh_rates()
+    except Exception as e:
+        logger.warning("[FX] Rate refresh failed, keeping previous rates: %s", e)
+        return 'Rate refresh failed'
+    finally:
+        cache.delete(REFRESH_LOCK_KEY)
+    if rates is None:
+        return 'Live rates disabled'
+    return f"Refreshed {len(rates)} exchange rates."
+
+
+@shared_task
+def process_paystack_events():
+    """Apply pending Paystack webhook events (queued by the webhook and swept on the beat schedule)."""
+    handled = process_pending_events()
+    return f"Processed {handled} Paystack events."
+
+
+@shared_task
+def run_subscription_lifecycle():
+    """Move due subscriptions through renewal, expiry and trial end (runs on the beat schedule)."""
+    counts = run_lifecycle()
+    if counts is None:
+        return 'Lifecycle run already in progress'
+    return ', '.join(f"{name}: {count}" for name, count in counts.items())
+
+
+@shared_task
+def compute_daily_billing_metrics():
+    """
+    Refresh today's BillingMetrics rollup and re-close yesterday's flow
+    figures, which picks up activity after the last run before midnight
+    (runs hourly on the beat schedule).
+    """
+    metrics = compute_billing_metrics()
+    compute_billing_metrics(metrics.date - timedelta(days=1))
+    return f"Billing metrics for {metrics.date}: MRR ${metrics.mrr_usd}"
+
+
+@shared_task
+def run_reconciliation(run_id, csv_text=None, csv_name=None):
+    """Reconcile a run started by the superadmin API (csv_text, or the fake source when omitted)."""
+    run = ReconciliationRun.objects.get(id=run_id)
+    source = CSVSettlementSource(csv_text, name=csv_name) if csv_text is not None else FakeSettlementSource()
+    run = reconcile(source, run.period_start, run.period_end, run=run)
+    return f"Reconciliation run {run.id}: {run.status}"
@@ -0,0 +1,128 @@
+import hashlib
+import hmac
+import json
+from datetime import timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+from .models import PaystackEvent
+from .views import paystack_webhook
+from .webhooks import _apply_charge_success, idempotency_key, record_event, verify_signature
+
+SECRET = 'sk_test_secret'
+
+
+def _sign(body):
+    return hmac.new(SECRET.encode('utf-8'), body, hashlib.sha512).hexdigest()
+
+
+def _charge_payload(reference='ref-1', amount=5000):
+    return {
+        'event': 'charge.success',
+        'data': {'id': 42, 'reference': reference, 'amount': amount, 'currency': 'GHS', 'channel': 'card'},
+    }
+
+
+@override_settings(PAYSTACK_SECRET_KEY=SECRET)
+class VerifySignatureTests(SimpleTestCase):
+
+    def test_accepts_hmac_of_raw_body(self):
+        body = json.dumps(_charge_payload()).encode('utf-8')
+        self.assertTrue(verify_signature(body, _sign(body)))
+
+    def test_rejects_tampered_body(self):
+        body = json.dumps(_charge_payload()).encode('utf-8')
+        signature = _sign(body)
+        self.assertFalse(verify_signature(body.replace(b'5000', b'1'), signature))
+
+    def test_rejects_missing_signature(self):
+        self.assertFalse(verify_signature(b'{}', ''))
+
+    @override_settings(PAYSTACK_SECRET_KEY='')
+    def test_rejects_everything_without_a_secret(self):
+        self.assertFalse(verify_signature(b'{}', _sign(b'{}')))
+
+    def test_webhook_rejects_bad_signature(self):
+        body = json.dumps(_charge_payload())
+        request = APIRequestFactory().post(
+            '/webhook/paystack/', body, content_type='application/json', HTTP_X_PAYSTACK_SIGNATURE='bad',
+        )
+        with mock.patch('subscriptions.webhooks.record_event') as record:
+            response = paystack_webhook(request)
+        self.assertEqual(response.status_code, 401)
+        record.assert_not_called()
+
+
+class IdempotencyKeyTests(SimpleTestCase):
+
+    def test_same_event_same_key(self):
+        self.assertEqual(idempotency_key(_charge_payload()), idempotency_key(_charge_payload()))
+
+    def test_different_event_types_do_not_collide(self):
+        other = {**_charge_payload(), 'event': 'charge.failed'}
+        self.assertNotEqual(idempotency_key(_charge_payload()), idempotency_key(other))
+
+
+@override_settings(PAYSTACK_SECRET_KEY=SECRET)
+class ReplayTests(TestCase):
+
+    def _post(self, payload):
+        body = json.dumps(payload)
+        request = APIRequestFactory().post(
+            '/webhook/paystack/', body, content_type='application/json',
+            HTTP_X_PAYSTACK_SIGNATURE=_sign(body.encode('utf-8')),
+        )
+        return paystack_webhook(request)
+
+    def test_record_event_returns_existing_event_on_replay(self):
+        first, created = record_event(_charge_payload())
+        replay, replay_created = record_event(_charge_payload())
+        self.assertTrue(created)
+        self.assertFalse(replay_created)
+        self.assertEqual(first.pk, replay.pk)
+        self.assertEqual(PaystackEvent.objects.count(), 1)
+
+    def test_replayed_delivery_is_acknowledged_but_not_queued_again(self):
+        with mock.patch('subscriptions.tasks.process_paystack_events.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                first = self._post(_charge_payload())
+            with self.captureOnCommitCallbacks(execute=True):
+                replay = self._post(_charge_payload())
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(replay.status_code, 200)
+        self.assertEqual(delay.call_count, 1)
+        self.assertEqual(PaystackEvent.objects.count(), 1)
+
+
+class ChargeSuccessTests(SimpleTestCase):
+
+    def _payment(self, billing_cycle):
+        tenant = mock.Mock(subscription_status='past_due')
+        subscription = mock.Mock(plan=SimpleNamespace(billing_cycle=billing_cycle), tenant=tenant)
+        return mock.Mock(status='pending', amount=Decimal('50.00'), currency='GHS', subscription=subscription)
+
+    def _apply(self, payment):
+        event = SimpleNamespace(payload=_charge_payload(), reference='ref-1')
+        _apply_charge_success(event, {'ref-1': payment})
+        return payment.subscription
+
+    def test_yearly_plan_moves_period_end_by_a_year(self):
+        subscription = self._apply(self._payment('yearly'))
+        self.assertEqual(subscription.current_period_end - subscription.current_period_start, timedelta(days=365))
+        self.assertEqual(subscription.status, 'active')
+
+    def test_monthly_plan_moves_period_end_by_thirty_days(self):
+        subscription = self._apply(self._payment('monthly'))
+        self.assertEqual(subscription.current_period_end - subscription.current_period_start, timedelta(days=30))
+
+    def test_replayed_charge_does_not_extend_the_period_again(self):
+        payment = self._payment('yearly')
+        payment.status = 'success'
+        period_end = timezone.now()
+        payment.subscription.current_period_end = period_end
+        self._apply(payment)
+        self.assertEqual(payment.subscription.current_period_end, period_end)
+        payment.save.assert_not_called()
@@ -1,5 +1,6 @@
 from rest_framework import status, permissions
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import action, api_view, authentication_classes, permission_classes
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 from django.shortcuts import get_object_or_404
@@ -10,13 +11,39 @@ from drf_yasg import openapi
 import uuid
 import requests
 from django.conf import settings
+from utils.http import get_http_client
 
 from .models import Plan, Subscription, Payment
 from .serializers import (
     PlanSerializer, SubscriptionSerializer, PaymentSerializer,
     CreateSubscriptionSerializer, PaystackPaymentSerializer
 )
-from tenants.models import Tenant
+
+def _get_user_tenant(request):
+    """
+    The tenant whose billing this user manages. A tenant already resolved for
+    the request must be owned by the user; otherwise the user's own tenant is
+    looked up from the cached owner mapping.
+    """
+    from django_tenants.utils import get_public_schema_name
+    from tenants.middleware import get_owned_tenant
+
+    user = request.user
+    tenant = getattr(request, 'tenant', None)
+    if tenant is not None and tenant.schema_name != get_public_schema_name():
+        owns = tenant.owner_id == user.pk or (
+            user.clerk_user_id and tenant.clerk_organization_id == user.clerk_user_id
+        )
+        return tenant if owns else None
+    return get_owned_tenant(user)
+
+
+class PaymentHistoryPagination(CursorPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = '-created_at'
+
 
 class PlanViewSet(ModelViewSet):
     """
@@ -28,6 +55,23 @@ class PlanViewSet(ModelViewSet):
     permission_classes = [permissions.AllowAny]  # Plans are public
     http_method_names = ['get']  # Read-only for customers
 
+    @action(detail=False, methods=['get'])
+    def catalog(self, request):
+        """All active plans priced in every supported currency, as one cached document."""
+        from django.http import HttpResponse
+        from utils.conditional import etag_matches
+        from .catalog import get_catalog
+
+        catalog = get_catalog()
+        etag = f'"{catalog["version"]}"'
+        if etag_matches(request, etag):
+            response = HttpResponse(status=304)
+        else:
+            response = HttpResponse(catalog['body'], content_type='application/json')
+        response['ETag'] = etag
+        response['Cache-Control'] = 'public, max-age=60'
+        return response
+
 @swagger_auto_schema(
     method='get',
     operation_description="Get current user's subscription details",
@@ -40,14 +84,15 @@ class PlanViewSet(ModelViewSet):
 @permission_classes([permissions.IsAuthenticated])
 def get_user_subscription(request):
     """Get current user's subscription"""
+    tenant = _get_user_tenant(request)
+    if tenant is None:
+        return Response({'error': 'No subscription found'}, status=404)
     try:
-        # Get user's tenant
-        tenant = Tenant.objects.get(clerk_organization_id=request.user.clerk_user_id)
-        subscription = Subscription.objects.get(tenant=tenant)
-        serializer = SubscriptionSerializer(subscription)
-        return Response(serializer.data)
-    except (Tenant.DoesNotExist, Subscription.DoesNotExist):
+        subscription = Subscription.objects.select_related('plan').get(tenant_id=tenant.pk)
+    except Subscription.DoesNotExist:
         return Response({'error': 'No subscription found'}, status=404)
+    serializer = SubscriptionSerializer(subscription)
+    return Response(serializer.data)
 
 @swagger_auto_schema(
     method='post',
@@ -64,12 +109,12 @@ def create_subscription(request):
     """Create a new subscription for the user's tenant"""
     serializer = CreateSubscriptionSerializer(data=request.data)
     if serializer.is_valid():
+        tenant = _get_user_tenant(request)
+        if tenant is None:
+            return Response({'error': 'No tenant found for user'}, status=404)
         try:
-            # Get user's tenant
-            tenant = Tenant.objects.get(clerk_organization_id=request.user.clerk_user_id)
-            
             # Check if tenant already has a subscription
-            if hasattr(tenant, 'subscription'):
+            if Subscription.objects.filter(tenant_id=tenant.pk).exists():
                 return Response({'error': 'Tenant already has a subscription'}, status=400)
             
             plan = Plan.objects.get(id=serializer.validated_data['plan_id'])
@@ -87,8 +132,6 @@ def create_subscription(request):
             response_serializer = SubscriptionSerializer(subscription)
             return Response(response_serializer.data, status=201)
             
-        except Tenant.DoesNotExist:
-            return Response({'error': 'No tenant found for user'}, status=404)
         except Plan.DoesNotExist:
             return Response({'error': 'Plan not found'}, status=404)
     
@@ -118,14 +161,16 @@ def initialize_payment(request):
     """Initialize Paystack payment for subscription"""
     serializer = PaystackPaymentSerializer(data=request.data)
     if serializer.is_valid():
+        tenant = _get_user_tenant(request)
+        if tenant is None:
+            return Response({'error': 'Unauthorized'}, status=403)
         try:
-            subscription = Subscription.objects.get(id=serializer.validated_data['subscription_id'])
+            # Only subscriptions of the user's own tenant can be paid for
+            subscription = Subscription.objects.select_related('plan', 'tenant').get(
+                id=serializer.validated_data['subscription_id'], tenant_id=tenant.pk,
+            )
             currency = serializer.validated_data['currency']
             
-            # Verify user owns this subscription
-            if subscription.tenant.clerk_organization_id != request.user.clerk_user_id:
-                return Response({'error': 'Unauthorized'}, status=403)
-            
             amount = subscription.plan.get_price_in_currency(currency)
             
             # Generate unique reference
@@ -143,7 +188,7 @@ def initialize_payment(request):
             # Initialize Paystack payment
             paystack_data = {
                 'email': request.user.email,
-                'amount': int(amount * 100),  # Paystack expects kobo/cents
+                'amount': int(round(amount * 100)),  # Paystack expects kobo/cents
                 'currency': currency,
                 'reference': reference,
                 'callback_url': serializer.validated_data.get('callback_url', ''),
@@ -159,11 +204,14 @@ def initialize_payment(request):
                 'Content-Type': 'application/json'
             }
             
-            response = requests.post(
-                'https://api.paystack.co/transaction/initialize',
-                json=paystack_data,
-                headers=headers
-            )
+            try:
+                response = get_http_client().post(
+                    'https://api.paystack.co/transaction/initialize',
+                    json=paystack_data,
+                    headers=headers
+                )
+            except requests.RequestException:
+                return Response({'error': 'Payment provider unavailable, please try again'}, status=503)
             
             if response.status_code == 200:
                 paystack_response = response.json()
@@ -194,43 +242,34 @@ def initialize_payment(request):
     responses={200: 'Webhook processed'}
 )
 @api_view(['POST'])
+@authentication_classes([])
 @permission_classes([permissions.AllowAny])
 def paystack_webhook(request):
-    """Handle Paystack webhooks"""
-    event = request.data.get('event')
-    data = request.data.get('data', {})
-    
-    if event == 'charge.success':
-        reference = data.get('reference')
-        
-        try:
-            payment = Payment.objects.get(paystack_reference=reference)
-            
-            # Update payment status
-            payment.status = 'success'
-            payment.paid_at = timezone.now()
-            payment.payment_method = data.get('channel', '')
-            payment.save()
-            
-            # Update subscription status
-            subscription = payment.subscription
-            subscription.status = 'active'
-            subscription.current_period_start = timezone.now()
-            
-            # Set next billing period based on plan
-            if subscription.plan.billing_cycle == 'yearly':
-                subscription.current_period_end = timezone.now() + timedelta(days=365)
-            else:
-                subscription.current_period_end = timezone.now() + timedelta(days=30)
-            
-            subscription.save()
-            
-            return Response({'status': 'success'})
-            
-        except Payment.DoesNotExist:
-            return Response({'error': 'Payment not found'}, status=404)
-    
-    return Response({'status': 'processed'})
+    """
+    Handle Paystack webhooks: verify the signature, record the event in the
+    inbox and acknowledge immediately. Events are applied by the
+    process_paystack_events task.
+    """
+    import json
+    from django.db import transaction
+    from .tasks import process_paystack_events
+    from .webhooks import record_event, verify_signature
+
+    body = request.body
+    if not verify_signature(body, request.headers.get('x-paystack-signature', '')):
+        return Response({'error': 'Invalid signature'}, status=401)
+
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return Response({'error': 'Invalid payload'}, status=400)
+    if not isinstance(payload, dict):
+        return Response({'error': 'Invalid payload'}, status=400)
+
+    event, created = record_event(payload)
+    if created:
+        transaction.on_commit(process_paystack_events.delay)
+    return Response({'status': 'received'})
 
 @swagger_auto_schema(
     method='get',
@@ -240,12 +279,12 @@ def paystack_webhook(request):
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def get_payment_history(request):
-    """Get payment history for user's subscription"""
-    try:
-        tenant = Tenant.objects.get(clerk_organization_id=request.user.clerk_user_id)
-        subscription = Subscription.objects.get(tenant=tenant)
-        payments = Payment.objects.filter(subscription=subscription).order_by('-created_at')
-        serializer = PaymentSerializer(payments, many=True)
-        return Response(serializer.data)
-    except (Tenant.DoesNotExist, Subscription.DoesNotExist):
+    """Payment history for the user's subscription, newest first, keyset-paginated by created_at"""
+    tenant = _get_user_tenant(request)
+    if tenant is None:
         return Response({'error': 'No subscription found'}, status=404)
+    payments = Payment.objects.filter(subscription__tenant_id=tenant.pk).select_related('subscription__plan')
+    paginator = PaymentHistoryPagination()
+    page = paginator.paginate_queryset(payments, request)
+    serializer = PaymentSerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
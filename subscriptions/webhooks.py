@@ -0,0 +1,147 @@
+"""
+Paystack webhook inbox.
+
+The webhook view only verifies the HMAC signature and records the event in
+PaystackEvent, keyed so that repeated deliveries of the same event collide.
+process_pending_events (run by a Celery task) applies pending events in
+arrival order, in batches. A cache lock lets only one processor run at a
+time, and each event is applied in its own transaction.
+"""
+import hashlib
+import hmac
+import logging
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from .models import Payment, PaystackEvent
+
+logger = logging.getLogger(__name__)
+
+PROCESS_LOCK_KEY = 'paystack:events:lock'
+MAX_ATTEMPTS = 5
+BILLING_PERIODS = {'monthly': timedelta(days=30), 'yearly': timedelta(days=365)}
+
+
+def verify_signature(body, signature):
+    """Check the x-paystack-signature header (HMAC-SHA512 of the raw body with the secret key)."""
+    if not signature or not settings.PAYSTACK_SECRET_KEY:
+        return False
+    expected = hmac.new(settings.PAYSTACK_SECRET_KEY.encode('utf-8'), body, hashlib.sha512).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+def idempotency_key(payload):
+    data = payload.get('data') or {}
+    identifier = data.get('id') or data.get('reference') or hashlib.sha256(
+        repr(sorted(data.items())).encode('utf-8')
+    ).hexdigest()
+    return f"{payload.get('event', '')}:{identifier}"[:255]
+
+
+def record_event(payload):
+    """Store a verified delivery. Returns (event, created); duplicates return created=False."""
+    data = payload.get('data') or {}
+    return PaystackEvent.objects.get_or_create(
+        idempotency_key=idempotency_key(payload),
+        defaults={
+            'event': str(payload.get('event', ''))[:64],
+            'reference': str(data.get('reference') or '')[:100],
+            'payload': payload,
+        },
+    )
+
+
+class EventError(Exception):
+    """An event that can never be applied (e.g. unknown payment); not retried."""
+
+
+def _apply_charge_success(event, payments):
+    data = event.payload.get('data') or {}
+    payment = payments.get(event.reference)
+    if payment is None:
+        raise EventError('Payment not found')
+    if payment.status == 'success':
+        return
+
+    # Paystack amounts are in minor units; allow one unit for rounding at initialization
+    amount = data.get('amount')
+    if amount is not None and abs(Decimal(amount) - payment.amount * 100) > 1:
+        raise EventError(f"Amount mismatch: paid {amount}, expected {payment.amount * 100}")
+    if data.get('currency') and data['currency'] != payment.currency:
+        raise EventError(f"Currency mismatch: paid {data['currency']}, expected {payment.currency}")
+
+    now = timezone.now()
+    payment.status = 'success'
+    payment.paid_at = now
+    payment.payment_method = data.get('channel', '') or ''
+    payment.save()
+
+    subscription = payment.subscription
+    subscription.status = 'active'
+    subscription.current_period_start = now
+    subscription.current_period_end = now + BILLING_PERIODS.get(subscription.plan.billing_cycle, BILLING_PERIODS['monthly'])
+    subscription.save()
+
+    tenant = subscription.tenant
+    if tenant.subscription_status != 'active':
+        tenant.subscription_status = 'active'
+        tenant.save(update_fields=['subscription_status'])
+
+
+HANDLERS = {
+    'charge.success': _apply_charge_success,
+}
+
+
+def _apply_batch(events):
+    references = [event.reference for event in events if event.reference]
+    payments = Payment.objects.select_related('subscription__tenant', 'subscription__plan').in_bulk(references, field_name='paystack_reference')
+
+    for event in events:
+        handler = HANDLERS.get(event.event)
+        event.attempts += 1
+        try:
+            with transaction.atomic():
+                if handler is None:
+                    event.status = 'ignored'
+                else:
+                    handler(event, payments)
+                    event.status = 'processed'
+                event.processed_at = timezone.now()
+                event.last_error = ''
+                event.save(update_fields=['status', 'attempts', 'processed_at', 'last_error'])
+        except EventError as e:
+            event.status = 'failed'
+            event.last_error = str(e)
+            event.save(update_fields=['status', 'attempts', 'last_error'])
+        except Exception as e:
+            logger.exception("[Paystack] Failed to apply event %s", event.pk)
+            event.status = 'failed' if event.attempts >= MAX_ATTEMPTS else 'pending'
+            event.last_error = str(e)
+            event.save(update_fields=['status', 'attempts', 'last_error'])
+
+
+def process_pending_events(batch_size=100):
+    """Apply pending events oldest first. Returns the number handled."""
+    if not cache.add(PROCESS_LOCK_KEY, 1, 300):
+        return 0
+    handled = 0
+    last_id = 0
+    try:
+        while True:
+            # The cursor keeps events that went back to pending for a retry
+            # from being picked up again in the same run
+            events = list(
+                PaystackEvent.objects.filter(status='pending', id__gt=last_id).order_by('id')[:batch_size]
+            )
+            if not events:
+                break
+            _apply_batch(events)
+            handled += len(events)
+            last_id = max(event.id for event in events)
+    finally:
+        cache.delete(PROCESS_LOCK_KEY)
+    return handled
@@ -9,4 +9,10 @@ urlpatterns = [
     path('users/',                       views.user_list,           name='superadmin-user-list'),
     path('users/<int:user_id>/toggle-active/', views.user_toggle_active, name='superadmin-user-toggle-active'),
     path('users/<int:user_id>/toggle-staff/',  views.user_toggle_staff,  name='superadmin-user-toggle-staff'),
+    path('throttle-metrics/',            views.throttle_metrics,    name='superadmin-throttle-metrics'),
+    path('http-metrics/',                views.http_metrics,        name='superadmin-http-metrics'),
+    path('db-pool-metrics/',             views.db_pool_metrics,     name='superadmin-db-pool-metrics'),
+    path('billing/metrics/',             views.billing_metrics,     name='superadmin-billing-metrics'),
+    path('billing/reconciliations/',     views.reconciliation_runs, name='superadmin-reconciliation-runs'),
+    path('billing/reconciliations/<int:run_id>/', views.reconciliation_detail, name='superadmin-reconciliation-detail'),
 ]
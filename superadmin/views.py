@@ -3,7 +3,6 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from django.contrib.auth import get_user_model
-from django.db import connection
 from django_tenants.utils import tenant_context
 from tenants.models import Tenant
 from django.utils import timezone
@@ -24,7 +23,6 @@ def overview(request):
     if not superadmin_check(request):
         return Response({'error': 'Super admin access required'}, status=403)
 
-    connection.set_schema_to_public()
 
     tenants = Tenant.objects.exclude(schema_name='public')
     users   = User.objects.all()
@@ -73,7 +71,6 @@ def tenant_list(request):
     if not superadmin_check(request):
         return Response({'error': 'Super admin access required'}, status=403)
 
-    connection.set_schema_to_public()
     tenants = Tenant.objects.exclude(schema_name='public').order_by('-id')
 
     result = []
@@ -112,7 +109,6 @@ def tenant_detail(request, tenant_id):
     if not superadmin_check(request):
         return Response({'error': 'Super admin access required'}, status=403)
 
-    connection.set_schema_to_public()
     try:
         t = Tenant.objects.get(id=tenant_id)
     except Tenant.DoesNotExist:
@@ -160,7 +156,6 @@ def tenant_toggle(request, tenant_id):
     if not superadmin_check(request):
         return Response({'error': 'Super admin access required'}, status=403)
 
-    connection.set_schema_to_public()
     try:
         t = Tenant.objects.get(id=tenant_id)
     except Tenant.DoesNotExist:
@@ -179,7 +174,6 @@ def user_list(request):
     if not superadmin_check(request):
         return Response({'error': 'Super admin access required'}, status=403)
 
-    connection.set_schema_to_public()
 
     search = request.query_params.get('search', '').strip()
     role_filter = request.query_params.get('role', '')
@@ -234,7 +228,6 @@ def user_toggle_active(request, user_id):
     if not superadmin_check(request):
         return Response({'error': 'Super admin access required'}, status=403)
 
-    connection.set_schema_to_public()
     try:
         u = User.objects.get(id=user_id)
     except User.DoesNotExist:
@@ -242,6 +235,9 @@ def user_toggle_active(request, user_id):
 
     u.is_active = not u.is_active
     u.save(update_fields=['is_active'])
+    if not u.is_active:
+        from authentication.tokens import revoke_user_tokens
+        revoke_user_tokens(u)
     return Response({'id': u.id, 'is_active': u.is_active})
 
 
@@ -251,7 +247,6 @@ def user_toggle_staff(request, user_id):
     if not superadmin_check(request):
         return Response({'error': 'Super admin access required'}, status=403)
 
-    connection.set_schema_to_public()
     try:
         u = User.objects.get(id=user_id)
     except User.DoesNotExist:
@@ -260,3 +255,173 @@ def user_toggle_staff(request, user_id):
     u.is_staff = not u.is_staff
     u.save(update_fields=['is_staff'])
     return Response({'id': u.id, 'is_staff': u.is_staff})
+
+
+# ── Throttling ───────────────────────────────────────────────────────────────
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def throttle_metrics(request):
+    if not superadmin_check(request):
+        return Response({'error': 'Super admin access required'}, status=403)
+
+    from authentication.throttling import get_rejection_counts
+    return Response({'rejections': get_rejection_counts()})
+
+
+# ── Outbound HTTP ────────────────────────────────────────────────────────────
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def http_metrics(request):
+    """Outbound call latency, errors and circuit state per host (this worker process only)."""
+    if not superadmin_check(request):
+        return Response({'error': 'Super admin access required'}, status=403)
+
+    from utils.http import get_http_client
+    return Response({'hosts': get_http_client().get_metrics()})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def db_pool_metrics(request):
+    """Database connection pool counters per alias (this worker process only)."""
+    if not superadmin_check(request):
+        return Response({'error': 'Super admin access required'}, status=403)
+
+    from tabletap_console.db.pool import get_pool_stats
+    return Response({'pools': get_pool_stats()})
+
+
+# ── Billing ──────────────────────────────────────────────────────────────────
+
+def _run_data(run):
+    return {
+        'id':                  run.id,
+        'source':              run.source,
+        'period_start':        run.period_start.isoformat(),
+        'period_end':          run.period_end.isoformat(),
+        'status':              run.status,
+        'payments_checked':    run.payments_checked,
+        'settlements_checked': run.settlements_checked,
+        'matched':             run.matched,
+        'discrepancies':       run.discrepancies,
+        'totals':              run.totals,
+        'error':               run.error,
+        'started_at':          run.started_at.isoformat(),
+        'finished_at':         run.finished_at.isoformat() if run.finished_at else None,
+    }
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def billing_metrics(request):
+    """Daily MRR, churn, revenue and failed-payment rollups, newest first (?days=30)."""
+    if not superadmin_check(request):
+        return Response({'error': 'Super admin access required'}, status=403)
+
+    from subscriptions.models import BillingMetrics
+
+    try:
+        days = min(max(int(request.query_params.get('days', 30)), 1), 366)
+    except ValueError:
+        return Response({'error': 'days must be a number'}, status=400)
+
+    rows = BillingMetrics.objects.filter(date__gt=timezone.now().date() - timedelta(days=days)).values(
+        'date', 'mrr_usd', 'mrr_by_plan', 'active_subscriptions', 'trialing_subscriptions',
+        'new_subscriptions', 'churned_subscriptions', 'churn_rate', 'revenue', 'failed_payments', 'computed_at',
+    )
+    return Response({'days': list(rows)})
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticated])
+def reconciliation_runs(request):
+    """
+    GET lists recent reconciliation runs. POST runs one: a settlement CSV as
+    `file` (or {"fake": true}) with `start` and optional `end` dates. Runs
+    over RECONCILIATION_INLINE_MAX_DAYS or RECONCILIATION_INLINE_MAX_BYTES
+    are queued on Celery and return 202 with the run still 'running'.
+    """
+    if not superadmin_check(request):
+        return Response({'error': 'Super admin access required'}, status=403)
+
+    from subscriptions.models import ReconciliationRun
+    from django.conf import settings
+    from subscriptions.reconciliation import CSVSettlementSource, FakeSettlementSource, reconcile, start_run
+    from subscriptions.tasks import run_reconciliation
+
+    if request.method == 'GET':
+        return Response([_run_data(run) for run in ReconciliationRun.objects.all()[:50]])
+
+    from datetime import datetime, time, timezone as dt_timezone
+    try:
+        start = datetime.combine(
+            datetime.strptime(request.data.get('start', ''), '%Y-%m-%d').date(), time.min, tzinfo=dt_timezone.utc,
+        )
+        end_value = request.data.get('end')
+        end = start + timedelta(days=1) if not end_value else datetime.combine(
+            datetime.strptime(end_value, '%Y-%m-%d').date(), time.min, tzinfo=dt_timezone.utc,
+        )
+    except (TypeError, ValueError):
+        return Response({'error': 'start (and end) must be dates in YYYY-MM-DD format'}, status=400)
+    if end <= start:
+        return Response({'error': 'end must be after start'}, status=400)
+
+    upload = request.FILES.get('file')
+    if upload is not None:
+        try:
+            source = CSVSettlementSource(upload.read().decode('utf-8'), name=upload.name)
+        except UnicodeDecodeError:
+            return Response({'error': 'Settlement file must be UTF-8 encoded CSV'}, status=400)
+    elif str(request.data.get('fake', '')).lower() in ('1', 'true'):
+        source = FakeSettlementSource()
+    else:
+        return Response({'error': 'Upload a settlement file or pass fake=true'}, status=400)
+
+    if (end - start).days > settings.RECONCILIATION_INLINE_MAX_DAYS or (
+        upload is not None and upload.size > settings.RECONCILIATION_INLINE_MAX_BYTES
+    ):
+        run = start_run(source, start, end)
+        if upload is not None:
+            run_reconciliation.delay(run.id, csv_text=source.text, csv_name=source.name)
+        else:
+            run_reconciliation.delay(run.id)
+        return Response(_run_data(run), status=202)
+
+    run = reconcile(source, start, end)
+    return Response(_run_data(run), status=201 if run.status == 'completed' else 400)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def reconciliation_detail(request, run_id):
+    """One reconciliation run with its discrepancies (?kind= to filter, ?limit= up to 1000)."""
+    if not superadmin_check(request):
+        return Response({'error': 'Super admin access required'}, status=403)
+
+    from django.db.models import Count
+    from subscriptions.models import ReconciliationRun
+
+    try:
+        run = ReconciliationRun.objects.get(id=run_id)
+    except ReconciliationRun.DoesNotExist:
+        return Response({'error': 'Reconciliation run not found'}, status=404)
+
+    items = run.items.all()
+    kind = request.query_params.get('kind')
+    if kind:
+        items = items.filter(kind=kind)
+    try:
+        limit = min(max(int(request.query_params.get('limit', 200)), 1), 1000)
+    except ValueError:
+        return Response({'error': 'limit must be a number'}, status=400)
+
+    by_kind = dict(run.items.values_list('kind').annotate(count=Count('id')).order_by())
+    return Response({
+        **_run_data(run),
+        'by_kind': by_kind,
+        'items': list(items.values(
+            'id', 'kind', 'reference', 'payment_id', 'expected_amount', 'settled_amount', 'currency', 'detail',
+        )[:limit]),
+    })
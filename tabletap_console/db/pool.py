@@ -0,0 +1,232 @@
+"""
+A bounded, greenlet-aware pool of raw psycopg2 connections.
+
+One pool per database alias and set of connection parameters, so a
+changed settings dict (the test runner switching NAME to test_*) gets a
+fresh pool instead of connecting to the old database. Django still opens and
+closes its connection around each request (CONN_MAX_AGE = 0). The pooled
+backend turns that open into `acquire()` and that close into `release()`,
+so the TLS handshake to Postgres/Neon happens once per pooled connection,
+not once per request or greenlet.
+
+The number of checked-out connections is capped by a semaphore. Under
+gunicorn's gevent worker it is gevent's semaphore, so a waiting request
+yields to other greenlets instead of blocking the worker. psycopg2 also
+gets a wait callback, so greenlets yield during queries too. Idle
+connections are checked before reuse:
+- dropped once older than MAX_AGE;
+- pinged with SELECT 1 once idle longer than HEALTH_CHECK_AFTER, since Neon
+  closes idle connections when it suspends compute.
+
+Pools record the PID that created them. After a fork (Celery prefork, a
+preloaded gunicorn app) the child forgets the connections it inherited
+without closing them, because closing would end the parent's sessions, and
+opens its own.
+"""
+import collections
+import os
+import threading
+import time
+import psycopg2
+from psycopg2 import extensions
+
+DEFAULTS = {
+    'MAX_SIZE': 10,
+    'MAX_AGE': 30 * 60,
+    'TIMEOUT': 10,
+    'HEALTH_CHECK_AFTER': 30,
+}
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    """No connection became free within TIMEOUT seconds."""
+
+
+def _gevent_patched():
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched('threading')
+
+
+def _gevent_wait_callback(conn, timeout=None):
+    from gevent.socket import wait_read, wait_write
+
+    while True:
+        state = conn.poll()
+        if state == extensions.POLL_OK:
+            break
+        elif state == extensions.POLL_READ:
+            wait_read(conn.fileno(), timeout=timeout)
+        elif state == extensions.POLL_WRITE:
+            wait_write(conn.fileno(), timeout=timeout)
+        else:
+            raise psycopg2.OperationalError(f"Bad result from poll: {state!r}")
+
+
+def _primitives(max_size):
+    if _gevent_patched():
+        # libpq calls would otherwise block the whole worker, not just the greenlet
+        if extensions.get_wait_callback() is None:
+            extensions.set_wait_callback(_gevent_wait_callback)
+        from gevent.lock import BoundedSemaphore, RLock
+        return BoundedSemaphore(max_size), RLock()
+    return threading.BoundedSemaphore(max_size), threading.Lock()
+
+
+class ConnectionPool:
+    def __init__(self, connect, max_size=DEFAULTS['MAX_SIZE'], max_age=DEFAULTS['MAX_AGE'],
+                 timeout=DEFAULTS['TIMEOUT'], health_check_after=DEFAULTS['HEALTH_CHECK_AFTER'], label=''):
+        self.connect = connect
+        self.label = label
+        self.max_size = max_size
+        self.max_age = max_age
+        self.timeout = timeout
+        self.health_check_after = health_check_after
+        self._reset()
+
+    def _reset(self):
+        self.pid = os.getpid()
+        self.slots, self.lock = _primitives(self.max_size)
+        # (connection, created_at, released_at), most recently released last
+        self.idle = collections.deque()
+        self.created_at = {}
+        self.stats = {
+            'created': 0, 'reused': 0, 'discarded': 0, 'timeouts': 0,
+            'in_use': 0, 'max_in_use': 0, 'wait_ms_total': 0.0, 'wait_ms_max': 0.0,
+        }
+
+    def _check_pid(self):
+        # Inherited connections share their sockets with the parent: drop them unclosed
+        if self.pid != os.getpid():
+            self._reset()
+
+    def _discard(self, conn):
+        self.created_at.pop(id(conn), None)
+        self.stats['discarded'] += 1
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    def _usable(self, conn, created_at, released_at, now):
+        if conn.closed or now - created_at > self.max_age:
+            return False
+        if now - released_at <= self.health_check_after:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def acquire(self):
+        self._check_pid()
+        start = time.monotonic()
+        if not self.slots.acquire(timeout=self.timeout):
+            with self.lock:
+                self.stats['timeouts'] += 1
+            raise PoolTimeout(f"No database connection free after {self.timeout}s ({self.max_size} in use)")
+
+        waited = (time.monotonic() - start) * 1000
+        try:
+            while True:
+                with self.lock:
+                    entry = self.idle.pop() if self.idle else None
+                if entry is None:
+                    conn = self.connect()
+                    with self.lock:
+                        self.created_at[id(conn)] = time.monotonic()
+                        self.stats['created'] += 1
+                    break
+                conn, created_at, released_at = entry
+                if self._usable(conn, created_at, released_at, time.monotonic()):
+                    with self.lock:
+                        self.stats['reused'] += 1
+                    break
+                with self.lock:
+                    self._discard(conn)
+        except BaseException:
+            self.slots.release()
+            raise
+
+        with self.lock:
+            self.stats['in_use'] += 1
+            self.stats['max_in_use'] = max(self.stats['max_in_use'], self.stats['in_use'])
+            self.stats['wait_ms_total'] += waited
+            self.stats['wait_ms_max'] = max(self.stats['wait_ms_max'], waited)
+        return conn
+
+    def release(self, conn):
+        """Return a connection; it is closed instead if broken, expired or mid-transaction and cannot roll back."""
+        self._check_pid()
+        if id(conn) not in self.created_at:
+            # Checked out before a fork; it belongs to the parent's pool
+            return
+        try:
+            keep = not conn.closed
+            if keep and conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    keep = False
+            with self.lock:
+                self.stats['in_use'] -= 1
+                created_at = self.created_at.get(id(conn))
+                if keep and created_at is not None and time.monotonic() - created_at <= self.max_age:
+                    self.idle.append((conn, created_at, time.monotonic()))
+                else:
+                    self._discard(conn)
+        finally:
+            self.slots.release()
+
+    def close_idle(self):
+        self._check_pid()
+        with self.lock:
+            while self.idle:
+                self._discard(self.idle.pop()[0])
+
+    def get_stats(self):
+        self._check_pid()
+        with self.lock:
+            return {**self.stats, 'idle': len(self.idle), 'open': len(self.created_at), 'max_size': self.max_size}
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _pool_key(alias, params):
+    return alias, tuple(sorted((name, repr(value)) for name, value in params.items()))
+
+
+def get_pool(alias, params, connect, options=None):
+    """
+    The pool for a database alias and its connection `params` (anything that
+    changes what `connect` opens), created on first use with `connect` and
+    `options`.
+    """
+    key = _pool_key(alias, {**params, 'POOL': options})
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                options = {**DEFAULTS, **(options or {})}
+                pool = ConnectionPool(
+                    connect,
+                    max_size=options['MAX_SIZE'],
+                    max_age=options['MAX_AGE'],
+                    timeout=options['TIMEOUT'],
+                    health_check_after=options['HEALTH_CHECK_AFTER'],
+                    label=f"{alias}:{params.get('database') or params.get('dbname') or ''}",
+                )
+                _pools[key] = pool
+    return pool
+
+
+def get_pool_stats():
+    return {pool.label: pool.get_stats() for pool in list(_pools.values())}
@@ -0,0 +1,55 @@
+"""
+Search-path-tracking tenant backend (tabletap_console.db.postgresql) that
+borrows connections from a process-wide pool (tabletap_console.db.pool).
+
+Configure with ENGINE 'tabletap_console.db.pooled' and an optional POOL dict
+(MAX_SIZE, MAX_AGE, TIMEOUT, HEALTH_CHECK_AFTER) in the database settings.
+Keep CONN_MAX_AGE at 0: Django then "closes" the connection at the end of
+every request, which hands it back to the pool. Greenlets therefore never
+hold on to connections after they finish.
+
+Tenant isolation: a pooled connection keeps whatever search_path its last
+user set. The wrapper forgets the applied path on every connect and close,
+so the first statement after a checkout always sets the current tenant's
+path.
+"""
+from functools import partial
+import psycopg2
+import psycopg2.extras
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+from tabletap_console.db.postgresql.base import DatabaseWrapper as TrackingDatabaseWrapper
+from tabletap_console.db.pool import get_pool
+
+
+def _open(conn_params, isolation_level):
+    """What the postgresql backend does for a new psycopg2 connection, minus the wrapper state."""
+    connection = psycopg2.connect(**conn_params)
+    if isolation_level is not None:
+        connection.isolation_level = isolation_level
+    psycopg2.extras.register_default_jsonb(conn_or_curs=connection, loads=lambda x: x)
+    return connection
+
+
+class DatabaseWrapper(TrackingDatabaseWrapper):
+
+    def get_new_connection(self, conn_params):
+        configured = self.settings_dict['OPTIONS'].get('isolation_level')
+        try:
+            self.isolation_level = IsolationLevel.READ_COMMITTED if configured is None else IsolationLevel(configured)
+        except ValueError:
+            raise ImproperlyConfigured(f"Invalid transaction isolation level {configured} specified.")
+
+        isolation_level = None if configured is None else self.isolation_level
+        self.connection_pool = get_pool(
+            self.alias,
+            {**conn_params, 'isolation_level': isolation_level},
+            partial(_open, conn_params, isolation_level),
+            self.settings_dict.get('POOL'),
+        )
+        return self.connection_pool.acquire()
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.connection_pool.release(self.connection)
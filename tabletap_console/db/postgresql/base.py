@@ -0,0 +1,146 @@
+"""
+django_tenants PostgreSQL backend that tracks the search_path applied on
+the server connection.
+
+django_tenants sends `SET search_path` before every cursor and forgets the
+applied path on every set_tenant(), even when the schema does not change.
+This wrapper changes three things:
+
+- set_tenant() to the schema that is already active is a no-op;
+- a cursor only sets the path when it differs from the last one applied;
+- that SET goes out in the same round trip as the cursor's first statement.
+
+A SET inside a transaction is undone when the transaction or savepoint
+rolls back, so the applied path is forgotten on rollback (after a savepoint
+rollback, since that statement may carry a SET of its own), on close and
+whenever the batched statement fails. `schema_stats` counts switches,
+skipped switches and SET statements for per-request instrumentation.
+"""
+import psycopg2
+from django_tenants.postgresql_backend.base import DatabaseWrapper as TenantDatabaseWrapper
+
+
+def _search_path_sql(search_path):
+    return 'SET search_path = {0}'.format(','.join("'{}'".format(schema) for schema in search_path))
+
+
+class _DeferredSearchPathCursor:
+    """
+    Proxy for a psycopg2 cursor that prefixes its first statement with a
+    pending SET search_path, so switching schema costs no extra round trip.
+    """
+
+    def __init__(self, cursor, wrapper, search_path):
+        self._cursor = cursor
+        self._wrapper = wrapper
+        self._search_path = search_path
+        self._pending = True
+
+    def __getattr__(self, name):
+        if self._pending and name in ('callproc', 'copy_expert', 'copy_from', 'copy_to'):
+            self._flush()
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._cursor.close()
+
+    def _run(self, statement):
+        self._pending = False
+        try:
+            result = statement()
+        except Exception:
+            self._wrapper._applied_search_path = None
+            raise
+        self._wrapper._search_path_applied(self._search_path)
+        return result
+
+    def _flush(self):
+        return self._run(lambda: self._cursor.execute(_search_path_sql(self._search_path)))
+
+    def execute(self, sql, params=None):
+        if not self._pending:
+            return self._cursor.execute(sql, params)
+        if not isinstance(sql, str):
+            self._flush()
+            return self._cursor.execute(sql, params)
+        prefix = _search_path_sql(self._search_path) + '; '
+        if params is not None:
+            prefix = prefix.replace('%', '%%')
+        return self._run(lambda: self._cursor.execute(prefix + sql, params))
+
+    def executemany(self, sql, param_list):
+        if self._pending:
+            self._flush()
+        return self._cursor.executemany(sql, param_list)
+
+
+class DatabaseWrapper(TenantDatabaseWrapper):
+
+    def __init__(self, *args, **kwargs):
+        self._applied_search_path = None
+        self.schema_stats = {'switches': 0, 'skipped': 0, 'search_path_sets': 0}
+        super().__init__(*args, **kwargs)
+
+    def set_tenant(self, tenant, include_public=True):
+        if (self.tenant is not None and self.schema_name == tenant.schema_name
+                and self.include_public_schema == include_public):
+            # Same schema: keep the richer tenant object, skip the reset and
+            # the ContentType cache clear
+            self.tenant = tenant
+            self.schema_stats['skipped'] += 1
+            return
+        super().set_tenant(tenant, include_public)
+        self.schema_stats['switches'] += 1
+
+    def _search_path_applied(self, search_path):
+        self._applied_search_path = search_path
+        self.search_path_set_schemas = search_path
+        self.schema_stats['search_path_sets'] += 1
+
+    def _cursor(self, name=None):
+        # Skip django_tenants' _cursor, which sets the path unconditionally
+        cursor = super(TenantDatabaseWrapper, self)._cursor(name)
+
+        search_path = self._get_cursor_search_paths()
+        if search_path == self._applied_search_path:
+            return cursor
+
+        if name:
+            # Server-side cursors send their query with DECLARE; set the path separately
+            try:
+                with self.connection.cursor() as path_cursor:
+                    path_cursor.execute(_search_path_sql(search_path))
+            except psycopg2.Error:
+                self._applied_search_path = None
+            else:
+                self._search_path_applied(search_path)
+            return cursor
+
+        cursor.cursor = _DeferredSearchPathCursor(cursor.cursor, self, search_path)
+        return cursor
+
+    def connect(self):
+        self._applied_search_path = None
+        super().connect()
+
+    def _rollback(self):
+        self._applied_search_path = None
+        return super()._rollback()
+
+    def _savepoint_rollback(self, sid):
+        try:
+            return super()._savepoint_rollback(sid)
+        finally:
+            # The ROLLBACK TO goes through a cursor that may itself set the
+            # path, and the rollback then undoes that SET as well
+            self._applied_search_path = None
+
+    def close(self):
+        self._applied_search_path = None
+        super().close()
@@ -0,0 +1,294 @@
+from types import SimpleNamespace
+from unittest import mock
+from django.db import connections
+from django.test import SimpleTestCase
+from psycopg2 import extensions
+from tabletap_console.db import pool
+from tabletap_console.db.pooled.base import DatabaseWrapper as PooledDatabaseWrapper
+from tabletap_console.db.postgresql.base import DatabaseWrapper as TrackingDatabaseWrapper, _DeferredSearchPathCursor
+
+TEST_ALIAS = 'pool_test'
+
+
+class FakeCursor:
+    def __init__(self, connection, name=None, fail=False):
+        self.connection = connection
+        self.name = name
+        self.fail = fail
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def execute(self, sql, params=None):
+        if self.fail:
+            raise pool.psycopg2.ProgrammingError('syntax error')
+        self.connection.log.append((sql, params) if self.name is None else ((self.name, sql), params))
+
+    def executemany(self, sql, param_list):
+        self.connection.log.append((sql, list(param_list)))
+
+    def copy_expert(self, sql, file):
+        self.connection.log.append((sql, None))
+
+    def fetchone(self):
+        return None
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """Enough of a psycopg2 connection for Django's connect/cursor/close path."""
+
+    def __init__(self):
+        self.log = []
+        self.closed = 0
+        self.autocommit = True
+        self.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+        self.server_version = 150000
+        self.info = SimpleNamespace(parameter_status=lambda name: 'UTC', server_version=150000)
+
+    def cursor(self, name=None, **kwargs):
+        return FakeCursor(self, name)
+
+    def get_transaction_status(self):
+        return self.transaction_status
+
+    def rollback(self):
+        self.log.append(('ROLLBACK', None))
+        self.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+    def commit(self):
+        self.log.append(('COMMIT', None))
+
+    def close(self):
+        self.closed = 1
+
+
+class ConnectionPoolTests(SimpleTestCase):
+
+    def test_release_rolls_back_idle_in_transaction_connection(self):
+        connection_pool = pool.ConnectionPool(FakeConnection, max_size=1)
+        conn = connection_pool.acquire()
+        conn.transaction_status = extensions.TRANSACTION_STATUS_INTRANS
+
+        connection_pool.release(conn)
+
+        self.assertIn(('ROLLBACK', None), conn.log)
+        self.assertFalse(conn.closed)
+        self.assertIs(connection_pool.acquire(), conn)
+        self.assertEqual(connection_pool.get_stats()['reused'], 1)
+
+    def test_release_discards_connection_that_cannot_roll_back(self):
+        connection_pool = pool.ConnectionPool(FakeConnection, max_size=1)
+        conn = connection_pool.acquire()
+        conn.transaction_status = extensions.TRANSACTION_STATUS_INERROR
+        conn.rollback = mock.Mock(side_effect=pool.psycopg2.OperationalError)
+
+        connection_pool.release(conn)
+
+        self.assertTrue(conn.closed)
+        self.assertIsNot(connection_pool.acquire(), conn)
+
+    def test_release_frees_the_slot(self):
+        connection_pool = pool.ConnectionPool(FakeConnection, max_size=1, timeout=0)
+        connection_pool.release(connection_pool.acquire())
+        connection_pool.release(connection_pool.acquire())
+        self.assertEqual(connection_pool.get_stats()['timeouts'], 0)
+
+    def test_child_process_forgets_inherited_connections(self):
+        connection_pool = pool.ConnectionPool(FakeConnection, max_size=1)
+        idle = connection_pool.acquire()
+        connection_pool.release(idle)
+        checked_out = connection_pool.acquire()
+
+        with mock.patch('tabletap_console.db.pool.os.getpid', return_value=connection_pool.pid + 1):
+            # The parent's checkout is released in the child without touching its socket
+            connection_pool.release(checked_out)
+            conn = connection_pool.acquire()
+            stats = connection_pool.get_stats()
+
+        self.assertFalse(checked_out.closed)
+        self.assertFalse(idle.closed)
+        self.assertIsNot(conn, idle)
+        self.assertIsNot(conn, checked_out)
+        self.assertEqual(stats['created'], 1)
+        self.assertEqual(stats['in_use'], 1)
+
+    def test_pools_are_keyed_by_connection_params(self):
+        with mock.patch.dict(pool._pools, clear=True):
+            first = pool.get_pool(TEST_ALIAS, {'database': 'tabletap'}, FakeConnection)
+            renamed = pool.get_pool(TEST_ALIAS, {'database': 'test_tabletap'}, FakeConnection)
+            again = pool.get_pool(TEST_ALIAS, {'database': 'tabletap'}, FakeConnection)
+        self.assertIsNot(first, renamed)
+        self.assertIs(first, again)
+
+
+class PooledBackendTests(SimpleTestCase):
+
+    def setUp(self):
+        patcher = mock.patch.dict(pool._pools, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.opened = []
+        opener = mock.patch('tabletap_console.db.pooled.base._open', side_effect=self._open)
+        opener.start()
+        self.addCleanup(opener.stop)
+        self.settings_dict = {
+            **connections['default'].settings_dict,
+            'POOL': {'MAX_SIZE': 1, 'TIMEOUT': 1},
+        }
+
+    def _open(self, conn_params, isolation_level):
+        conn = FakeConnection()
+        self.opened.append(conn)
+        return conn
+
+    def _wrapper(self, schema_name):
+        wrapper = PooledDatabaseWrapper(self.settings_dict, TEST_ALIAS)
+        wrapper.set_tenant(SimpleNamespace(schema_name=schema_name))
+        return wrapper
+
+    def _query(self, wrapper, sql='SELECT 1'):
+        with wrapper.cursor() as cursor:
+            cursor.execute(sql)
+        statements = [statement for statement, _ in wrapper.connection.log]
+        wrapper.close()
+        return statements[-1]
+
+    def test_checkout_after_another_tenant_sets_search_path_again(self):
+        alpha = self._wrapper('alpha')
+        self.assertEqual(self._query(alpha), "SET search_path = 'alpha','public'; SELECT 1")
+
+        beta = self._wrapper('beta')
+        self.assertEqual(self._query(beta), "SET search_path = 'beta','public'; SELECT 1")
+
+        # alpha gets the connection back with beta's path still applied on the server
+        self.assertEqual(self._query(alpha), "SET search_path = 'alpha','public'; SELECT 1")
+        self.assertEqual(len(self.opened), 1)
+
+    def test_same_tenant_sets_search_path_after_every_checkout(self):
+        alpha = self._wrapper('alpha')
+        self._query(alpha)
+        self.assertEqual(self._query(alpha), "SET search_path = 'alpha','public'; SELECT 1")
+
+    def test_close_returns_connection_to_the_pool(self):
+        alpha = self._wrapper('alpha')
+        self._query(alpha)
+        stats = pool.get_pool_stats()
+        (label,) = stats
+        self.assertEqual(stats[label]['in_use'], 0)
+        self.assertEqual(stats[label]['idle'], 1)
+        self.assertFalse(self.opened[0].closed)
+
+
+class DeferredSearchPathCursorTests(SimpleTestCase):
+
+    def setUp(self):
+        self.conn = FakeConnection()
+        self.wrapper = mock.Mock(_applied_search_path=None)
+
+    def _cursor(self, search_path=('alpha', 'public'), fail=False):
+        return _DeferredSearchPathCursor(FakeCursor(self.conn, fail=fail), self.wrapper, list(search_path))
+
+    def test_first_statement_without_params_is_prefixed_as_is(self):
+        cursor = self._cursor(['we%ird'])
+        cursor.execute("SELECT '100%'")
+        self.assertEqual(self.conn.log, [("SET search_path = 'we%ird'; SELECT '100%'", None)])
+        self.wrapper._search_path_applied.assert_called_once_with(['we%ird'])
+
+    def test_prefix_is_escaped_when_params_are_interpolated(self):
+        cursor = self._cursor(['we%ird'])
+        cursor.execute('SELECT %s', [1])
+        self.assertEqual(self.conn.log, [("SET search_path = 'we%%ird'; SELECT %s", [1])])
+
+    def test_only_the_first_statement_is_prefixed(self):
+        cursor = self._cursor()
+        cursor.execute('SELECT 1')
+        cursor.execute('SELECT 2')
+        self.assertEqual(self.conn.log[1], ('SELECT 2', None))
+
+    def test_executemany_sets_path_in_its_own_statement(self):
+        cursor = self._cursor()
+        cursor.executemany('INSERT INTO t VALUES (%s)', [(1,), (2,)])
+        self.assertEqual(self.conn.log, [
+            ("SET search_path = 'alpha','public'", None),
+            ('INSERT INTO t VALUES (%s)', [(1,), (2,)]),
+        ])
+        self.wrapper._search_path_applied.assert_called_once()
+
+    def test_copy_sets_path_first(self):
+        cursor = self._cursor()
+        cursor.copy_expert('COPY t TO STDOUT', None)
+        self.assertEqual(self.conn.log, [
+            ("SET search_path = 'alpha','public'", None),
+            ('COPY t TO STDOUT', None),
+        ])
+
+    def test_composed_sql_sets_path_in_its_own_statement(self):
+        from psycopg2 import sql
+        cursor = self._cursor()
+        query = sql.SQL('SELECT 1')
+        cursor.execute(query)
+        self.assertEqual(self.conn.log, [("SET search_path = 'alpha','public'", None), (query, None)])
+
+    def test_failed_statement_forgets_applied_path(self):
+        self.wrapper._applied_search_path = ['beta', 'public']
+        cursor = self._cursor(fail=True)
+        with self.assertRaises(pool.psycopg2.ProgrammingError):
+            cursor.execute('SELEC 1')
+        self.assertIsNone(self.wrapper._applied_search_path)
+        self.wrapper._search_path_applied.assert_not_called()
+
+
+class TrackingBackendTests(SimpleTestCase):
+
+    def setUp(self):
+        self.conn = FakeConnection()
+        patcher = mock.patch.object(TrackingDatabaseWrapper, 'get_new_connection', return_value=self.conn)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.wrapper = TrackingDatabaseWrapper(connections['default'].settings_dict, TEST_ALIAS)
+        self.wrapper.set_tenant(SimpleNamespace(schema_name='alpha'))
+
+    def _query(self, sql='SELECT 1'):
+        with self.wrapper.cursor() as cursor:
+            cursor.execute(sql)
+        return self.conn.log[-1][0]
+
+    def test_path_is_set_once_per_schema(self):
+        self.assertEqual(self._query(), "SET search_path = 'alpha','public'; SELECT 1")
+        self.assertEqual(self._query(), 'SELECT 1')
+        self.wrapper.set_tenant(SimpleNamespace(schema_name='beta'))
+        self.assertEqual(self._query(), "SET search_path = 'beta','public'; SELECT 1")
+
+    def test_named_cursor_sets_path_in_a_separate_statement(self):
+        cursor = self.wrapper._cursor(name='chunked')
+        cursor.execute('SELECT * FROM menu_menuitem')
+        self.assertEqual(self.conn.log, [
+            ("SET search_path = 'alpha','public'", None),
+            (('chunked', 'SELECT * FROM menu_menuitem'), None),
+        ])
+
+    def test_rollback_forgets_applied_path(self):
+        self._query()
+        self.wrapper._rollback()
+        self.assertEqual(self._query(), "SET search_path = 'alpha','public'; SELECT 1")
+
+    def test_savepoint_rollback_forgets_path_set_after_the_savepoint(self):
+        self._query()
+        self.wrapper._savepoint('s1')
+        self.wrapper.set_tenant(SimpleNamespace(schema_name='beta'))
+        self._query()
+
+        # The server is back on alpha's path, so beta must be set again
+        self.wrapper._savepoint_rollback('s1')
+        self.assertEqual(self._query(), "SET search_path = 'beta','public'; SELECT 1")
+
+    def test_close_forgets_applied_path(self):
+        self._query()
+        self.wrapper.close()
+        self.assertEqual(self._query(), "SET search_path = 'alpha','public'; SELECT 1")
@@ -46,6 +46,7 @@ TENANT_MODEL = "tenants.Tenant"
 TENANT_DOMAIN_MODEL = "tenants.Domain"
 
 MIDDLEWARE = [
+    'tenants.middleware.SchemaSwitchMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'tenants.middleware.TableTapTenantMiddleware',
     'django.middleware.security.SecurityMiddleware',
@@ -64,7 +65,7 @@ PUBLIC_SCHEMA_URLCONF = 'tabletap_console.urls'
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [],
+        'DIRS': [os.path.join(BASE_DIR, 'templates')],
         'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
@@ -114,6 +115,30 @@ else:
         }
     }
 
+# Connection reuse. With DB_POOL_ENABLED each worker process keeps a bounded,
+# greenlet-aware pool (tabletap_console.db.pool) and Django hands connections
+# back at the end of every request; otherwise Django keeps one persistent
+# connection per thread/greenlet for DB_CONN_MAX_AGE seconds. The pool is opt-in
+# until it has been load-tested against the production database (db_load_test).
+DB_POOL_ENABLED = config('DB_POOL_ENABLED', default=False, cast=bool)
+for _database in DATABASES.values():
+    if DB_POOL_ENABLED:
+        _database['ENGINE'] = 'tabletap_console.db.pooled'
+        _database['CONN_MAX_AGE'] = 0
+        _database['POOL'] = {
+            'MAX_SIZE': config('DB_POOL_SIZE', default=10, cast=int),
+            'MAX_AGE': config('DB_POOL_MAX_AGE', default=30 * 60, cast=int),
+            'TIMEOUT': config('DB_POOL_TIMEOUT', default=10, cast=int),
+            'HEALTH_CHECK_AFTER': config('DB_POOL_HEALTH_CHECK_AFTER', default=30, cast=int),
+        }
+    else:
+        _database['ENGINE'] = 'tabletap_console.db.postgresql'
+        _database['CONN_MAX_AGE'] = config('DB_CONN_MAX_AGE', default=60, cast=int)
+        _database['CONN_HEALTH_CHECKS'] = True
+
+# Report per-request schema switches in X-Schema-Switches and the log
+SCHEMA_SWITCH_METRICS = config('SCHEMA_SWITCH_METRICS', default=DEBUG, cast=bool)
+
 DATABASE_ROUTERS = (
     'django_tenants.routers.TenantSyncRouter',
 )
@@ -142,12 +167,34 @@ CELERY_RESULT_BACKEND = REDIS_URL or 'cache+memory://'
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
+# Opt-in for local setups without a worker; runs every task inline in the caller
+CELERY_TASK_ALWAYS_EAGER = config('CELERY_TASK_ALWAYS_EAGER', default=False, cast=bool)
 
 CELERY_BEAT_SCHEDULE = {
     'check-stale-orders-every-minute': {
         'task': 'orders.tasks.check_stale_orders',
         'schedule': 60.0,
     },
+    'deliver-outbound-emails': {
+        'task': 'authentication.tasks.deliver_outbound_emails',
+        'schedule': 30.0,
+    },
+    'process-paystack-events': {
+        'task': 'subscriptions.tasks.process_paystack_events',
+        'schedule': 60.0,
+    },
+    'refresh-exchange-rates': {
+        'task': 'subscriptions.tasks.refresh_exchange_rates',
+        'schedule': 3 * 60 * 60.0,
+    },
+    'run-subscription-lifecycle': {
+        'task': 'subscriptions.tasks.run_subscription_lifecycle',
+        'schedule': 15 * 60.0,
+    },
+    'compute-billing-metrics': {
+        'task': 'subscriptions.tasks.compute_daily_billing_metrics',
+        'schedule': 60 * 60.0,
+    },
 }
 
 LANGUAGE_CODE = 'en-us'
@@ -173,7 +220,20 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 20
+    'PAGE_SIZE': 20,
+    # Scopes used by authentication.throttling on the auth endpoints
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': config('THROTTLE_LOGIN_IP', default='30/min'),
+        'login_email': config('THROTTLE_LOGIN_EMAIL', default='5/min'),
+        'verify_email_ip': config('THROTTLE_VERIFY_EMAIL_IP', default='30/min'),
+        'verify_email_user': config('THROTTLE_VERIFY_EMAIL_USER', default='5/min'),
+        'password_reset_ip': config('THROTTLE_PASSWORD_RESET_IP', default='10/min'),
+        'password_reset_email': config('THROTTLE_PASSWORD_RESET_EMAIL', default='3/min'),
+        'password_reset_confirm_ip': config('THROTTLE_PASSWORD_RESET_CONFIRM_IP', default='30/min'),
+        'password_reset_confirm_user': config('THROTTLE_PASSWORD_RESET_CONFIRM_USER', default='5/min'),
+    },
+    # Requests arrive through one reverse proxy (Traefik); use its X-Forwarded-For entry
+    'NUM_PROXIES': config('NUM_PROXIES', default=1, cast=int),
 }
 
 SIMPLE_JWT = {
@@ -186,6 +246,32 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
 }
 
+# Serve authenticated users from a short-lived cache instead of a per-request query
+JWT_CACHED_USER = config('JWT_CACHED_USER', default=False, cast=bool)
+JWT_USER_CACHE_TTL = config('JWT_USER_CACHE_TTL', default=300, cast=int)
+
+# Re-price new orders against the menu and reject stale client prices. When on,
+# tax and delivery fees come from the tenant's taxRate/deliveryFee settings
+# (default 0) instead of the client, and only the tenant's owner and staff may
+# send ad-hoc lines without a menu item id.
+ORDER_SERVER_PRICING = config('ORDER_SERVER_PRICING', default=True, cast=bool)
+
+# Enforce subscription plan limits (menu size, gated features) via subscriptions.entitlements
+ENFORCE_PLAN_LIMITS = config('ENFORCE_PLAN_LIMITS', default=True, cast=bool)
+
+# Days a past-due subscription keeps access before the lifecycle job marks it unpaid
+SUBSCRIPTION_GRACE_DAYS = config('SUBSCRIPTION_GRACE_DAYS', default=7, cast=int)
+
+# Reconciliation runs over either limit are handed to Celery instead of
+# running inside the request (superadmin reconciliation_runs)
+RECONCILIATION_INLINE_MAX_DAYS = config('RECONCILIATION_INLINE_MAX_DAYS', default=7, cast=int)
+RECONCILIATION_INLINE_MAX_BYTES = config('RECONCILIATION_INLINE_MAX_BYTES', default=256 * 1024, cast=int)
+
+# Plan pricing exchange rates: refreshed by Celery beat, never fetched inline.
+# Use subscriptions.exchange.FixtureProvider to avoid network calls in tests/dev.
+EXCHANGE_RATE_PROVIDER = config('EXCHANGE_RATE_PROVIDER', default='subscriptions.exchange.ExchangeRateAPIProvider')
+EXCHANGE_RATE_MAX_AGE = config('EXCHANGE_RATE_MAX_AGE', default=6 * 60 * 60, cast=int)
+
 if DEBUG:
     CORS_ALLOW_ALL_ORIGINS = True
     CORS_ALLOW_CREDENTIALS = True
@@ -210,6 +296,15 @@ RESEND_API_KEY = config('RESEND_API_KEY', default='')
 RESEND_FROM_EMAIL = config('RESEND_FROM_EMAIL', default='onboarding@resend.dev')
 FRONTEND_URL = config('FRONTEND_URL', default='https://tabletap.space')
 
+# Transactional email outbox (authentication.tasks.deliver_outbound_emails).
+# Defaults to Resend when RESEND_API_KEY is set, otherwise the console backend;
+# use authentication.delivery.FileBackend or LocmemBackend for local testing.
+EMAIL_DELIVERY_BACKEND = config('EMAIL_DELIVERY_BACKEND', default='')
+EMAIL_FILE_PATH = config('EMAIL_FILE_PATH', default=os.path.join(BASE_DIR, 'sent_emails'))
+EMAIL_RATE_LIMIT_PER_SECOND = config('EMAIL_RATE_LIMIT_PER_SECOND', default=2, cast=int)
+EMAIL_MAX_ATTEMPTS = config('EMAIL_MAX_ATTEMPTS', default=5, cast=int)
+EMAIL_RETRY_BASE_SECONDS = config('EMAIL_RETRY_BASE_SECONDS', default=30, cast=int)
+
 CLERK_SECRET_KEY = config('CLERK_SECRET_KEY', default='')
 CLERK_PUBLISHABLE_KEY = config('CLERK_PUBLISHABLE_KEY', default='')
 CLERK_WEBHOOK_SECRET = config('CLERK_WEBHOOK_SECRET', default='')
@@ -217,6 +312,16 @@ CLERK_WEBHOOK_SECRET = config('CLERK_WEBHOOK_SECRET', default='')
 PAYSTACK_SECRET_KEY = config('PAYSTACK_SECRET_KEY', default='')
 PAYSTACK_PUBLIC_KEY = config('PAYSTACK_PUBLIC_KEY', default='')
 
+# Outbound HTTP (utils.http): (connect, read) timeouts per host, retries and circuit breaker
+HTTP_CLIENT_TIMEOUTS = {
+    'api.paystack.co': (3.05, 15),
+    'v6.exchangerate-api.com': (3.05, 5),
+}
+HTTP_CLIENT_RETRIES = config('HTTP_CLIENT_RETRIES', default=2, cast=int)
+HTTP_CLIENT_POOL_SIZE = config('HTTP_CLIENT_POOL_SIZE', default=10, cast=int)
+HTTP_CIRCUIT_THRESHOLD = config('HTTP_CIRCUIT_THRESHOLD', default=5, cast=int)
+HTTP_CIRCUIT_COOLDOWN = config('HTTP_CIRCUIT_COOLDOWN', default=30, cast=int)
+
 AWS_ACCESS_KEY_ID = config('AWS_ACCESS_KEY_ID', default='')
 AWS_SECRET_ACCESS_KEY = config('AWS_SECRET_ACCESS_KEY', default='')
 AWS_STORAGE_BUCKET_NAME = config('AWS_STORAGE_BUCKET_NAME', default='')
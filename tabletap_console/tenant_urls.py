@@ -14,7 +14,7 @@ def tenant_health_check(request):
         'tenant': request.tenant.name if hasattr(request, 'tenant') else 'Unknown'
     })
 
-from tenants.views import restaurant_current
+from tenants.views import restaurant_current, pos_config
 
 urlpatterns = [
     # Health check
@@ -34,5 +34,5 @@ urlpatterns = [
     path('api/menu/', include('menu.urls')),
     path('api/orders/', include('orders.urls')),
     # POS specific alias
-    path('api/config/', restaurant_current, name='pos_config_alias'),
+    path('api/config/', pos_config, name='pos_config'),
 ]
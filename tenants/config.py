@@ -0,0 +1,78 @@
+"""
+Cached POS configuration documents.
+
+The config a POS terminal boots from (restaurant details, currency, timezone
+and optionally the menu version and table list) is encoded once per tenant
+and cached under the versions of the data it contains. Tenant.save bumps the
+'restaurant' version, table writes bump 'tables' and the menu snapshot
+carries its own content hash, so a stale document is never served and a
+warm request costs a few cache reads.
+"""
+import hashlib
+import json
+from django.core.cache import cache
+from django.utils import timezone
+from django_tenants.utils import schema_context
+from rest_framework.utils.encoders import JSONEncoder
+from utils.cache import get_version
+
+CONFIG_INCLUDES = ('menu', 'tables')
+
+
+def parse_includes(value):
+    requested = {part.strip() for part in (value or '').split(',')}
+    return tuple(part for part in CONFIG_INCLUDES if part in requested)
+
+
+def _versions(schema_name, includes):
+    versions = [f"r{get_version('restaurant', schema_name)}"]
+    if 'menu' in includes:
+        from menu.snapshot import get_snapshot
+        versions.append(f"m{get_snapshot(schema_name)['version']}")
+    if 'tables' in includes:
+        versions.append(f"t{get_version('tables', schema_name)}")
+    return versions
+
+
+def config_etag(schema_name, includes):
+    """ETag for a tenant's config document, computed from versions only."""
+    key = '|'.join([schema_name, *includes, *_versions(schema_name, includes)])
+    return '"%s"' % hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def build_config(tenant, includes):
+    from .serializers import RestaurantSerializer
+
+    data = RestaurantSerializer(tenant).data
+    data['timezone'] = tenant.timezone
+    data['settings'] = {**tenant.get_default_settings(), **(data.get('settings') or {})}
+
+    if 'menu' in includes:
+        from menu.snapshot import get_snapshot
+        data['menuVersion'] = get_snapshot(tenant.schema_name)['version']
+    if 'tables' in includes:
+        from restaurant_tables.models import Table
+        with schema_context(tenant.schema_name):
+            data['tables'] = list(
+                Table.objects.filter(status='active')
+                .order_by('number')
+                .values('id', 'number', 'name', 'section', 'capacity')
+            )
+    return data
+
+
+def get_config_body(tenant, includes, etag):
+    """Return the encoded response body for a tenant's config, building it on a miss."""
+    key = f"posconfig:{tenant.schema_name}:{etag.strip(chr(34))}"
+    body = cache.get(key)
+    if body is None:
+        body = json.dumps({
+            'success': True,
+            'data': build_config(tenant, includes),
+            'meta': {
+                'timestamp': timezone.now().isoformat(),
+                'version': '1.0.0',
+            },
+        }, cls=JSONEncoder, separators=(',', ':')).encode('utf-8')
+        cache.set(key, body, 60 * 60 * 24)
+    return body
@@ -0,0 +1,143 @@
+"""
+db_load_test – measure database connection behaviour under concurrency.
+
+Simulates request traffic: each "request" sets a tenant on a Django
+connection, runs a tenant-table query, checks that the connection's
+search_path really is that tenant's, and closes the connection the way
+Django does at the end of a request. Reports latency percentiles,
+throughput, the peak number of server-side connections (sampled from
+pg_stat_activity) and the pool counters.
+
+Compare configurations by running it with and without DB_POOL_ENABLED.
+gevent mode must be started under gevent's launcher, which monkey-patches
+before Django imports threading and socket, as gunicorn's gevent worker
+does:
+
+    python -m gevent.monkey manage.py db_load_test --mode gevent --clients 200 --requests 20
+    DB_POOL_ENABLED=0 python -m gevent.monkey manage.py db_load_test --mode gevent --clients 200 --requests 20
+"""
+import statistics
+import time
+from django.core.management.base import BaseCommand, CommandError
+
+
+def _percentile(values, percent):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(percent / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = "Load-test tenant database access and report connection count and p99 latency"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mode", choices=["gevent", "threads"], default="gevent")
+        parser.add_argument("--clients", type=int, default=100, help="Concurrent clients (greenlets or threads)")
+        parser.add_argument("--requests", type=int, default=20, help="Requests per client")
+        parser.add_argument("--tenants", type=int, default=5, help="Number of tenant schemas to rotate through")
+
+    def handle(self, *args, **options):
+        if options["mode"] == "gevent":
+            # Patching here would be too late: Django has already imported
+            # threading and socket, so the results would not be representative
+            try:
+                from gevent import monkey
+            except ImportError:
+                raise CommandError("gevent mode needs gevent installed; use --mode threads otherwise")
+            if not monkey.is_module_patched("socket"):
+                raise CommandError(
+                    "gevent mode needs the gevent launcher: "
+                    "python -m gevent.monkey manage.py db_load_test --mode gevent ..."
+                )
+
+        from django.db import connections
+        from django_tenants.utils import get_public_schema_name
+        from tenants.models import Tenant
+        from tabletap_console.db.pool import get_pool_stats
+
+        tenants = list(Tenant.objects.exclude(schema_name=get_public_schema_name())[:options["tenants"]])
+        if not tenants:
+            raise CommandError("No tenants to test against; run seed_local and create a tenant first")
+        connections["default"].close()
+
+        latencies = []
+        errors = []
+        isolation_failures = []
+        peak = {"connections": 0}
+        running = {"value": True}
+
+        def client(index):
+            # A fresh wrapper per client, like Django's per-thread/greenlet connection
+            wrapper = connections.create_connection("default")
+            try:
+                for number in range(options["requests"]):
+                    tenant = tenants[(index + number) % len(tenants)]
+                    start = time.perf_counter()
+                    try:
+                        wrapper.set_tenant(tenant)
+                        with wrapper.cursor() as cursor:
+                            cursor.execute("SELECT count(*) FROM menu_menuitem")
+                            cursor.fetchone()
+                            cursor.execute("SHOW search_path")
+                            search_path = cursor.fetchone()[0]
+                        if not search_path.strip("'\"").startswith(tenant.schema_name):
+                            isolation_failures.append((tenant.schema_name, search_path))
+                    except Exception as e:
+                        errors.append(str(e))
+                    finally:
+                        wrapper.close()
+                    latencies.append((time.perf_counter() - start) * 1000)
+            finally:
+                wrapper.close()
+
+        def monitor(sleep):
+            wrapper = connections.create_connection("default")
+            try:
+                while running["value"]:
+                    with wrapper.cursor() as cursor:
+                        cursor.execute(
+                            "SELECT count(*) - 1 FROM pg_stat_activity "
+                            "WHERE datname = current_database() AND usename = current_user"
+                        )
+                        peak["connections"] = max(peak["connections"], cursor.fetchone()[0])
+                    sleep(0.05)
+            finally:
+                running["value"] = False
+                wrapper.close()
+
+        started = time.perf_counter()
+        if options["mode"] == "gevent":
+            import gevent
+            watcher = gevent.spawn(monitor, gevent.sleep)
+            gevent.joinall([gevent.spawn(client, index) for index in range(options["clients"])])
+            running["value"] = False
+            watcher.join()
+        else:
+            import threading
+            from concurrent.futures import ThreadPoolExecutor
+            watcher = threading.Thread(target=monitor, args=(time.sleep,))
+            watcher.start()
+            with ThreadPoolExecutor(max_workers=options["clients"]) as executor:
+                list(executor.map(client, range(options["clients"])))
+            running["value"] = False
+            watcher.join()
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(f"Requests:        {len(latencies)} in {elapsed:.2f}s ({len(latencies) / elapsed:.0f}/s)")
+        self.stdout.write(
+            f"Latency (ms):    p50 {statistics.median(latencies):.1f}  "
+            f"p95 {_percentile(latencies, 95):.1f}  p99 {_percentile(latencies, 99):.1f}  "
+            f"max {max(latencies):.1f}"
+        )
+        self.stdout.write(f"Peak server connections: {peak['connections']}")
+        for alias, stats in get_pool_stats().items():
+            self.stdout.write(f"Pool '{alias}':   {stats}")
+
+        if isolation_failures:
+            self.stdout.write(self.style.ERROR(
+                f"{len(isolation_failures)} requests ran with the wrong search_path, e.g. {isolation_failures[0]}"
+            ))
+        if errors:
+            self.stdout.write(self.style.WARNING(f"{len(errors)} errors, e.g. {errors[0]}"))
+        if not errors and not isolation_failures:
+            self.stdout.write(self.style.SUCCESS("Done"))
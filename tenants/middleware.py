@@ -1,9 +1,48 @@
+import logging
 import re
 from django.conf import settings
+from django.core.cache import cache
 from django.db import connection
 from django_tenants.middleware.main import TenantMainMiddleware
 from django_tenants.utils import get_tenant_model, get_public_schema_name
 from tenants.models import Tenant, Domain
+from utils.cache import get_version
+
+logger = logging.getLogger(__name__)
+
+TENANT_RESOLUTION_TTL = 300
+_NOT_FOUND = 'not-found'
+
+
+def _cached_lookup(kind, value, loader):
+    """
+    Memoize a tenant lookup (by slug, host, ...) in the shared cache.
+    Tenant and Domain writes bump the version, dropping every entry.
+    """
+    version = get_version('tenant-resolution', 'all')
+    key = f"tenant:{kind}:{version}:{value}"
+    tenant = cache.get(key)
+    if tenant is None:
+        tenant = loader() or _NOT_FOUND
+        cache.set(key, tenant, TENANT_RESOLUTION_TTL)
+    return None if tenant == _NOT_FOUND else tenant
+
+
+def get_owned_tenant(user):
+    """
+    The tenant a user owns, via the owner FK or the legacy
+    clerk_organization_id link, memoized with the other tenant lookups.
+    """
+    if not user or not user.is_authenticated:
+        return None
+
+    def _load():
+        tenant = Tenant.objects.filter(owner_id=user.pk).order_by('id').first()
+        if tenant is None and user.clerk_user_id:
+            tenant = Tenant.objects.filter(clerk_organization_id=user.clerk_user_id).first()
+        return tenant
+
+    return _cached_lookup('owner', user.pk, _load)
 
 
 class TableTapTenantMiddleware(TenantMainMiddleware):
@@ -16,10 +55,10 @@ class TableTapTenantMiddleware(TenantMainMiddleware):
     """
 
     def _get_public_tenant(self):
-        try:
-            return Tenant.objects.get(schema_name=get_public_schema_name())
-        except Tenant.DoesNotExist:
-            return None
+        return _cached_lookup(
+            'schema', get_public_schema_name(),
+            lambda: Tenant.objects.filter(schema_name=get_public_schema_name()).first(),
+        )
 
     def process_request(self, request):
         connection.set_schema_to_public()
@@ -29,10 +68,10 @@ class TableTapTenantMiddleware(TenantMainMiddleware):
 
         # ── 1. Resolve by X-Tenant-Id header ──────────────────────────────
         if tenant_slug:
-            tenant = (
+            tenant = _cached_lookup('slug', tenant_slug, lambda: (
                 Tenant.objects.filter(slug=tenant_slug, is_active=True).first()
                 or Tenant.objects.filter(schema_name=tenant_slug, is_active=True).first()
-            )
+            ))
             if tenant:
                 request.tenant = tenant
                 connection.set_tenant(tenant)
@@ -40,9 +79,10 @@ class TableTapTenantMiddleware(TenantMainMiddleware):
                 return
 
         # ── 2. Resolve by hostname ─────────────────────────────────────────
-        domain_obj = Domain.objects.filter(domain=host).select_related('tenant').first()
-        if domain_obj:
-            tenant = domain_obj.tenant
+        tenant = _cached_lookup('host', host, lambda: getattr(
+            Domain.objects.filter(domain=host).select_related('tenant').first(), 'tenant', None,
+        ))
+        if tenant:
             request.tenant = tenant
             connection.set_tenant(tenant)
             # Use PUBLIC_SCHEMA_URLCONF for the public schema, tenant URLs otherwise
@@ -66,3 +106,34 @@ class TableTapTenantMiddleware(TenantMainMiddleware):
         # If even the public tenant doesn't exist yet, let django-tenants
         # handle the error (will show a clear error page).
         super().process_request(request)
+
+
+class SchemaSwitchMetricsMiddleware:
+    """
+    Counts schema switches during a request (tenant changes, skipped no-op
+    changes and SET search_path statements actually sent) and reports them
+    in the X-Schema-Switches header and the log. Needs a backend that keeps
+    `schema_stats` (tabletap_console.db.postgresql or .pooled).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'SCHEMA_SWITCH_METRICS', False)
+
+    def __call__(self, request):
+        stats = getattr(connection, 'schema_stats', None)
+        if not self.enabled or stats is None:
+            return self.get_response(request)
+
+        before = dict(stats)
+        response = self.get_response(request)
+        delta = {key: stats[key] - before[key] for key in stats}
+        response['X-Schema-Switches'] = (
+            f"switches={delta['switches']}; skipped={delta['skipped']}; sets={delta['search_path_sets']}"
+        )
+        if delta['search_path_sets'] > 2:
+            logger.info(
+                "[Schema] %s %s: %d switches, %d skipped, %d SET search_path",
+                request.method, request.path, delta['switches'], delta['skipped'], delta['search_path_sets'],
+            )
+        return response
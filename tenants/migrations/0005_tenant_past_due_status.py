@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0004_tenant_status_trial_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tenant',
+            name='subscription_status',
+            field=models.CharField(choices=[('trial', 'Trial'), ('active', 'Active'), ('past_due', 'Past due'), ('inactive', 'Inactive'), ('cancelled', 'Cancelled')], default='trial', max_length=20),
+        ),
+    ]
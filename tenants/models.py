@@ -23,6 +23,7 @@ class Tenant(TenantMixin):
         choices=[
             ('trial', 'Trial'),
             ('active', 'Active'),
+            ('past_due', 'Past due'),
             ('inactive', 'Inactive'),
             ('cancelled', 'Cancelled'),
         ],
@@ -49,6 +50,11 @@ class Tenant(TenantMixin):
 
     auto_create_schema = True
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['subscription_status', 'trial_end_date'], name='tenant_status_trial_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         is_new = self._state.adding
         old_slug = None
@@ -81,6 +87,9 @@ class Tenant(TenantMixin):
             'currency': self.currency,
             'timezone': self.timezone,
             'tableCount': 0,
+            # Percentage and flat fee used by server-side order pricing
+            'taxRate': 0,
+            'deliveryFee': 0,
         }
 
     def __str__(self):
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from utils.cache import bump_version
+from utils.conditional import bump_on_commit
+from .models import Tenant, Domain
+
+
+@receiver(post_save, sender=Tenant)
+@receiver(post_delete, sender=Tenant)
+@receiver(post_save, sender=Domain)
+@receiver(post_delete, sender=Domain)
+def invalidate_tenant_resolution(sender, **kwargs):
+    bump_version('tenant-resolution', 'all')
+
+
+@receiver(post_save, sender=Tenant)
+def invalidate_restaurant_etag(sender, instance, created, **kwargs):
+    if not created:
+        bump_on_commit('restaurant', instance.schema_name)
@@ -8,6 +8,7 @@ import uuid
 from .models import Tenant, Domain
 from .serializers import TenantSerializer, DomainSerializer, RestaurantSerializer
 from drf_yasg.utils import swagger_auto_schema
+from utils.conditional import conditional_get
 from drf_yasg import openapi
 
 class TenantViewSet(viewsets.ModelViewSet):
@@ -75,8 +76,14 @@ class TenantViewSet(viewsets.ModelViewSet):
 )
 @api_view(['GET', 'PUT'])
 @permission_classes([IsAuthenticatedOrReadOnly])
+@conditional_get('restaurant')
 def restaurant_current(request):
     """Get or update current restaurant information"""
+    return _restaurant_response(request)
+
+
+def _restaurant_response(request):
+    """Body of restaurant_current, shared with pos_config for PUT and public-schema requests."""
     try:
         # Get current tenant from request
         tenant = request.tenant
@@ -88,11 +95,9 @@ def restaurant_current(request):
             # Try to resolve by clerk_organization_id (which is currently the clerk_user_id for owners)
             tenant_match = Tenant.objects.filter(clerk_organization_id=request.user.clerk_user_id).first()
             if tenant_match:
-                from django.db import connection
+                # Only the Tenant row is read, so the connection stays on public.
+                # request.tenant is left as is to avoid side effects.
                 tenant = tenant_match
-                connection.set_tenant(tenant)
-                # Note: We don't update request.tenant globally here to avoid side effects,
-                # but we use 'tenant' for the rest of this view.
         
         if request.method == 'GET':
             serializer = RestaurantSerializer(tenant)
@@ -143,3 +148,35 @@ def restaurant_current(request):
                 'version': '1.0.0'
             }
         }, status=status.HTTP_404_NOT_FOUND)
+
+
+@api_view(['GET', 'PUT'])
+@permission_classes([IsAuthenticatedOrReadOnly])
+def pos_config(request):
+    """
+    POS boot configuration for the current tenant, served from a cached,
+    versioned document. Pass ?include=menu,tables to add the menu version
+    and active table list. Updates and public-schema discovery share
+    restaurant_current's handling.
+    """
+    from django.http import HttpResponse
+    from django_tenants.utils import get_public_schema_name
+    from subscriptions.entitlements import get_entitlements
+    from utils.conditional import etag_matches
+    from .config import config_etag, get_config_body, parse_includes
+
+    tenant = getattr(request, 'tenant', None)
+    if request.method != 'GET' or tenant is None or tenant.schema_name == get_public_schema_name():
+        return _restaurant_response(request)
+    # Signed-in POS terminals need a plan with the POS; public reads stay open
+    if request.user.is_authenticated and not get_entitlements(request).has_feature('includes_pos'):
+        return Response({'error': 'Your current plan does not include the POS system.'}, status=status.HTTP_403_FORBIDDEN)
+
+    includes = parse_includes(request.query_params.get('include'))
+    etag = config_etag(tenant.schema_name, includes)
+    if etag_matches(request, etag):
+        response = HttpResponse(status=304)
+    else:
+        response = HttpResponse(get_config_body(tenant, includes, etag), content_type='application/json')
+    response['ETag'] = etag
+    return response
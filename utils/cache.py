@@ -0,0 +1,75 @@
+import time
+import uuid
+from contextlib import contextmanager
+from django.core.cache import cache
+
+# Deletes the lock only if it still holds our token (django-redis pickles values)
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def _version_key(namespace, scope):
+    return f"version:{namespace}:{scope}"
+
+
+def get_version(namespace, scope):
+    """
+    Return the current version counter for a namespace within a scope
+    (usually a tenant schema name). Missing counters are seeded from the
+    clock so an evicted counter never goes back to a previously used value.
+    """
+    key = _version_key(namespace, scope)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(namespace, scope):
+    """Invalidate everything cached under the old version of namespace/scope."""
+    key = _version_key(namespace, scope)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = int(time.time() * 1000)
+        cache.set(key, version, None)
+        return version
+
+
+def acquire_lock(key, timeout, wait=1):
+    """
+    Take a cache lock that expires after `timeout` seconds, waiting up to
+    `wait` seconds. Returns the owner token, or None if it stayed taken.
+    """
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + wait
+    while not cache.add(key, token, timeout):
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(0.01)
+    return token
+
+
+def release_lock(key, token):
+    """Release a lock only if `token` still owns it; an expired lock may belong to someone else."""
+    client = getattr(cache, 'client', None)
+    if hasattr(client, 'encode'):
+        client.get_client(write=True).eval(_RELEASE_LOCK_SCRIPT, 1, client.make_key(key), client.encode(token))
+    elif cache.get(key) == token:
+        cache.delete(key)
+
+
+@contextmanager
+def cache_lock(key, timeout, wait=1):
+    """`with cache_lock(key, 5) as acquired:` — the lock is held only when acquired is True."""
+    token = acquire_lock(key, timeout, wait)
+    try:
+        yield token is not None
+    finally:
+        if token is not None:
+            release_lock(key, token)
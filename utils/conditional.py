@@ -0,0 +1,101 @@
+"""
+Conditional GET support for read endpoints.
+
+Validators come from per-tenant version counters (utils.cache) that are
+bumped after writes commit, so answering a 304 needs one cache read and no
+queries. ETags also cover the request path and query string, and optionally
+the user, so different views of the same data never share a validator.
+"""
+import hashlib
+from functools import wraps
+from django.db import connection, transaction
+from django_tenants.utils import get_public_schema_name
+from rest_framework import status
+from rest_framework.response import Response
+from .cache import get_version, bump_version
+
+
+def bump_on_commit(namespace, schema_name=None):
+    """Bump a namespace's version for the current schema once the transaction commits."""
+    schema_name = schema_name or connection.schema_name
+    transaction.on_commit(lambda: bump_version(namespace, schema_name))
+
+
+def _tenant_scope(request):
+    tenant = getattr(request, 'tenant', None)
+    if tenant is None or tenant.schema_name == get_public_schema_name():
+        return None
+    return tenant.schema_name
+
+
+def compute_etag(request, namespace, vary_on_user=False):
+    """Return the ETag for this request, or None when it cannot be cached."""
+    scope = _tenant_scope(request)
+    if scope is None:
+        return None
+    parts = [namespace, scope, str(get_version(namespace, scope)), request.get_full_path()]
+    if vary_on_user:
+        parts.append(str(getattr(request.user, 'pk', '') or ''))
+    return '"%s"' % hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+
+
+def etag_matches(request, etag):
+    header = request.headers.get('If-None-Match', '')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    candidates = [value.strip() for value in header.split(',')]
+    return etag in candidates or f"W/{etag}" in candidates
+
+
+def not_modified_response(etag):
+    response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    response['ETag'] = etag
+    return response
+
+
+def conditional_get(namespace, vary_on_user=False):
+    """
+    Decorator for DRF function views (apply below @api_view). GET requests
+    whose If-None-Match matches the current ETag get a 304 before the view
+    runs; other GET responses carry the ETag.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+            etag = compute_etag(request, namespace, vary_on_user)
+            if etag and etag_matches(request, etag):
+                return not_modified_response(etag)
+            response = view_func(request, *args, **kwargs)
+            if etag and response.status_code == status.HTTP_200_OK:
+                response['ETag'] = etag
+            return response
+        return wrapper
+    return decorator
+
+
+class ConditionalGetMixin:
+    """
+    ViewSet mixin adding ETag / 304 handling to list and retrieve.
+    Set `conditional_namespace` to the version namespace the viewset reads.
+    """
+    conditional_namespace = None
+    conditional_vary_on_user = False
+
+    def _conditional(self, handler, request, *args, **kwargs):
+        etag = compute_etag(request, self.conditional_namespace, self.conditional_vary_on_user)
+        if etag and etag_matches(request, etag):
+            return not_modified_response(etag)
+        response = handler(request, *args, **kwargs)
+        if etag and response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,211 @@
+"""
+Shared client for outbound HTTP calls (Paystack, exchange rates).
+
+One process-wide requests.Session pools keep-alive connections per host.
+Each call gets a per-host timeout (HTTP_CLIENT_TIMEOUTS), bounded retries
+and a per-host circuit breaker that fails fast after repeated errors. Calls
+are timed into in-process latency metrics. Tests can mount a StubTransport
+so no request leaves the process.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+import requests
+from django.conf import settings
+from requests.adapters import BaseAdapter, HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = (3.05, 10)
+SLOW_CALL_SECONDS = 2.0
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised without making a request while a host's circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures and rejects calls for
+    `cooldown` seconds; after that one trial call is let through (half-open)
+    and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, threshold=5, cooldown=30):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        with self.lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            return False
+
+    def record(self, success):
+        with self.lock:
+            self.trial_in_flight = False
+            if success:
+                self.failures = 0
+                self.opened_at = None
+                return
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+class StubTransport(BaseAdapter):
+    """
+    Transport for tests: answers registered (method, url) pairs with canned
+    responses and records every request it receives.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.routes = {}
+        self.requests = []
+
+    def add(self, method, url, json=None, status=200, body=b'', headers=None):
+        self.routes[(method.upper(), url)] = (status, json, body, headers or {})
+
+    def send(self, request, **kwargs):
+        import json as json_module
+
+        self.requests.append(request)
+        url = request.url.split('?', 1)[0]
+        status, json_body, body, headers = self.routes.get((request.method, url), (404, None, b'', {}))
+
+        response = requests.Response()
+        response.status_code = status
+        response.url = request.url
+        response.request = request
+        response.headers.update(headers)
+        if json_body is not None:
+            body = json_module.dumps(json_body).encode('utf-8')
+            response.headers.setdefault('Content-Type', 'application/json')
+        response._content = body
+        response.encoding = 'utf-8'
+        return response
+
+    def close(self):
+        pass
+
+
+class HTTPClient:
+    def __init__(self):
+        self.session = requests.Session()
+        retry = Retry(
+            total=getattr(settings, 'HTTP_CLIENT_RETRIES', 2),
+            backoff_factor=0.3,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD', 'OPTIONS']),
+            raise_on_status=False,
+        )
+        pool_size = getattr(settings, 'HTTP_CLIENT_POOL_SIZE', 10)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.breakers = {}
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def _breaker(self, host):
+        with self.lock:
+            if host not in self.breakers:
+                self.breakers[host] = CircuitBreaker(
+                    threshold=getattr(settings, 'HTTP_CIRCUIT_THRESHOLD', 5),
+                    cooldown=getattr(settings, 'HTTP_CIRCUIT_COOLDOWN', 30),
+                )
+            return self.breakers[host]
+
+    def _record(self, host, elapsed, failed):
+        with self.lock:
+            stats = self.metrics.setdefault(host, {'calls': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            stats['calls'] += 1
+            stats['errors'] += int(failed)
+            stats['total_ms'] += elapsed * 1000
+            stats['max_ms'] = max(stats['max_ms'], elapsed * 1000)
+
+    def get_metrics(self):
+        with self.lock:
+            return {
+                host: {
+                    **stats,
+                    'avg_ms': round(stats['total_ms'] / stats['calls'], 2) if stats['calls'] else 0.0,
+                    'circuit': self.breakers[host].state if host in self.breakers else 'closed',
+                }
+                for host, stats in self.metrics.items()
+            }
+
+    def request(self, method, url, **kwargs):
+        host = urlsplit(url).hostname or ''
+        breaker = self._breaker(host)
+        if not breaker.allow():
+            self._record(host, 0.0, True)
+            raise CircuitOpenError(f"Circuit open for {host}")
+
+        timeouts = getattr(settings, 'HTTP_CLIENT_TIMEOUTS', {})
+        kwargs.setdefault('timeout', timeouts.get(host, DEFAULT_TIMEOUT))
+        start = time.perf_counter()
+        failed = True
+        try:
+            response = self.session.request(method, url, **kwargs)
+            failed = response.status_code >= 500
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            breaker.record(not failed)
+            self._record(host, elapsed, failed)
+            if elapsed >= SLOW_CALL_SECONDS:
+                logger.warning("[HTTP] %s %s took %.2fs", method, host, elapsed)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HTTPClient()
+    return _client
+
+
+@contextmanager
+def use_transport(transport):
+    """Route all shared-client traffic through `transport` (e.g. a StubTransport) for the block."""
+    client = get_http_client()
+    previous = dict(client.session.adapters)
+    client.session.mount('https://', transport)
+    client.session.mount('http://', transport)
+    try:
+        yield transport
+    finally:
+        client.session.adapters.clear()
+        client.session.adapters.update(previous)